@@ -127,6 +127,83 @@ namespace backend_api.Controllers
             }
         }
 
+        [HttpPost("vectors/bulk")]
+        [ProducesResponseType(typeof(object), 200)]
+        [ProducesResponseType(typeof(object), 400)]
+        [ProducesResponseType(typeof(object), 500)]
+        public async Task<IActionResult> AddVectorsBulk([FromBody] VectorBatchRequest request)
+        {
+            List<VectorData> vectors;
+            try
+            {
+                vectors = request.Vectors.Select(v => new VectorData
+                {
+                    Id = v.Id,
+                    Document = v.Document,
+                    Embedding = DecodeEmbedding(v.Embedding),
+                    Metadata = v.Metadata
+                }).ToList();
+            }
+            catch (FormatException ex)
+            {
+                _logger.LogWarning(ex, "Geçersiz vector batch: {Count} vector", request.Vectors.Count);
+                return BadRequest(new { success = false, error = ex.Message });
+            }
+
+            try
+            {
+                await _ollamaService.StoreVectorsAsync(vectors);
+                _logger.LogInformation("Vector batch eklendi: {Count} vector", vectors.Count);
+                return Ok(new { success = true, count = vectors.Count });
+            }
+            catch (Exception ex)
+            {
+                _logger.LogError(ex, "Vector batch ekleme hatası: {Count} vector", vectors.Count);
+                return StatusCode(500, new { success = false, error = ex.Message });
+            }
+        }
+
+        [HttpPost("vectors/delete")]
+        [ProducesResponseType(typeof(object), 200)]
+        [ProducesResponseType(typeof(object), 500)]
+        public async Task<IActionResult> DeleteVectors([FromBody] VectorDeleteRequest request)
+        {
+            try
+            {
+                var removed = await _ollamaService.DeleteVectorsAsync(request.Ids);
+                _logger.LogInformation("Vector'lar silindi: {Removed}/{Requested}", removed, request.Ids.Count);
+                return Ok(new { success = true, removed });
+            }
+            catch (Exception ex)
+            {
+                _logger.LogError(ex, "Vector silme hatası: {Count} id", request.Ids.Count);
+                return StatusCode(500, new { success = false, error = ex.Message });
+            }
+        }
+
+        private static float[] DecodeEmbedding(string encoded)
+        {
+            var bytes = Convert.FromBase64String(encoded);
+            if (bytes.Length % sizeof(float) != 0)
+            {
+                throw new FormatException($"Embedding uzunluğu float32 ile uyumsuz: {bytes.Length} byte");
+            }
+
+            var embedding = new float[bytes.Length / sizeof(float)];
+            if (BitConverter.IsLittleEndian)
+            {
+                Buffer.BlockCopy(bytes, 0, embedding, 0, bytes.Length);
+            }
+            else
+            {
+                for (var i = 0; i < embedding.Length; i++)
+                {
+                    embedding[i] = System.Buffers.Binary.BinaryPrimitives.ReadSingleLittleEndian(bytes.AsSpan(i * sizeof(float)));
+                }
+            }
+            return embedding;
+        }
+
         [HttpGet("status")]
         [ProducesResponseType(typeof(SystemStatusResponse), 200)]
         public async Task<IActionResult> GetSystemStatus()
@@ -72,6 +72,25 @@ namespace backend_api.Models
         public VectorMetadata Metadata { get; set; } = new();
     }
 
+    public class VectorBatchRequest
+    {
+        public List<EncodedVectorData> Vectors { get; set; } = new();
+    }
+
+    public class EncodedVectorData
+    {
+        public string Id { get; set; } = string.Empty;
+        public string Document { get; set; } = string.Empty;
+        // Base64 kodlu little-endian float32 dizisi
+        public string Embedding { get; set; } = string.Empty;
+        public VectorMetadata Metadata { get; set; } = new();
+    }
+
+    public class VectorDeleteRequest
+    {
+        public List<string> Ids { get; set; } = new();
+    }
+
     public class VectorStats
     {
         public int TotalVectors { get; set; }
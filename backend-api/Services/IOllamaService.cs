@@ -12,6 +12,8 @@ namespace backend_api.Services
         
         // Vector storage and search
         Task StoreVectorAsync(VectorData vectorData);
+        Task StoreVectorsAsync(IReadOnlyCollection<VectorData> vectors);
+        Task<int> DeleteVectorsAsync(IReadOnlyCollection<string> ids);
         Task<List<VectorResult>> SearchSimilarAsync(string query, int nResults = 5);
         Task<List<VectorResult>> GetVectorsByFileAsync(string fileName);
         Task<VectorStats> GetVectorStatsAsync();
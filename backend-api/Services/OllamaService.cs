@@ -194,6 +194,29 @@ Cevap:";
             }
         }
 
+        public async Task StoreVectorsAsync(IReadOnlyCollection<VectorData> vectors)
+        {
+            lock (_storageLock)
+            {
+                _vectorStorage.AddRange(vectors);
+            }
+
+            _logger.LogInformation("Vector batch stored: {Count} vector", vectors.Count);
+        }
+
+        public async Task<int> DeleteVectorsAsync(IReadOnlyCollection<string> ids)
+        {
+            var idSet = new HashSet<string>(ids);
+            int removed;
+            lock (_storageLock)
+            {
+                removed = _vectorStorage.RemoveAll(v => idSet.Contains(v.Id));
+            }
+
+            _logger.LogInformation("Vectors deleted: {Removed}/{Requested}", removed, idSet.Count);
+            return removed;
+        }
+
         public async Task<List<VectorResult>> SearchSimilarAsync(string query, int nResults = 5)
         {
             try
@@ -0,0 +1,173 @@
+import time
+import base64
+import random
+import logging
+import threading
+import numpy as np
+import requests
+import metrics
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+class BackendUploadError(Exception):
+    """Vector batch'i tüm denemelere rağmen backend'e gönderilemedi"""
+
+
+class BackendUploader:
+    """Vector'ları backend'e job bazında toplu gönderen, bağlantı havuzlu istemci
+
+    Embedding'ler JSON float listesi yerine base64 kodlu little-endian
+    float32 olarak gönderilir. Başarısız batch'ler silinmez; bir sonraki
+    gönderimde tekrar denenir, flush sırasında hâlâ gönderilemiyorsa
+    BackendUploadError fırlatılır. delete_later ile bırakılan silmeler
+    sonraki gönderimden önce yapılır (aynı id'ler yeniden eklenmeden önce).
+    """
+
+    def __init__(self, backend_url: str, batch_size: int = 64, max_retries: int = 4,
+                 backoff_seconds: float = 0.5, timeout: float = 30, failure_cooldown: float = 10):
+        self.bulk_url = f"{backend_url}/api/question/vectors/bulk"
+        self.delete_url = f"{backend_url}/api/question/vectors/delete"
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(0, max_retries)
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.failure_cooldown = failure_cooldown
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._deferred_deletes: List[str] = []
+        self._lock = threading.Lock()
+        # Başarısız gönderimden sonra add() bu zamana kadar sadece buffer'lar
+        self._retry_at = 0.0
+
+        self.uploaded_vectors = 0
+        self.uploaded_batches = 0
+        self.retries = 0
+        self.failed_batches = 0
+
+    @staticmethod
+    def encode_embedding(embedding) -> str:
+        return base64.b64encode(np.asarray(embedding, dtype='<f4').tobytes()).decode('ascii')
+
+    def add(self, job_id: str, vector_entry: Dict[str, Any]):
+        """Vector'ı job buffer'ına ekle, buffer dolduysa gönder"""
+        encoded = {
+            'id': vector_entry['id'],
+            'document': vector_entry['document'],
+            'embedding': self.encode_embedding(vector_entry['embedding']),
+            'metadata': vector_entry['metadata']
+        }
+        with self._lock:
+            pending = self._pending.setdefault(job_id, [])
+            pending.append(encoded)
+            if len(pending) < self.batch_size or time.monotonic() < self._retry_at:
+                return
+
+        try:
+            self._drain(job_id, force=False)
+        except BackendUploadError as e:
+            self._retry_at = time.monotonic() + self.failure_cooldown
+            logger.error(f"Backend batch gönderilemedi, job sonunda tekrar denenecek: {e}")
+
+    def flush(self, job_id: str):
+        """Job'ın kalan tüm vector'larını gönder (job sonunda çağrılır)"""
+        self._drain(job_id, force=True)
+
+    def delete(self, vector_ids: List[str]):
+        """Vector'ları backend'den id ile sil (batch'ler halinde, retry ile)"""
+        for start in range(0, len(vector_ids), 1000):
+            batch = vector_ids[start:start + 1000]
+            self._post(self.delete_url, {'ids': batch}, f"{len(batch)} vector silme")
+        if vector_ids:
+            logger.info(f"Backend'den {len(vector_ids)} vector silindi")
+
+    def delete_later(self, vector_ids: List[str]):
+        """Şu an silinemeyen vector id'lerini sonraki gönderimden önce silinmek üzere sakla"""
+        with self._lock:
+            self._deferred_deletes.extend(vector_ids)
+
+    def discard(self, job_id: str) -> int:
+        """Job'ın gönderilmemiş vector'larını bırak"""
+        with self._lock:
+            return len(self._pending.pop(job_id, []))
+
+    def pending_count(self, job_id: str) -> int:
+        with self._lock:
+            return len(self._pending.get(job_id, []))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'uploaded_vectors': self.uploaded_vectors,
+            'uploaded_batches': self.uploaded_batches,
+            'retries': self.retries,
+            'failed_batches': self.failed_batches,
+            'deferred_deletes': len(self._deferred_deletes)
+        }
+
+    def _drain(self, job_id: str, force: bool):
+        """Buffer'daki tam batch'leri (force ise hepsini) gönder
+
+        Gönderilemeyen vector'lar buffer'ın başına geri konur.
+        """
+        self._delete_deferred()
+        with self._lock:
+            pending = self._pending.pop(job_id, [])
+
+        sent = 0
+        try:
+            while len(pending) - sent >= self.batch_size or (force and sent < len(pending)):
+                batch = pending[sent:sent + self.batch_size]
+                self._send(batch)
+                sent += len(batch)
+        finally:
+            remaining = pending[sent:]
+            if remaining:
+                with self._lock:
+                    self._pending[job_id] = remaining + self._pending.get(job_id, [])
+
+    def _delete_deferred(self):
+        with self._lock:
+            vector_ids, self._deferred_deletes = self._deferred_deletes, []
+        try:
+            self.delete(vector_ids)
+        except BackendUploadError:
+            with self._lock:
+                self._deferred_deletes = vector_ids + self._deferred_deletes
+            raise
+
+    def _send(self, batch: List[Dict[str, Any]]):
+        self._post(self.bulk_url, {'vectors': batch}, f"{len(batch)} vector")
+        self.uploaded_vectors += len(batch)
+        self.uploaded_batches += 1
+        logger.info(f"Vector batch backend'e gönderildi: {len(batch)} vector")
+
+    def _post(self, url: str, payload: Dict[str, Any], description: str):
+        """İsteği exponential backoff + jitter ile gönder"""
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                time.sleep(self.backoff_seconds * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+            try:
+                with metrics.stage('backend_post'):
+                    response = self.session.post(url, json=payload, timeout=self.timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    last_error = f"HTTP {response.status_code}"
+                    continue
+                if response.status_code >= 400:
+                    # İstemci hatası: tekrar denemek sonucu değiştirmez
+                    self.failed_batches += 1
+                    raise BackendUploadError(f"Backend isteği reddetti ({description}): "
+                                             f"HTTP {response.status_code} - {response.text[:200]}")
+                return
+            except requests.exceptions.RequestException as e:
+                last_error = str(e)
+
+        self.failed_batches += 1
+        raise BackendUploadError(f"{description} {self.max_retries + 1} denemede gönderilemedi: {last_error}")
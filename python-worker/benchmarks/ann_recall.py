@@ -0,0 +1,68 @@
+"""IVF index recall@k / latency raporu (exact FlatIndex ile karşılaştırma)
+
+Kullanım:
+    python benchmarks/ann_recall.py --vectors 100000 --dim 768 --k 10
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from segment_store import SegmentStore
+from vector_store import FlatIndex, IVFIndex
+
+
+def synthetic_embeddings(count: int, dim: int, clusters: int, rng) -> np.ndarray:
+    """Kümelenmiş (gerçek embedding'lere benzer) sentetik vektörler"""
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    vectors = centers[labels] + 0.35 * rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vectors', type=int, default=50000)
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--nlist', type=int, default=0)
+    parser.add_argument('--metric', default='l2')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_embeddings(args.vectors + args.queries, args.dim, max(16, args.vectors // 500), rng)
+    data, queries = vectors[:args.vectors], vectors[args.vectors:]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentStore(os.path.join(tmp, 'segments'))
+        started = time.perf_counter()
+        for i, vector in enumerate(data):
+            store.append('bench', 'bench.md', '/bench/bench.md', i, '', vector, 0.0)
+        load_seconds = time.perf_counter() - started
+
+        ivf = IVFIndex(store, metric=args.metric, nlist=args.nlist, min_train_rows=1, seed=args.seed)
+        started = time.perf_counter()
+        ivf.train()
+        train_seconds = time.perf_counter() - started
+
+        report = ivf.recall_report(queries, FlatIndex(store, metric=args.metric), k=args.k)
+        report.update({
+            'dim': args.dim,
+            'metric': args.metric,
+            'load_seconds': round(load_seconds, 3),
+            'train_seconds': round(train_seconds, 3)
+        })
+        store.close()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""İki pipeline_bench.py JSON çıktısını karşılaştır
+
+Kullanım:
+    python benchmarks/compare.py baseline.json results.json [--threshold 10]
+
+Sayısal alanların yüzde değişimi yazdırılır. `_per_s` ile biten alanlarda
+düşüş, `_ms` ile biten alanlarda artış threshold'u aşarsa regresyon
+sayılır ve çıkış kodu 1 olur.
+"""
+import sys
+import json
+import argparse
+
+
+def flatten(value, prefix=''):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key != 'meta':
+                yield from flatten(item, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            label = item.get('vectors', i) if isinstance(item, dict) else i
+            yield from flatten(item, f"{prefix}[{label}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Regresyon eşiği (yüzde)')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = dict(flatten(json.load(f)))
+    with open(args.current) as f:
+        current = dict(flatten(json.load(f)))
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[key], current[key]
+        change = (new - old) / old * 100 if old else 0.0
+        regressed = (key.endswith('_per_s') and change < -args.threshold) or \
+                    (key.endswith('_ms') and change > args.threshold)
+        regressions += regressed
+        print(f"{'!' if regressed else ' '} {key:60s} {old:14.3f} -> {new:14.3f} ({change:+.1f}%)")
+
+    print(f"\n{regressions} regresyon (eşik %{args.threshold:g})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
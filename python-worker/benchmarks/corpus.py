@@ -0,0 +1,70 @@
+"""Benchmark'lar için tekrarlanabilir sentetik PDF / Markdown corpus üretici"""
+import os
+import fitz  # PyMuPDF
+import numpy as np
+
+WORDS = (
+    'belge vektör arama model embedding chunk sorgu dosya sayfa başlık paragraf '
+    'sistem kullanıcı servis kuyruk işlem rapor analiz sonuç performans bellek '
+    'document vector search index query latency throughput worker pipeline segment'
+).split()
+
+
+def sentence(rng, min_words: int = 6, max_words: int = 18) -> str:
+    words = rng.choice(WORDS, size=int(rng.integers(min_words, max_words)))
+    text = ' '.join(words)
+    if rng.random() < 0.1:
+        text += f" ERR-{int(rng.integers(1000, 9999))}"
+    return text[0].upper() + text[1:] + '.'
+
+
+def paragraph(rng) -> str:
+    return ' '.join(sentence(rng) for _ in range(int(rng.integers(3, 8))))
+
+
+def make_markdown(path: str, target_bytes: int, rng) -> str:
+    """Başlık, liste, kod bloğu ve paragraflardan oluşan Markdown dosyası yaz"""
+    parts = []
+    size = 0
+    section = 0
+    while size < target_bytes:
+        section += 1
+        block = [f"## Bölüm {section}", '', paragraph(rng), '']
+        if section % 3 == 0:
+            block += [f"- {sentence(rng)}" for _ in range(4)] + ['']
+        if section % 5 == 0:
+            block += ['```python', f"def fonksiyon_{section}(x):", '    return x * 2', '```', '']
+        block += [paragraph(rng), '']
+        text = '\n'.join(block)
+        parts.append(text)
+        size += len(text.encode('utf-8'))
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Sentetik Doküman\n\n" + '\n'.join(parts))
+    return path
+
+
+def make_pdf(path: str, pages: int, rng, lines_per_page: int = 45) -> str:
+    """Her sayfası satır satır text içeren PDF yaz"""
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        y = 50
+        for _ in range(lines_per_page):
+            page.insert_text((50, y), sentence(rng, 8, 12)[:95], fontsize=9)
+            y += 16
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def make_corpus(directory: str, markdown_files: int = 4, markdown_bytes: int = 256 * 1024,
+                pdf_files: int = 2, pdf_pages: int = 50, seed: int = 42):
+    """(markdown yolları, pdf yolları) döndür"""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    markdown_paths = [make_markdown(os.path.join(directory, f"doc_{i:03d}.md"), markdown_bytes, rng)
+                      for i in range(markdown_files)]
+    pdf_paths = [make_pdf(os.path.join(directory, f"doc_{i:03d}.pdf"), pdf_pages, rng)
+                 for i in range(pdf_files)]
+    return markdown_paths, pdf_paths
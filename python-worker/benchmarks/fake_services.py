@@ -0,0 +1,163 @@
+"""Benchmark ve testler için gecikmesi ayarlanabilen sahte Ollama + backend HTTP sunucusu
+
+Ollama: /api/embed (batch) ve /api/embeddings (tekli); embedding'ler text'ten
+deterministik olarak üretilir. Backend: /api/question/* POST'ları kabul edilir.
+Aşırı yük (503), yavaşlama ve eski Ollama sürümleri (/api/embed yok)
+simüle edilebilir.
+"""
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from typing import Optional
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def fake_embedding(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'little')
+    return np.random.default_rng(seed).normal(size=dim).astype(np.float32)
+
+
+class FakeServices:
+    """Arka plan thread'inde çalışan sahte Ollama/backend sunucusu
+
+    latency_ms her isteğe, per_item_ms batch'teki her text'e eklenir.
+    Embedding istekleri için (alanlar çalışırken de değiştirilebilir):
+
+    fail_next        - sonraki bu kadar istek fail_status ile cevaplanır
+    max_concurrency  - eşzamanlı istek sayısı bunu aşarsa 503
+    contention_ms    - aynı anda işlenen diğer her istek için eklenen gecikme
+    max_batch_items  - daha fazla input'lu /api/embed istekleri 413 alır
+    legacy           - /api/embed 404 döner, sadece /api/embeddings çalışır
+
+    Backend için backend_fail_next kadar istek 503 ile cevaplanır.
+    """
+
+    def __init__(self, dim: int = 768, latency_ms: float = 0.0, per_item_ms: float = 0.0,
+                 fail_next: int = 0, fail_status: int = 503, max_concurrency: Optional[int] = None,
+                 contention_ms: float = 0.0, max_batch_items: Optional[int] = None, legacy: bool = False,
+                 backend_fail_next: int = 0):
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.per_item_ms = per_item_ms
+        self.fail_next = fail_next
+        self.fail_status = fail_status
+        self.max_concurrency = max_concurrency
+        self.contention_ms = contention_ms
+        self.max_batch_items = max_batch_items
+        self.legacy = legacy
+        self.backend_fail_next = backend_fail_next
+        self.embed_requests = 0
+        self.embedded_texts = 0
+        self.failed_requests = 0
+        self.backend_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeServices':
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Header ve body ayrı yazılıyor; Nagle + delayed ACK keep-alive isteklerine ~40ms ekler
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                status, payload = services.handle(self.path, body)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='fake-services', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle(self, path: str, body: dict):
+        if path in ('/api/embed', '/api/embeddings'):
+            with self._lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                concurrent = self.in_flight
+            try:
+                return self._handle_embed(path, body, concurrent)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+
+        if path.startswith('/api/question/'):
+            self._sleep(0)
+            with self._lock:
+                self.backend_requests += 1
+                if self.backend_fail_next > 0:
+                    self.backend_fail_next -= 1
+                    return 503, {'error': 'backend unavailable'}
+            return 200, {'success': True}
+
+        return 404, {'error': path}
+
+    def _handle_embed(self, path: str, body: dict, concurrent: int):
+        if path == '/api/embed' and self.legacy:
+            return 404, {'error': '404 page not found'}
+        with self._lock:
+            failing = self.fail_next > 0 or (self.max_concurrency is not None
+                                             and concurrent > self.max_concurrency)
+            if self.fail_next > 0:
+                self.fail_next -= 1
+            if failing:
+                self.failed_requests += 1
+        if failing:
+            self._sleep(0)
+            return self.fail_status, {'error': 'server busy'}
+
+        if path == '/api/embed':
+            texts = body.get('input') or []
+            texts = [texts] if isinstance(texts, str) else texts
+            if self.max_batch_items is not None and len(texts) > self.max_batch_items:
+                return 413, {'error': f"too many inputs: {len(texts)}"}
+            self._sleep(len(texts), concurrent)
+            with self._lock:
+                self.embed_requests += 1
+                self.embedded_texts += len(texts)
+            return 200, {'embeddings': [fake_embedding(text, self.dim).tolist() for text in texts]}
+
+        self._sleep(1, concurrent)
+        with self._lock:
+            self.embed_requests += 1
+            self.embedded_texts += 1
+        return 200, {'embedding': fake_embedding(body.get('prompt', ''), self.dim).tolist()}
+
+    def stats(self):
+        return {
+            'embed_requests': self.embed_requests,
+            'embedded_texts': self.embedded_texts,
+            'failed_requests': self.failed_requests,
+            'max_in_flight': self.max_in_flight,
+            'backend_requests': self.backend_requests
+        }
+
+    def _sleep(self, items: int, concurrent: int = 1):
+        delay = self.latency_ms + self.per_item_ms * items + self.contention_ms * (concurrent - 1)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
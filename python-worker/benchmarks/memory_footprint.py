@@ -0,0 +1,84 @@
+"""Eski dict/list vector temsili ile kolon bazlı segment store'un bellek karşılaştırması
+
+Kullanım:
+    python benchmarks/memory_footprint.py --chunks 5000 --dim 768
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from segment_store import SegmentStore
+
+
+def synthetic_chunks(count: int, dim: int, files: int, chunk_size: int, rng):
+    words = ['vektör', 'belge', 'arama', 'model', 'embedding', 'chunk', 'sorgu', 'dosya']
+    for i in range(count):
+        text = ' '.join(rng.choice(words, size=chunk_size // 7))[:chunk_size]
+        job_id = f"job-{i % files:05d}"
+        yield job_id, f"dosya-{i % files:05d}.pdf", f"/app/uploads/dosya-{i % files:05d}.pdf", i, text, \
+            rng.normal(size=dim).astype(np.float32)
+
+
+def legacy_bytes(chunks) -> int:
+    """Eski VectorStore.vectors listesinin (dict + boxed float listesi) Python heap kullanımı"""
+    tracemalloc.start()
+    vectors = []
+    for job_id, file_name, file_path, chunk_index, text, embedding in chunks:
+        vectors.append({
+            'id': f"{job_id}_{chunk_index}",
+            'document': text,
+            'embedding': embedding.tolist(),
+            'metadata': {
+                'job_id': job_id,
+                'file_name': file_name,
+                'file_path': file_path,
+                'chunk_index': chunk_index,
+                'chunk_size': len(text),
+                'created_at': datetime.utcnow().isoformat()
+            }
+        })
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=5000)
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--files', type=int, default=50)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    chunks = list(synthetic_chunks(args.chunks, args.dim, args.files, args.chunk_size,
+                                   np.random.default_rng(args.seed)))
+    legacy = legacy_bytes(chunks)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentStore(os.path.join(tmp, 'segments'))
+        for job_id, file_name, file_path, chunk_index, text, embedding in chunks:
+            store.append(job_id, file_name, file_path, chunk_index, text, embedding, 0.0)
+        columnar = store.memory_usage()
+        store.close()
+
+    print(json.dumps({
+        'chunks': args.chunks,
+        'dim': args.dim,
+        'legacy_bytes': legacy,
+        'legacy_bytes_per_chunk': round(legacy / args.chunks),
+        'columnar_bytes': columnar,
+        'columnar_bytes_per_chunk': round(columnar['total'] / args.chunks),
+        'reduction': round(legacy / columnar['total'], 2)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""Worker pipeline performans benchmark'ı (JSON çıktı)
+
+Bölümler:
+    extraction  - Markdown / PDF text extraction (MB/s, sayfa/s)
+    chunking    - chunk_text (chunk/s, MB/s)
+    pipeline    - RedisWorker.process_document uçtan uca (sahte Ollama/backend + fakeredis)
+    search      - 10k/100k/1M vector'de index ve search_similar p50/p99
+
+Kullanım:
+    python benchmarks/pipeline_bench.py --output results.json
+    python benchmarks/pipeline_bench.py --sections search --search-sizes 10000,100000 --dim 384
+    python benchmarks/compare.py baseline.json results.json
+
+pipeline bölümü için fakeredis gerekir (benchmarks/requirements.txt).
+"""
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corpus import make_corpus
+from fake_services import FakeServices, fake_embedding
+
+SECTIONS = ('extraction', 'chunking', 'pipeline', 'search')
+
+
+def percentiles(samples_ms):
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3),
+        'mean_ms': round(float(samples.mean()), 3)
+    }
+
+
+def bench_extraction(markdown_paths, pdf_paths):
+    from document_processor import DocumentProcessor
+    processor = DocumentProcessor()
+    results = {}
+    for label, paths in (('markdown', markdown_paths), ('pdf', pdf_paths)):
+        if not paths:
+            continue
+        input_bytes = sum(os.path.getsize(path) for path in paths)
+        text_bytes = 0
+        pages = 0
+        started = time.perf_counter()
+        for path in paths:
+            for page in processor.iter_pages(path):
+                text_bytes += len(page.encode('utf-8'))
+                pages += 1
+        seconds = time.perf_counter() - started
+        results[label] = {
+            'files': len(paths),
+            'input_mb': round(input_bytes / 1e6, 3),
+            'text_mb': round(text_bytes / 1e6, 3),
+            'pages': pages,
+            'seconds': round(seconds, 4),
+            'input_mb_per_s': round(input_bytes / 1e6 / seconds, 3),
+            'text_mb_per_s': round(text_bytes / 1e6 / seconds, 3),
+            'pages_per_s': round(pages / seconds, 1)
+        }
+    return results
+
+
+def bench_chunking(markdown_paths, pdf_paths, repeat: int = 3):
+    from document_processor import DocumentProcessor
+    processor = DocumentProcessor()
+    text = ''.join(page for path in markdown_paths + pdf_paths for page in processor.iter_pages(path))
+
+    best = None
+    chunks = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = processor.chunk_text(text)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return {
+        'text_mb': round(len(text.encode('utf-8')) / 1e6, 3),
+        'chunks': len(chunks),
+        'seconds': round(best, 4),
+        'chunks_per_s': round(len(chunks) / best, 1),
+        'mb_per_s': round(len(text.encode('utf-8')) / 1e6 / best, 3)
+    }
+
+
+def bench_pipeline(markdown_paths, pdf_paths, services: FakeServices, workdir: str):
+    try:
+        import fakeredis
+    except ImportError:
+        return {'skipped': 'fakeredis kurulu değil (pip install -r benchmarks/requirements.txt)'}
+
+    import worker
+    redis_server = fakeredis.FakeServer()
+    worker.redis.Redis = lambda **kwargs: fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+    os.environ['VECTORS_DIR'] = os.path.join(workdir, 'pipeline_vectors')
+
+    redis_worker = worker.RedisWorker()
+    paths = markdown_paths + pdf_paths
+    input_bytes = sum(os.path.getsize(path) for path in paths)
+    before = services.stats()
+
+    per_document = []
+    started = time.perf_counter()
+    for i, path in enumerate(paths):
+        document_started = time.perf_counter()
+        redis_worker.process_document(path, os.path.basename(path), f"bench-{i}")
+        per_document.append((time.perf_counter() - document_started) * 1000)
+    seconds = time.perf_counter() - started
+    redis_worker.log_sink.close()
+
+    chunks = redis_worker.vector_store.get_collection_stats()['total_documents']
+    embedded = services.stats()['embedded_texts'] - before['embedded_texts']
+    return {
+        'documents': len(paths),
+        'input_mb': round(input_bytes / 1e6, 3),
+        'chunks': chunks,
+        'embeddings': embedded,
+        'embed_requests': services.stats()['embed_requests'] - before['embed_requests'],
+        'backend_requests': services.stats()['backend_requests'] - before['backend_requests'],
+        'seconds': round(seconds, 4),
+        'mb_per_s': round(input_bytes / 1e6 / seconds, 3),
+        'chunks_per_s': round(chunks / seconds, 1),
+        'embeddings_per_s': round(embedded / seconds, 1),
+        'document_latency': percentiles(per_document)
+    }
+
+
+def bench_search(size: int, dim: int, queries: int, n_results: int, workdir: str, seed: int):
+    from segment_store import SegmentStore
+    from vector_store import VectorStore
+
+    vectors_dir = os.path.join(workdir, f"search_{size}")
+    rng = np.random.default_rng(seed)
+    store = SegmentStore(os.path.join(vectors_dir, 'segments'))
+    centers = rng.normal(size=(max(16, size // 500), dim)).astype(np.float32)
+    started = time.perf_counter()
+    for start in range(0, size, 8192):
+        count = min(8192, size - start)
+        block = centers[rng.integers(0, len(centers), size=count)] + \
+            0.35 * rng.normal(size=(count, dim)).astype(np.float32)
+        for i, vector in enumerate(block):
+            store.append(f"job-{(start + i) // 100}", 'bench.md', '/bench/bench.md', (start + i) % 100,
+                         '', vector, 0.0)
+    load_seconds = time.perf_counter() - started
+    store.close()
+
+    vector_store = VectorStore(vectors_dir)
+    query_texts = [f"benchmark sorgusu {i}" for i in range(queries)]
+    index = vector_store._search_index(None)
+
+    index_samples = []
+    for text in query_texts:
+        query = fake_embedding(text, dim)
+        started = time.perf_counter()
+        index.search(query, n_results)
+        index_samples.append((time.perf_counter() - started) * 1000)
+
+    search_samples = []
+    for text in query_texts:
+        started = time.perf_counter()
+        vector_store.search_similar(text, n_results)
+        search_samples.append((time.perf_counter() - started) * 1000)
+
+    return {
+        'vectors': size,
+        'dim': dim,
+        'queries': queries,
+        'n_results': n_results,
+        'index': type(index).__name__,
+        'load_seconds': round(load_seconds, 2),
+        'index_search': percentiles(index_samples),
+        'search_similar': percentiles(search_samples)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sections', default=','.join(SECTIONS))
+    parser.add_argument('--markdown-files', type=int, default=4)
+    parser.add_argument('--markdown-kb', type=int, default=256)
+    parser.add_argument('--pdf-files', type=int, default=2)
+    parser.add_argument('--pdf-pages', type=int, default=50)
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Sahte Ollama/backend istek gecikmesi')
+    parser.add_argument('--per-item-ms', type=float, default=0.5, help='Batch içindeki text başına ek gecikme')
+    parser.add_argument('--search-sizes', default='10000,100000,1000000')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--n-results', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='JSON sonucun yazılacağı dosya')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    sections = [section for section in args.sections.split(',') if section]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"Bilinmeyen bölüm: {', '.join(sorted(unknown))}")
+
+    services = FakeServices(dim=args.dim, latency_ms=args.latency_ms, per_item_ms=args.per_item_ms).start()
+    os.environ.update({
+        'OLLAMA_HOST': services.url,
+        'BACKEND_URL': services.url,
+        # Ölçüm embedding çağrılarını içersin diye kalıcı cache kapalı
+        'EMBEDDING_CACHE_MAX_ENTRIES': '0',
+    })
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args),
+            'env': {key: value for key, value in os.environ.items()
+                    if key.startswith(('VECTOR_', 'IVF_', 'EMBEDDING_', 'SEARCH_', 'LEXICAL_', 'PIPELINE_'))}
+        }
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        markdown_paths, pdf_paths = [], []
+        if {'extraction', 'chunking', 'pipeline'} & set(sections):
+            markdown_paths, pdf_paths = make_corpus(
+                os.path.join(workdir, 'corpus'),
+                markdown_files=args.markdown_files, markdown_bytes=args.markdown_kb * 1024,
+                pdf_files=args.pdf_files, pdf_pages=args.pdf_pages, seed=args.seed
+            )
+
+        if 'extraction' in sections:
+            report['extraction'] = bench_extraction(markdown_paths, pdf_paths)
+        if 'chunking' in sections:
+            report['chunking'] = bench_chunking(markdown_paths, pdf_paths)
+        if 'pipeline' in sections:
+            report['pipeline'] = bench_pipeline(markdown_paths, pdf_paths, services, workdir)
+        if 'search' in sections:
+            report['search'] = [
+                bench_search(int(size), args.dim, args.queries, args.n_results, workdir, args.seed)
+                for size in args.search_sizes.split(',') if size
+            ]
+
+    services.stop()
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
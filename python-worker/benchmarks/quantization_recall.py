@@ -0,0 +1,61 @@
+"""Quantized index (float16 / int8) bellek kazancı ve recall@k kaybı raporu
+
+Kullanım:
+    python benchmarks/quantization_recall.py --vectors 100000 --dim 768 --k 10
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from segment_store import SegmentStore
+from vector_store import FlatIndex, QuantizedIndex, QUANTIZATION_MODES
+from ann_recall import synthetic_embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vectors', type=int, default=50000)
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--metric', default='l2')
+    parser.add_argument('--modes', default=','.join(QUANTIZATION_MODES))
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = synthetic_embeddings(args.vectors + args.queries, args.dim, max(16, args.vectors // 500), rng)
+    data, queries = vectors[:args.vectors], vectors[args.vectors:]
+
+    reports = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentStore(os.path.join(tmp, 'segments'))
+        for i, vector in enumerate(data):
+            store.append('bench', 'bench.md', '/bench/bench.md', i, '', vector, 0.0)
+
+        exact_index = FlatIndex(store, metric=args.metric)
+        for mode in args.modes.split(','):
+            started = time.perf_counter()
+            index = QuantizedIndex(store, metric=args.metric, mode=mode)
+            build_seconds = time.perf_counter() - started
+
+            report = index.recall_report(queries, exact_index, k=args.k)
+            report.update({
+                'dim': args.dim,
+                'metric': args.metric,
+                'build_seconds': round(build_seconds, 3)
+            })
+            reports.append(report)
+        store.close()
+
+    print(json.dumps(reports, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Sharded (çok process'li) arama latency'si: shard sayısına göre p50/p99 ve hızlanma
+
+Kullanım:
+    python benchmarks/sharded_search.py --vectors 1000000 --dim 768 --shards 1,2,4,8,16,32
+
+Her shard sayısı için sonuçların FlatIndex ile aynı olduğu da kontrol edilir.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from segment_store import SegmentStore
+from vector_store import FlatIndex
+from sharded_search import ShardedIndex
+
+
+def measure(index, queries, k: int, metric: str):
+    samples = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(index.search(query, k, metric)[1])
+        samples.append((time.perf_counter() - started) * 1000)
+    samples = np.asarray(samples)
+    return {
+        'p50_ms': round(float(np.percentile(samples, 50)), 3),
+        'p99_ms': round(float(np.percentile(samples, 99)), 3)
+    }, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vectors', type=int, default=200000)
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--metric', default='l2')
+    parser.add_argument('--shards', default=','.join(str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)))
+    parser.add_argument('--stripe-rows', type=int, default=4096)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+
+    report = {'vectors': args.vectors, 'dim': args.dim, 'k': args.k, 'cpu_count': os.cpu_count(), 'runs': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SegmentStore(os.path.join(tmp, 'segments'))
+        for start in range(0, args.vectors, 8192):
+            block = rng.normal(size=(min(8192, args.vectors - start), args.dim)).astype(np.float32)
+            for i, vector in enumerate(block):
+                store.append('bench', 'bench.md', '/bench/bench.md', start + i, '', vector, 0.0)
+
+        baseline, expected = measure(FlatIndex(store, metric=args.metric), queries, args.k, args.metric)
+        report['flat'] = baseline
+
+        for shards in [int(value) for value in args.shards.split(',') if value]:
+            index = ShardedIndex(store, metric=args.metric, shards=shards, stripe_rows=args.stripe_rows).start()
+            index.search(queries[0], args.k, args.metric)  # layout + ilk map
+            latency, results = measure(index, queries, args.k, args.metric)
+            index.close()
+            latency.update({
+                'shards': shards,
+                'speedup': round(baseline['p50_ms'] / latency['p50_ms'], 2),
+                'exact': all(np.array_equal(a, b) for a, b in zip(expected, results))
+            })
+            report['runs'].append(latency)
+        store.close()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
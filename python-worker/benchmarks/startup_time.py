@@ -0,0 +1,113 @@
+"""Worker soğuk başlangıç süresi: import, VectorStore init ve index warm-up, bütçe kontrolü ile
+
+imports - temiz bir interpreter'da `import worker` süresi (medyan); PDF
+          kütüphaneleri (fitz, PyPDF2) yüklenmemiş olmalı
+init    - dolu bir store üzerinde VectorStore() süresi: bu süreden sonra
+          worker job alabilir
+ready   - arka plan warm-up'ının (BM25 + quantized index) bitmesi
+
+Bütçe aşılırsa veya PDF kütüphaneleri başlangıçta yüklenirse exit code 1
+döner (CI'da regresyon kontrolü olarak çalıştırılabilir).
+
+Kullanım:
+    python benchmarks/startup_time.py --vectors 100000 --import-budget-ms 800 --init-budget-ms 500
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+import numpy as np
+
+WORKER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, WORKER_DIR)
+
+IMPORT_PROBE = """
+import sys, json, time
+started = time.perf_counter()
+import worker
+print(json.dumps({
+    'seconds': time.perf_counter() - started,
+    'lazy_modules_loaded': sorted(name for name in ('fitz', 'pymupdf', 'PyPDF2') if name in sys.modules)
+}))
+"""
+
+INIT_PROBE = """
+import sys, json, time
+from vector_store import VectorStore
+started = time.perf_counter()
+store = VectorStore(sys.argv[1])
+init_seconds = time.perf_counter() - started
+store.wait_until_ready()
+print(json.dumps({
+    'init_seconds': init_seconds,
+    'ready_seconds': time.perf_counter() - started,
+    'rows': store.store.alive_count
+}))
+"""
+
+
+def run_probe(code: str, *args, env=None):
+    output = subprocess.run([sys.executable, '-c', code, *args], cwd=WORKER_DIR, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def fill_store(vectors_dir: str, vectors: int, dim: int, rng):
+    from segment_store import SegmentStore
+    vocabulary = [f"kelime{i}" for i in range(5000)]
+    store = SegmentStore(os.path.join(vectors_dir, 'segments'))
+    for start in range(0, vectors, 8192):
+        block = rng.normal(size=(min(8192, vectors - start), dim)).astype(np.float32)
+        for i, vector in enumerate(block):
+            text = ' '.join(rng.choice(vocabulary, size=120))
+            store.append(f"job{(start + i) // 100}", 'bench.md', '/bench/bench.md', (start + i) % 100, text, vector, 0.0)
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vectors', type=int, default=50000)
+    parser.add_argument('--dim', type=int, default=768)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quantization', default='int8')
+    parser.add_argument('--import-budget-ms', type=float, default=1000)
+    parser.add_argument('--init-budget-ms', type=float, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    imports = [run_probe(IMPORT_PROBE) for _ in range(args.repeat)]
+    report = {
+        'import_ms': round(statistics.median(probe['seconds'] for probe in imports) * 1000, 1),
+        'lazy_modules_loaded': imports[0]['lazy_modules_loaded']
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fill_store(tmp, args.vectors, args.dim, np.random.default_rng(args.seed))
+        env = dict(os.environ, LEXICAL_INDEX='true', VECTOR_QUANTIZATION=args.quantization,
+                   EMBEDDING_CACHE_MAX_ENTRIES='0', NEAR_DUPLICATE_THRESHOLD='0')
+        inits = [run_probe(INIT_PROBE, tmp, env=env) for _ in range(args.repeat)]
+    report.update({
+        'vectors': inits[0]['rows'],
+        'init_ms': round(statistics.median(probe['init_seconds'] for probe in inits) * 1000, 1),
+        'ready_ms': round(statistics.median(probe['ready_seconds'] for probe in inits) * 1000, 1),
+        'budget': {'import_ms': args.import_budget_ms, 'init_ms': args.init_budget_ms}
+    })
+
+    failures = []
+    if report['import_ms'] > args.import_budget_ms:
+        failures.append(f"import {report['import_ms']}ms > {args.import_budget_ms}ms")
+    if report['init_ms'] > args.init_budget_ms:
+        failures.append(f"init {report['init_ms']}ms > {args.init_budget_ms}ms")
+    if report['lazy_modules_loaded']:
+        failures.append(f"başlangıçta yüklenen PDF modülleri: {', '.join(report['lazy_modules_loaded'])}")
+    report['failures'] = failures
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import os
+import json
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ChunkManifestStore:
+    """Dosya bazında son başarılı job'ın chunk içerik hash'lerini tutan manifest deposu
+
+    Manifest, aynı dosya tekrar yüklendiğinde değişmeyen chunk'ların
+    embedding'lerinin önceki job'dan yeniden kullanılmasını sağlar.
+    """
+
+    def __init__(self, manifests_dir: str):
+        self.manifests_dir = manifests_dir
+        os.makedirs(manifests_dir, exist_ok=True)
+
+    @staticmethod
+    def chunk_hash(chunk_text: str) -> str:
+        return hashlib.sha256(chunk_text.encode('utf-8')).hexdigest()[:32]
+
+    def load(self, file_name: str) -> Optional[Dict[str, Any]]:
+        """Dosyanın manifest'ini döndür (yoksa veya okunamazsa None)"""
+        try:
+            with open(self._path(file_name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Manifest okuma hatası {file_name}: {e}")
+            return None
+
+    def save(self, file_name: str, job_id: str, chunk_hashes: List[str]):
+        """Manifest'i atomik olarak yaz"""
+        manifest = {
+            'file_name': file_name,
+            'job_id': job_id,
+            'chunks': chunk_hashes
+        }
+        path = self._path(file_name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def _path(self, file_name: str) -> str:
+        name_hash = hashlib.sha1(file_name.encode('utf-8')).hexdigest()
+        return os.path.join(self.manifests_dir, f"{name_hash}.json")
@@ -1,13 +1,15 @@
 import os
 import re
 import logging
-from typing import List, Optional
-import PyPDF2
-import fitz  # PyMuPDF
-import markdown
+from collections import deque
+from typing import Callable, Dict, List, Optional, Iterable, Iterator, Tuple
+from markdown_text import SectionStart, iter_markdown_blocks
 
 logger = logging.getLogger(__name__)
 
+# Temizlenmiş parça akışında başlık sınırı işareti (text değildir)
+SECTION_BREAK = object()
+
 class DocumentProcessor:
     def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
         self.chunk_size = chunk_size
@@ -29,18 +31,158 @@ class DocumentProcessor:
             logger.error(f"Text extraction hatası {file_path}: {e}")
             return None
     
+    def iter_pages(self, file_path: str, start_page: int = 0) -> Iterator[str]:
+        """Dosyayı sayfa sayfa (ham text) üret; bellekte tüm doküman tutulmaz
+        
+        start_page sadece PDF için geçerlidir (sayfa aralığı sub-job'ları).
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+        
+        if file_ext == '.pdf':
+            yield from self._iter_pdf_pages(file_path, start_page)
+        elif file_ext == '.md':
+            yield from self._iter_markdown_blocks(file_path)
+        else:
+            logger.warning(f"Desteklenmeyen dosya tipi: {file_ext}")
+    
+    def _iter_markdown_blocks(self, file_path: str) -> Iterator[str]:
+        """Markdown dosyasını satır satır okuyup düz text blokları üret (başlıklar SectionStart)"""
+        with open(file_path, 'r', encoding='utf-8') as file:
+            yield from iter_markdown_blocks(file)
+    
+    def _iter_pdf_pages(self, file_path: str, start_page: int = 0) -> Iterator[str]:
+        """PDF sayfalarını PyMuPDF ile üret, açılamazsa PyPDF2'ye düş"""
+        try:
+            # PDF kütüphaneleri ilk PDF'te yüklenir; worker başlangıcını yavaşlatmaz
+            import fitz  # PyMuPDF
+            doc = fitz.open(file_path)
+        except Exception as e:
+            logger.error(f"PDF açma hatası (PyMuPDF), PyPDF2 deneniyor: {e}")
+            import PyPDF2
+            with open(file_path, 'rb') as file:
+                for page in PyPDF2.PdfReader(file).pages[start_page:]:
+                    yield page.extract_text() or ""
+            return
+        
+        try:
+            for page_num in range(start_page, doc.page_count):
+                yield doc[page_num].get_text()
+        finally:
+            doc.close()
+    
+    def pdf_page_count(self, file_path: str) -> int:
+        import fitz  # PyMuPDF
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+    
+    def plan_page_ranges(self, page_count: int, range_pages: int) -> List[Dict[str, int]]:
+        """Sayfaları range_pages sayfalık [start_page, end_page) aralıklarına böl
+        
+        Sadece sayfa sayısı kullanılır; text çıkarma ve chunk'lama her aralığın
+        sub-job'ında yapılır (bkz. iter_chunks end_page).
+        """
+        range_pages = max(1, range_pages)
+        return [
+            {'start_page': start, 'end_page': min(start + range_pages, page_count)}
+            for start in range(0, page_count, range_pages)
+        ]
+    
+    def iter_chunks(self, pages: Iterable[str],
+                    instrument: Optional[Callable[[Iterable[str], str], Iterator[str]]] = None,
+                    start_page: int = 0, end_page: Optional[int] = None) -> Iterator[str]:
+        """Sayfa akışını temizleyip chunk'lara böl
+        
+        Sonuç chunk_text(_clean_text(tüm sayfalar)) ile aynıdır; overlap sayfa
+        sınırlarının ötesine taşınır ve bellekte sadece chunk penceresi tutulur.
+        Tek fark Markdown başlıklarıdır (SectionStart): chunk, pencerenin ikinci
+        yarısına düşen başlıkta bitirilir ve sonraki chunk başlıktan başlar.
+        instrument verilirse 'clean' ve 'chunk' aşamaları onunla sarmalanır
+        (ör. JobTimings.iterate).
+        
+        end_page sayfa aralığı sub-job'ları içindir: pages start_page'den
+        başlar ve sadece başlangıcı end_page'den önceki sayfaların text'ine
+        düşen chunk'lar üretilir. Aralığın son chunk'ı sonraki sayfalardan
+        gerektiği kadar okuyarak tamamlanır; sonraki aralık kendi ilk
+        sayfasından başladığı için sınırdaki text overlap'lı olarak kaplanır.
+        """
+        limit = None
+        if end_page is not None:
+            pages, limit = self._page_limit(pages, start_page, end_page)
+        pieces = self._iter_clean_pieces(pages)
+        if limit is not None:
+            pieces = limit(pieces)
+        stop = (lambda: limit.position) if limit is not None else None
+        if instrument is None:
+            return self._chunk_stream(pieces, stop)
+        return instrument(self._chunk_stream(instrument(pieces, 'clean'), stop), 'chunk')
+    
+    @staticmethod
+    def _page_limit(pages: Iterable[str], start_page: int, end_page: int):
+        """Sayfa akışını ve end_page'in text'teki başlangıç pozisyonunu izleyen sarmalayıcıyı döndür"""
+        class Limit:
+            page = start_page - 1
+            position = None  # end_page'in ilk parçası görülene kadar None
+            
+            def __call__(self, pieces):
+                length = 0
+                for piece in pieces:
+                    if piece is not SECTION_BREAK:
+                        if self.position is None and self.page >= end_page:
+                            self.position = length
+                        length += len(piece)
+                    yield piece
+        
+        limit = Limit()
+        
+        def counted():
+            for limit.page, page in enumerate(pages, start_page):
+                yield page
+        
+        return counted(), limit
+    
+    def _iter_clean_pieces(self, pages: Iterable[str]) -> Iterator[str]:
+        """Sayfaları _clean_text semantiğiyle temizle
+        
+        Sayfa sınırındaki boşluklar tek boşluğa indirilir; dokümanın başındaki
+        ve sonundaki boşluklar hiç üretilmez. SectionStart sayfalarının önüne
+        (doküman başı hariç) SECTION_BREAK konur.
+        """
+        pending_space = False
+        pending_break = False
+        started = False
+        
+        for page in pages:
+            pending_break = pending_break or isinstance(page, SectionStart)
+            piece = re.sub(r'\s+', ' ', page)
+            if piece.startswith(' '):
+                pending_space = True
+                piece = piece[1:]
+            if not piece:
+                continue
+            
+            trailing_space = piece.endswith(' ')
+            if trailing_space:
+                piece = piece[:-1]
+            
+            if started and pending_space:
+                yield ' '
+            if started and pending_break:
+                yield SECTION_BREAK
+            pending_break = False
+            yield piece
+            started = True
+            pending_space = trailing_space
+    
     def _extract_pdf_text(self, file_path: str) -> Optional[str]:
         """PDF'den text çıkar"""
         try:
             # PyMuPDF ile text extraction (daha iyi sonuç)
+            import fitz  # PyMuPDF
             doc = fitz.open(file_path)
-            text_content = ""
-            
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                text_content += page.get_text()
-            
-            doc.close()
+            try:
+                text_content = "".join(doc[page_num].get_text() for page_num in range(doc.page_count))
+            finally:
+                doc.close()
             
             # Text cleaning
             text_content = self._clean_text(text_content)
@@ -51,12 +193,10 @@ class DocumentProcessor:
             logger.error(f"PDF text extraction hatası: {e}")
             # Fallback: PyPDF2
             try:
+                import PyPDF2
                 with open(file_path, 'rb') as file:
                     pdf_reader = PyPDF2.PdfReader(file)
-                    text_content = ""
-                    
-                    for page in pdf_reader.pages:
-                        text_content += page.extract_text()
+                    text_content = "".join(page.extract_text() for page in pdf_reader.pages)
                     
                     text_content = self._clean_text(text_content)
                     logger.info(f"PDF text extraction (PyPDF2) tamamlandı: {len(text_content)} karakter")
@@ -69,14 +209,7 @@ class DocumentProcessor:
     def _extract_markdown_text(self, file_path: str) -> Optional[str]:
         """Markdown dosyasından text çıkar"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                markdown_content = file.read()
-            
-            # Markdown'ı HTML'e çevir
-            html = markdown.markdown(markdown_content)
-            
-            # HTML tag'lerini temizle
-            text_content = re.sub(r'<[^>]+>', '', html)
+            text_content = "\n".join(self._iter_markdown_blocks(file_path))
             
             # Text cleaning
             text_content = self._clean_text(text_content)
@@ -105,37 +238,109 @@ class DocumentProcessor:
         if not text:
             return []
         
-        chunks = []
+        chunks = list(self._chunk_stream([text]))
+        
+        logger.info(f"Text {len(chunks)} chunk'a bölündü")
+        return chunks
+    
+    def _chunk_stream(self, pieces: Iterable[str],
+                      stop: Optional[Callable[[], Optional[int]]] = None) -> Iterator[str]:
+        for _, chunk in self._chunk_spans(pieces, stop):
+            yield chunk
+    
+    def _chunk_spans(self, pieces: Iterable[str],
+                     stop: Optional[Callable[[], Optional[int]]] = None) -> Iterator[Tuple[int, str]]:
+        """Art arda gelen text parçalarını (başlangıç pozisyonu, chunk) çiftlerine böl
+        
+        Pozisyonlar dokümandaki mutlak offset'lerdir; buffer sadece henüz
+        tamamlanmamış chunk'ın başından itibaren tutulur. SECTION_BREAK
+        parçaları bölüm sınırı ipucu olarak kaydedilir. stop() bir pozisyon
+        döndürdüğünde başlangıcı ona ulaşan chunk üretilmez ve kalan parçalar
+        okunmaz.
+        """
+        buffer = ""
+        offset = 0  # buffer[0]'ın mutlak pozisyonu
         start = 0
+        breaks = deque()  # henüz geçilmemiş bölüm sınırlarının mutlak pozisyonları
         
-        while start < len(text):
-            # Chunk sonunu belirle
-            end = start + self.chunk_size
+        def stopped() -> bool:
+            limit = stop() if stop is not None else None
+            return limit is not None and start >= limit
+        
+        for piece in pieces:
+            if piece is SECTION_BREAK:
+                breaks.append(offset + len(buffer))
+                continue
+            buffer += piece
+            
+            # Chunk sonu bilinen text'in içindeyse bu son chunk olamaz
+            while start + self.chunk_size < offset + len(buffer):
+                if stopped():
+                    return
+                chunk_start = start
+                chunk, start = self._next_chunk(buffer, offset, start, breaks)
+                if chunk:
+                    yield chunk_start, chunk
             
-            if end >= len(text):
+            if stopped():
+                return
+            if start > offset:
+                buffer = buffer[start - offset:]
+                offset = start
+        
+        text_length = offset + len(buffer)
+        while start < text_length and not stopped():
+            if start + self.chunk_size >= text_length and self._section_break(breaks, start) is None:
                 # Son chunk
-                chunk = text[start:]
-                if chunk.strip():
-                    chunks.append(chunk.strip())
+                chunk = buffer[start - offset:].strip()
+                if chunk:
+                    yield start, chunk
                 break
             
+            chunk_start = start
+            chunk, start = self._next_chunk(buffer, offset, start, breaks)
+            if chunk:
+                yield chunk_start, chunk
+    
+    def _section_break(self, breaks: Optional[deque], start: int) -> Optional[int]:
+        """Pencerenin ikinci yarısındaki son bölüm sınırı (yoksa None)
+        
+        start'ın gerisinde kalan sınırlar atılır. Kısa bölümler bir sonraki
+        bölümle aynı chunk'ta kalır.
+        """
+        if not breaks:
+            return None
+        while breaks and breaks[0] <= start:
+            breaks.popleft()
+        found = None
+        for position in breaks:
+            if position > start + self.chunk_size:
+                break
+            if position - start >= self.chunk_size // 2:
+                found = position
+        return found
+    
+    def _next_chunk(self, buffer: str, offset: int, start: int, breaks: Optional[deque] = None):
+        """start'tan başlayan (son olmayan) chunk'ı ve sonraki start'ı döndür"""
+        # Chunk sonunu belirle
+        end = start + self.chunk_size
+        
+        # Başlık sınırında böl; yeni bölüm önceki bölümden overlap almaz
+        boundary = self._section_break(breaks, start)
+        if boundary is not None:
+            return buffer[start - offset:boundary - offset].strip(), boundary
+        
+        # Kelime sınırında böl
+        chunk = buffer[start - offset:end - offset]
+        last_space = chunk.rfind(' ')
+        
+        if last_space > start + self.chunk_size // 2:
             # Kelime sınırında böl
-            chunk = text[start:end]
-            last_space = chunk.rfind(' ')
-            
-            if last_space > start + self.chunk_size // 2:
-                # Kelime sınırında böl
-                chunk = text[start:start + last_space]
-                start = start + last_space + 1
-            else:
-                # Kelime sınırı bulunamadı, zorla böl
-                start = end
-            
-            if chunk.strip():
-                chunks.append(chunk.strip())
-            
-            # Overlap için start'ı geri al
-            start = max(0, start - self.chunk_overlap)
+            chunk = chunk[:last_space]
+            start = start + last_space + 1
+        else:
+            # Kelime sınırı bulunamadı, zorla böl
+            start = end
         
-        logger.info(f"Text {len(chunks)} chunk'a bölündü")
-        return chunks
+        # Overlap için start'ı geri al
+        return chunk.strip(), max(0, start - self.chunk_overlap)
@@ -0,0 +1,142 @@
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+import numpy as np
+from typing import List, Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """(embedding model, chunk text hash) -> embedding eşlemesini diskte tutan LRU cache"""
+
+    def __init__(self, cache_dir: str, max_entries: int = 200000):
+        self.cache_dir = cache_dir
+        self.max_entries = max(1, max_entries)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.db_path = os.path.join(cache_dir, 'embeddings.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used INTEGER NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+
+        count, clock = self._conn.execute("SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()
+        self._count = count
+        self._clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        logger.info(f"Embedding cache açıldı: {self.db_path} ({count} kayıt)")
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Cache'teki embedding'i döndür, yoksa None"""
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Text listesi için cache'teki embedding'leri döndür (bulunamayanlar None)"""
+        hashes = [self.text_hash(text) for text in texts]
+        found = {}
+
+        with self._lock:
+            unique_hashes = list(dict.fromkeys(hashes))
+            # SQLite parametre limitinin altında kal
+            for start in range(0, len(unique_hashes), 500):
+                batch = unique_hashes[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                self._clock += 1
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(self._clock, model, text_hash) for text_hash in found]
+                )
+
+            results = []
+            for text_hash in hashes:
+                blob = found.get(text_hash)
+                if blob is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    results.append(np.frombuffer(blob, dtype=np.float32).tolist())
+
+        return results
+
+    def put(self, model: str, text: str, embedding: List[float]):
+        """Embedding'i cache'e yaz"""
+        self.put_many(model, [text], [embedding])
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]):
+        """Birden fazla embedding'i tek transaction'da cache'e yaz"""
+        if not texts:
+            return
+
+        with self._lock:
+            self._clock += 1
+            rows = [
+                (model, self.text_hash(text), np.asarray(embedding, dtype=np.float32).tobytes(), self._clock)
+                for text, embedding in zip(texts, embeddings)
+            ]
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute("COMMIT")
+            self._count += self._conn.total_changes - before
+
+            if self._count > self.max_entries:
+                self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss sayaçları (hit sayısı = kazanılan Ollama çağrısı)"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': self._count,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        """En az kullanılan kayıtları sil, her seferinde %10 pay bırak"""
+        target = int(self.max_entries * 0.9)
+        excess = self._count - target
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN ("
+            " SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,)
+        )
+        self._count -= excess
+        self.evictions += excess
+        logger.info(f"Embedding cache LRU temizliği: {excess} kayıt silindi")
@@ -0,0 +1,315 @@
+import time
+import random
+import logging
+import threading
+import requests
+import metrics
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingError(Exception):
+    """Embedding tüm denemelere rağmen oluşturulamadı"""
+
+
+class EmbeddingUnavailableError(EmbeddingError):
+    """Circuit breaker açık: Ollama şu an istek kabul etmiyor"""
+
+
+class EmbeddingRejectedError(EmbeddingError):
+    """Ollama isteği reddetti (4xx veya geçersiz yanıt); aynı istek tekrar denense de sonuç değişmez"""
+
+
+class _RetryableError(Exception):
+    """Tekrar denenebilir hata (429/5xx, timeout, bağlantı hatası)"""
+
+
+class CircuitBreaker:
+    """Ardışık başarısız isteklerden sonra Ollama'ya istek göndermeyi durdurur
+
+    closed: normal. failure_threshold ardışık hatadan sonra open olur ve
+    reset_timeout boyunca tüm istekler hemen reddedilir. Süre dolunca
+    half_open: tek bir deneme isteğine izin verilir, diğerleri sonucunu
+    bekler; başarılıysa closed, değilse tekrar open.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._condition = threading.Condition()
+        self.opened = 0
+
+    def allow(self, wait_timeout: float = 0) -> bool:
+        """İstek gönderilebilir mi; half_open'da deneme isteğinin sonucu en fazla wait_timeout beklenir"""
+        deadline = time.monotonic() + wait_timeout
+        with self._condition:
+            while True:
+                if self.state == 'closed':
+                    return True
+                if self.state == 'open':
+                    if time.monotonic() - self._opened_at < self.reset_timeout:
+                        return False
+                    self.state = 'half_open'
+                    self._probe_in_flight = False
+                if not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+
+    def is_open(self) -> bool:
+        with self._condition:
+            return self.state == 'open' and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def record_success(self):
+        with self._condition:
+            if self.state != 'closed':
+                logger.info("Embedding circuit breaker kapandı, Ollama tekrar erişilebilir")
+            self.state = 'closed'
+            self._failures = 0
+            self._probe_in_flight = False
+            self._condition.notify_all()
+
+    def record_failure(self):
+        with self._condition:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == 'half_open' or self._failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.opened += 1
+                    logger.error(f"Embedding circuit breaker açıldı ({self._failures} ardışık hata), "
+                                 f"{self.reset_timeout:g}s istek gönderilmeyecek")
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+            self._condition.notify_all()
+
+
+class AdaptiveLimiter:
+    """AIMD ile ayarlanan eşzamanlı istek limiti
+
+    Başarılı ve hızlı her istekte limit 1/limit artar (her "tur" başına ~+1).
+    Aşırı yük işaretinde (429/503, timeout veya text başına gecikmenin
+    gözlenen en iyi değerin latency_tolerance katını aşması) limit yarıya
+    iner. Tek bir yük patlamasındaki eşzamanlı hatalar limiti sıfıra
+    indirmesin diye azaltma en fazla cooldown saniyede bir yapılır.
+    """
+
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 8,
+                 latency_tolerance: float = 2.0, cooldown: float = 1.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.in_flight = 0
+        # Text başına en iyi gecikme; yavaşça yukarı kayar ki eski ölçüm sonsuza kadar baz olmasın
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        self.increases = 0
+        self.decreases = 0
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency_per_item: Optional[float] = None, overloaded: bool = False):
+        with self._condition:
+            self.in_flight -= 1
+            if latency_per_item is not None and not overloaded:
+                if self._baseline is None or latency_per_item < self._baseline:
+                    self._baseline = latency_per_item
+                else:
+                    self._baseline *= 1.01
+                overloaded = latency_per_item > self._baseline * self.latency_tolerance
+
+            now = time.monotonic()
+            if overloaded:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(float(self.minimum), self.limit / 2)
+                    self._last_decrease = now
+                    self.decreases += 1
+            elif latency_per_item is not None:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+                self.increases += 1
+            self._condition.notify_all()
+
+
+class OllamaEmbeddingClient:
+    """Ollama için eşzamanlı, geri basınçlı (backpressure) embedding istemcisi
+
+    Text listesi request_batch_size'lık isteklere bölünür ve istekler
+    AdaptiveLimiter'ın izin verdiği kadar paralel gönderilir. Tekrar
+    denenebilir hatalar jitter'lı exponential backoff ile tekrarlanır;
+    ardışık başarısız istekler CircuitBreaker'ı açar. Reddedilen bir
+    batch'in text'leri tek tek denenir. Başarısızlıkta EmbeddingError
+    fırlatılır, sahte embedding dönülmez.
+    """
+
+    def __init__(self, host: str, model: str, request_batch_size: int = 16, max_concurrency: int = 8,
+                 initial_concurrency: int = 2, max_retries: int = 3, backoff_seconds: float = 0.5,
+                 timeout: float = 60, latency_tolerance: float = 2.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        self.host = host
+        self.model = model
+        self.request_batch_size = max(1, request_batch_size)
+        self.max_retries = max(0, max_retries)
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.limiter = AdaptiveLimiter(initial_concurrency, 1, max_concurrency, latency_tolerance)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        # Eski Ollama sürümlerinde /api/embed yok; 404 alınınca tek text'lik /api/embeddings kullanılır
+        self._legacy_endpoint = False
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(4, max_concurrency))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.limiter.maximum, thread_name_prefix='embed')
+
+        self.requests = 0
+        self.retries = 0
+        self.failed_requests = 0
+        self.rejected_requests = 0
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Text'lerin embedding'lerini sırayla döndür; biri bile başarısızsa EmbeddingError"""
+        if not texts:
+            return []
+        if self.breaker.is_open():
+            self.rejected_requests += 1
+            raise EmbeddingUnavailableError("Embedding servisi geçici olarak devre dışı (circuit breaker açık)")
+
+        batches = [texts[start:start + self.request_batch_size]
+                   for start in range(0, len(texts), self.request_batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        # Job'ın 'embed' stage'i bekleme süresini zaten ölçer; embed thread'lerinde
+        # aktif job yok, sadece operation histogramı güncellenir
+        futures = [self._executor.submit(self._embed_batch, batch) for batch in batches]
+        embeddings = []
+        for future in futures:
+            embeddings.extend(future.result())
+        return embeddings
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'concurrency_limit': round(self.limiter.limit, 2),
+            'in_flight': self.limiter.in_flight,
+            'concurrency_increases': self.limiter.increases,
+            'concurrency_decreases': self.limiter.decreases,
+            'circuit_state': self.breaker.state,
+            'circuit_opened': self.breaker.opened,
+            'requests': self.requests,
+            'retries': self.retries,
+            'failed_requests': self.failed_requests,
+            'rejected_requests': self.rejected_requests
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Batch reddedilirse (ör. tek bir text modelin bağlam sınırını aşıyorsa) text'leri tek tek dene"""
+        try:
+            return self._embed_with_retry(texts)
+        except EmbeddingRejectedError as e:
+            if len(texts) == 1:
+                raise
+            logger.warning(f"Toplu embedding başarısız ({len(texts)} text), tek tek deneniyor: {e}")
+        return [self._embed_with_retry([text])[0] for text in texts]
+
+    def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                time.sleep(self.backoff_seconds * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+            if not self.breaker.allow(self.timeout):
+                self.rejected_requests += 1
+                raise EmbeddingUnavailableError(
+                    f"Embedding servisi geçici olarak devre dışı (circuit breaker açık), son hata: {last_error}")
+
+            self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                embeddings = self._post(texts)
+            except _RetryableError as e:
+                self.limiter.release(overloaded=True)
+                self.breaker.record_failure()
+                last_error = str(e)
+                continue
+            except EmbeddingError:
+                self.limiter.release()
+                # İstek reddedildi ama servis ayakta
+                self.breaker.record_success()
+                self.failed_requests += 1
+                raise
+            self.limiter.release((time.perf_counter() - started) / len(texts))
+            self.breaker.record_success()
+            return embeddings
+
+        self.failed_requests += 1
+        raise EmbeddingError(f"{len(texts)} text için embedding {self.max_retries + 1} denemede "
+                             f"oluşturulamadı: {last_error}")
+
+    def _post(self, texts: List[str]) -> List[List[float]]:
+        self.requests += 1
+        if self._legacy_endpoint:
+            return [self._post_single(text) for text in texts]
+
+        with metrics.stage('embed', 'embed_batch'):
+            result = self._request('/api/embed', {'model': self.model, 'input': texts},
+                                   self.timeout + 2 * len(texts))
+        if result is None:
+            logger.warning("Ollama /api/embed desteklemiyor, /api/embeddings kullanılacak")
+            self._legacy_endpoint = True
+            return [self._post_single(text) for text in texts]
+
+        embeddings = result.get('embeddings')
+        if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+            count = len(embeddings) if isinstance(embeddings, list) else 0
+            raise EmbeddingRejectedError(f"Beklenen {len(texts)} embedding, gelen {count}")
+        return embeddings
+
+    def _post_single(self, text: str) -> List[float]:
+        with metrics.stage('embed', 'embed_single'):
+            result = self._request('/api/embeddings', {'model': self.model, 'prompt': text}, self.timeout)
+        if not result or not result.get('embedding'):
+            raise EmbeddingRejectedError("Ollama boş embedding döndürdü")
+        return result['embedding']
+
+    def _request(self, path: str, payload: Dict[str, Any], timeout: float) -> Optional[Dict[str, Any]]:
+        """POST at; 404'te None döner, tekrar denenebilir hatalarda _RetryableError"""
+        try:
+            response = self.session.post(f"{self.host}{path}", json=payload, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            raise _RetryableError(str(e)) from e
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableError(f"HTTP {response.status_code}")
+        if response.status_code == 404 and path == '/api/embed' and 'model' not in response.text.lower():
+            return None
+        if response.status_code >= 400:
+            # İstemci hatası (ör. bilinmeyen model): tekrar denemek sonucu değiştirmez
+            raise EmbeddingRejectedError(f"Ollama isteği reddetti: HTTP {response.status_code} - {response.text[:200]}")
+        try:
+            return response.json()
+        except ValueError as e:
+            raise EmbeddingRejectedError(f"Ollama geçersiz yanıt döndürdü: {e}") from e
@@ -0,0 +1,213 @@
+import re
+import math
+import logging
+import numpy as np
+from typing import List, Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tanımlayıcıları (ERR-404, foo_bar.baz, v1.2.3) tek token olarak yakalar
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./:]\w+)*")
+PART_SEPARATORS = re.compile(r"[-./:_]+")
+POSTING_BLOCK_SIZE = 128
+
+
+def tokenize(text: str) -> List[str]:
+    """Küçük harfli token'lar; birleşik tanımlayıcılar parçalarıyla birlikte döner"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        parts = PART_SEPARATORS.split(token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+    return tokens
+
+
+def _smallest_uint(max_value: int):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+class _PostingList:
+    """Bir terimin (satır, tf) listesi
+
+    Satırlar artan sırada eklenir. Her POSTING_BLOCK_SIZE kayıt, ilk satır +
+    en küçük uygun uint tipinde delta dizisi olarak sıkıştırılır; son blok
+    sıkıştırılana kadar Python listesinde bekler.
+    """
+
+    __slots__ = ('blocks', 'tail_rows', 'tail_tfs', 'count')
+
+    def __init__(self):
+        self.blocks = []
+        self.tail_rows = []
+        self.tail_tfs = []
+        self.count = 0
+
+    def add(self, row: int, tf: int):
+        self.tail_rows.append(row)
+        self.tail_tfs.append(tf)
+        self.count += 1
+        if len(self.tail_rows) >= POSTING_BLOCK_SIZE:
+            self._freeze()
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Tüm posting'leri (rows, tfs) dizileri olarak aç"""
+        rows = []
+        tfs = []
+        for first_row, deltas, block_tfs in self.blocks:
+            block_rows = np.empty(len(deltas) + 1, dtype=np.int64)
+            block_rows[0] = first_row
+            np.cumsum(deltas, out=block_rows[1:])
+            block_rows[1:] += first_row
+            rows.append(block_rows)
+            tfs.append(block_tfs)
+        if self.tail_rows:
+            rows.append(np.array(self.tail_rows, dtype=np.int64))
+            tfs.append(np.array(self.tail_tfs, dtype=np.uint16))
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint16)
+        return np.concatenate(rows), np.concatenate(tfs).astype(np.float32)
+
+    def nbytes(self) -> int:
+        return sum(8 + deltas.nbytes + tfs.nbytes for _, deltas, tfs in self.blocks) + 16 * len(self.tail_rows)
+
+    def _freeze(self):
+        rows = np.array(self.tail_rows, dtype=np.int64)
+        deltas = np.diff(rows)
+        tfs = np.minimum(np.array(self.tail_tfs), np.iinfo(np.uint16).max)
+        self.blocks.append((
+            int(rows[0]),
+            deltas.astype(_smallest_uint(int(deltas.max()) if len(deltas) else 0)),
+            tfs.astype(_smallest_uint(int(tfs.max())))
+        ))
+        self.tail_rows = []
+        self.tail_tfs = []
+
+
+class LexicalIndex:
+    """Chunk text'leri üzerinde artımlı BM25 inverted index
+
+    Satırlar SegmentStore'un global satır numaralarıdır ve artan sırada
+    eklenir. Silinen satırlar posting'lerden çıkarılmaz, canlılık maskesiyle
+    elenir; compaction'da posting'ler yeni satır numaralarıyla yeniden yazılır.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, _PostingList] = {}
+        self._doc_lengths = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self.doc_count = 0
+        self.total_length = 0.0
+
+    def build_range(self, store, start: int, end: int):
+        """Store'un [start, end) aralığındaki canlı satırlarını ekle (VectorStore arka plan warm-up'ı)"""
+        rows = np.arange(start, end)
+        for record in store.iter_records(rows[store.get_field(rows, 'deleted') == 0]):
+            self.add(record.row, record.text)
+
+    def add(self, row: int, text: str):
+        tokens = tokenize(text)
+        if row >= len(self._doc_lengths):
+            capacity = max(row + 1, 2 * len(self._doc_lengths), 1024)
+            self._doc_lengths = np.concatenate([self._doc_lengths, np.zeros(capacity - len(self._doc_lengths), dtype=np.float32)])
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+
+        frequencies: Dict[str, int] = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for token, tf in frequencies.items():
+            posting_list = self.postings.get(token)
+            if posting_list is None:
+                posting_list = self.postings[token] = _PostingList()
+            posting_list.add(row, tf)
+
+        self._doc_lengths[row] = len(tokens)
+        self._alive[row] = True
+        self.doc_count += 1
+        self.total_length += len(tokens)
+
+    def remove(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[(rows < len(self._alive))]
+        rows = rows[self._alive[rows]]
+        self._alive[rows] = False
+        self.doc_count -= len(rows)
+        self.total_length -= float(self._doc_lengths[rows].sum())
+
+    def apply_remap(self, remap: np.ndarray):
+        """Compaction sonrası eski -> yeni satır eşlemesini posting'lere uygula"""
+        size = len(remap)
+        kept = np.flatnonzero((remap >= 0) & self._alive[:size])
+        doc_lengths = np.zeros(max(int(remap.max()) + 1 if len(remap) else 0, 1024), dtype=np.float32)
+        alive = np.zeros(len(doc_lengths), dtype=bool)
+        doc_lengths[remap[kept]] = self._doc_lengths[kept]
+        alive[remap[kept]] = True
+
+        postings = {}
+        for token, posting_list in self.postings.items():
+            rows, tfs = posting_list.arrays()
+            rows = rows[rows < size]
+            new_rows = remap[rows]
+            selected = (new_rows >= 0) & self._alive[rows]
+            if not selected.any():
+                continue
+            rebuilt = _PostingList()
+            for row, tf in zip(new_rows[selected].tolist(), tfs[selected].astype(np.int64).tolist()):
+                rebuilt.add(row, tf)
+            postings[token] = rebuilt
+
+        self.postings = postings
+        self._doc_lengths = doc_lengths
+        self._alive = alive
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """BM25 ile en iyi k satır: (scores, rows, eşleşen sorgu terimi sayısı)"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        empty = (np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        if not terms or not self.doc_count or k <= 0:
+            return empty
+
+        average_length = self.total_length / self.doc_count
+        all_rows = []
+        all_scores = []
+        for term in terms:
+            posting_list = self.postings.get(term)
+            if posting_list is None:
+                continue
+            rows, tfs = posting_list.arrays()
+            alive = self._alive[rows]
+            rows, tfs = rows[alive], tfs[alive]
+            if not len(rows):
+                continue
+            idf = math.log(1.0 + (self.doc_count - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self._doc_lengths[rows] / average_length)
+            all_rows.append(rows)
+            all_scores.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+
+        if not all_rows:
+            return empty
+
+        unique_rows, inverse = np.unique(np.concatenate(all_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores)).astype(np.float32)
+        matched_terms = np.bincount(inverse)
+
+        k = min(k, len(unique_rows))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(unique_rows) else np.arange(len(unique_rows))
+        # Eşit skorlarda önce eklenen satır
+        top = top[np.lexsort((unique_rows[top], -scores[top]))]
+        return scores[top], unique_rows[top], matched_terms[top]
+
+    def query_term_count(self, query: str) -> int:
+        return len(dict.fromkeys(tokenize(query)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'documents': self.doc_count,
+            'terms': len(self.postings),
+            'postings_bytes': sum(posting_list.nbytes() for posting_list in self.postings.values())
+        }
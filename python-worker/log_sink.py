@@ -0,0 +1,131 @@
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+class RedisLogSink:
+    """Log kayıtlarını bellekte biriktirip arka plan thread'inde Redis'e yazan sink
+
+    Her flush tek bir pipeline'da LPUSH (tüm kayıtlar) + LTRIM gönderir; liste
+    formatı ve sırası tek tek LPUSH ile aynıdır. Buffer dolarsa en eski kayıt
+    atılır ve dropped sayacı artar.
+    """
+
+    def __init__(self, redis_client, list_name: str, max_list_length: int = 1000,
+                 buffer_size: int = 10000, flush_interval: float = 0.5, batch_size: int = 500):
+        self.redis_client = redis_client
+        self.list_name = list_name
+        self.max_list_length = max_list_length
+        self.buffer_size = max(1, buffer_size)
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+
+        self._buffer = deque()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._in_progress = 0
+
+        self.emitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+        self._thread = threading.Thread(target=self._run, name='redis-log-sink', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def emit(self, entry_json: str):
+        """Kaydı buffer'a ekle; Redis'i beklemez"""
+        with self._condition:
+            if len(self._buffer) >= self.buffer_size:
+                self._buffer.popleft()
+                self.dropped += 1
+            self._buffer.append(entry_json)
+            self.emitted += 1
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Buffer boşalana kadar bekle; süre dolarsa False döndür"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify()
+            while self._buffer or self._in_progress:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._thread.is_alive():
+                    return False
+                self._condition.wait(min(remaining, 0.05))
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Thread'i durdur; kalan kayıtlar kapanmadan önce yazılır"""
+        with self._condition:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        if self._buffer:
+            logger.warning(f"Log sink kapanırken {len(self._buffer)} kayıt yazılamadı")
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            buffered = len(self._buffer)
+        return {
+            'emitted': self.emitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'buffered': buffered,
+            'flushes': self.flushes,
+            'flush_errors': self.flush_errors
+        }
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._buffer) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                if not self._buffer:
+                    if self._stopping:
+                        return
+                    continue
+                batch = [self._buffer.popleft() for _ in range(min(len(self._buffer), self.batch_size))]
+                self._in_progress = len(batch)
+                stopping = self._stopping
+
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.lpush(self.list_name, *batch)
+                pipe.ltrim(self.list_name, 0, self.max_list_length - 1)
+                pipe.execute()
+                self.written += len(batch)
+                self.flushes += 1
+                failed = False
+            except Exception as e:
+                failed = True
+                self.flush_errors += 1
+                logger.error(f"Redis log flush hatası ({len(batch)} kayıt): {e}")
+
+            with self._condition:
+                self._in_progress = 0
+                if failed:
+                    if stopping:
+                        # Kapanırken Redis'e ulaşılamıyor; sonsuz döngüye girme
+                        self.dropped += len(batch) + len(self._buffer)
+                        self._buffer.clear()
+                        self._condition.notify_all()
+                        return
+                    # Kayıtları sıralarını koruyarak geri koy, kapasiteyi aşanları at
+                    self._buffer.extendleft(reversed(batch))
+                    while len(self._buffer) > self.buffer_size:
+                        self._buffer.popleft()
+                        self.dropped += 1
+                self._condition.notify_all()
+
+            if failed:
+                time.sleep(min(self.flush_interval * 4, 2.0))
@@ -0,0 +1,121 @@
+import re
+import html
+from typing import Iterable, Iterator, List
+
+# Bir blok bu boyuta ulaşınca başlık beklenmeden üretilir (başlıksız büyük dosyalar)
+MAX_BLOCK_CHARS = 64 * 1024
+
+_FENCE = re.compile(r'^\s{0,3}(`{3,}|~{3,})')
+_ATX_HEADING = re.compile(r'^\s{0,3}#{1,6}(?:\s+(.*?))?(?:\s+#+)?\s*$')
+_SETEXT_UNDERLINE = re.compile(r'^\s{0,3}(?:=+|-+)\s*$')
+_HORIZONTAL_RULE = re.compile(r'^\s{0,3}([-*_])(?:\s*\1){2,}\s*$')
+_REFERENCE_DEFINITION = re.compile(r'^\s{0,3}\[[^\]]+\]:\s*\S')
+_TABLE_SEPARATOR = re.compile(r'^\s*\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)+\|?\s*$')
+_BLOCK_PREFIX = re.compile(r'^\s*(?:>\s?)+|^\s*(?:[-*+]|\d{1,9}[.)])\s+(?:\[[ xX]\]\s+)?')
+_IMAGE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+_LINK = re.compile(r'\[([^\]]+)\](?:\([^)]*\)|\[[^\]]*\])')
+_AUTOLINK = re.compile(r'<((?:https?|ftp|mailto):[^>\s]+)>')
+_HTML_TAG = re.compile(r'</?[A-Za-z][^>]*>|<!--.*?-->')
+_EMPHASIS = re.compile(r'(?<!\\)(?:\*+(?=\S)|(?<=\S)\*+|~~|`+|(?<!\w)_+(?=\S)|(?<=\S)_+(?!\w))')
+_ESCAPE = re.compile(r'\\([\\`*_{}\[\]()#+\-.!|~<>])')
+
+
+class SectionStart(str):
+    """Başlıkla başlayan Markdown bloğu; chunker bu noktayı bölme ipucu olarak kullanır"""
+
+
+def inline_text(line: str) -> str:
+    """Satır içi Markdown sözdizimini (link, resim, vurgu, HTML tag) düz text'e çevir"""
+    if '!' in line:
+        line = _IMAGE.sub(r'\1', line)
+    if '[' in line:
+        line = _LINK.sub(r'\1', line)
+    if '<' in line:
+        line = _HTML_TAG.sub('', _AUTOLINK.sub(r'\1', line))
+    if '*' in line or '_' in line or '`' in line or '~' in line:
+        line = _EMPHASIS.sub('', line)
+    if '\\' in line:
+        line = _ESCAPE.sub(r'\1', line)
+    if '&' in line:
+        line = html.unescape(line)
+    return line
+
+
+def iter_markdown_blocks(lines: Iterable[str], max_block_chars: int = MAX_BLOCK_CHARS) -> Iterator[str]:
+    """Markdown satırlarını düz text bloklarına çevir (HTML'e render etmeden, satır satır)
+
+    Her başlık yeni bir blok başlatır ve blok SectionStart olarak üretilir.
+    Kod blokları olduğu gibi korunur; yatay çizgi, referans tanımı ve tablo
+    ayraç satırları atlanır. Bellekte en fazla bir blok tutulur.
+    """
+    block: List[str] = []
+    block_chars = 0
+    section = False
+    fence = None
+    previous_text = False  # önceki satır paragraf text'i mi (setext başlık tespiti)
+
+    def flush():
+        nonlocal block, block_chars, section
+        if block:
+            text = '\n'.join(block)
+            yield SectionStart(text) if section else text
+        block = []
+        block_chars = 0
+        section = False
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+
+        if fence is not None:
+            if line.strip().startswith(fence):
+                fence = None
+            else:
+                block.append(line)
+                block_chars += len(line) + 1
+            previous_text = False
+            continue
+
+        match = _FENCE.match(line)
+        if match:
+            fence = match.group(1)[0] * 3
+            previous_text = False
+            continue
+
+        heading = _ATX_HEADING.match(line)
+        if heading:
+            yield from flush()
+            section = True
+            text = inline_text(heading.group(1) or '')
+            block.append(text)
+            block_chars += len(text) + 1
+            previous_text = False
+            continue
+
+        if previous_text and _SETEXT_UNDERLINE.match(line):
+            # Önceki satır başlıktı: onu yeni bölümün başına taşı
+            title = block.pop()
+            yield from flush()
+            section = True
+            block.append(title)
+            block_chars += len(title) + 1
+            previous_text = False
+            continue
+
+        if (not line.strip() or _HORIZONTAL_RULE.match(line) or _REFERENCE_DEFINITION.match(line)
+                or _TABLE_SEPARATOR.match(line)):
+            previous_text = False
+            continue
+
+        text = inline_text(_BLOCK_PREFIX.sub('', line))
+        if '|' in text:
+            text = text.replace('|', ' ')
+        block.append(text)
+        block_chars += len(text) + 1
+        previous_text = True
+
+        if block_chars >= max_block_chars:
+            # Bölümün devamı düz blok olarak üretilir; ipucu sadece başlıkta verilir
+            yield from flush()
+            previous_text = False
+
+    yield from flush()
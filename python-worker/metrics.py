@@ -0,0 +1,372 @@
+import sys
+import time
+import logging
+import threading
+from collections import Counter as _FrameCounter
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    metric_type = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Değeri set() ile veya scrape anında çağrılan bir fonksiyonla belirlenen gauge"""
+
+    metric_type = 'gauge'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float]):
+        self._function = function
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {float(self._function())}"]
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} okunamadı: {e}")
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [bucket sayaçları..., +Inf, sum]
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process genelindeki metrikler; aynı isimle tekrar istenirse mevcut metrik döner"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition formatı (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric_class, name: str, help_text: str, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, help_text, labelnames, **kwargs)
+            return metric
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'worker_stage_seconds', 'Job başına pipeline stage süresi (exclusive)', ['stage'])
+JOB_SECONDS = REGISTRY.histogram(
+    'worker_job_seconds', 'Job toplam işlem süresi', ['status'])
+JOBS_TOTAL = REGISTRY.counter(
+    'worker_jobs_total', 'Sonuçlanan job sayısı', ['status'])
+BYTES_TOTAL = REGISTRY.counter(
+    'worker_processed_bytes_total', 'Başarıyla işlenen dosya byte toplamı')
+CHUNKS_TOTAL = REGISTRY.counter(
+    'worker_chunks_total', 'Kaydedilen chunk sayısı')
+EMBEDDINGS_TOTAL = REGISTRY.counter(
+    'worker_embeddings_total', 'Chunk embedding kaynağı (generated | reused | near_duplicate)', ['source'])
+STARTUP_SECONDS = REGISTRY.gauge(
+    'worker_startup_seconds', 'Worker başlangıç aşaması süresi (imports | init | first_job)', ['phase'])
+OPERATION_SECONDS = REGISTRY.histogram(
+    'vector_store_operation_seconds', 'VectorStore ve backend istemcisi operasyon süresi', ['operation'])
+
+
+_active = threading.local()
+
+
+class JobTimings:
+    """Bir job'ın stage bazında exclusive süreleri
+
+    Stage'ler iç içe girebilir (ör. chunk -> clean -> extract generator
+    zinciri); içteki stage çalışırken dıştakinin süresi durur. Stage yığını
+    thread başınadır, toplamlar thread'ler arası paylaşılır (prefetch thread'i
+    ile job thread'i aynı anda çalışabilir, bu yüzden toplam wall time'ı
+    aşabilir).
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = self._local.__dict__.setdefault('stack', [])
+        now = time.perf_counter()
+        if stack:
+            self._add(stack[-1][0], now - stack[-1][1])
+        stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._add(name, now - stack.pop()[1])
+            if stack:
+                stack[-1][1] = now
+
+    def iterate(self, items: Iterable, name: str) -> Iterator:
+        """Iterable'ın her next() çağrısını stage olarak ölç"""
+        iterator = iter(items)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        with self._lock:
+            totals = sorted(self.totals.items(), key=lambda item: -item[1])
+        stages = ' '.join(f"{name}={seconds:.3f}s" for name, seconds in totals)
+        return f"Stages: {stages or '-'}, Total: {self.elapsed():.3f}s"
+
+    def finish(self, status: str):
+        """Stage toplamlarını ve job süresini histogramlara yaz"""
+        with self._lock:
+            totals = dict(self.totals)
+        for name, seconds in totals.items():
+            STAGE_SECONDS.observe(seconds, stage=name)
+        JOB_SECONDS.observe(self.elapsed(), status=status)
+        JOBS_TOTAL.inc(status=status)
+
+    def _add(self, name: str, seconds: float):
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+
+def activate(timings: Optional[JobTimings]):
+    """Bu thread'de stage() çağrılarının yazılacağı job'ı ayarla (None ile temizlenir)"""
+    _active.timings = timings
+
+
+@contextmanager
+def stage(name: str, operation: Optional[str] = None):
+    """Aktif job'ın stage'ine ve operation histogramına süre yaz
+
+    Aktif job yoksa (ör. arama) sadece operation histogramı güncellenir.
+    """
+    timings = getattr(_active, 'timings', None)
+    started = time.perf_counter()
+    try:
+        if timings is None:
+            yield
+        else:
+            with timings.stage(name):
+                yield
+    finally:
+        OPERATION_SECONDS.observe(time.perf_counter() - started, operation=operation or name)
+
+
+class SlowJobProfiler:
+    """Job thread'inin stack'ini periyodik örnekleyen hafif profiler
+
+    Job threshold_seconds'ı aşarsa örneklerde en sık görülen frame'ler
+    (kümülatif, örnek yüzdesiyle) raporlanır. Extraction prefetch thread'inde
+    çalıştığı için job thread'inde 'prefetch' beklemesi olarak görünür.
+    """
+
+    def __init__(self, threshold_seconds: float, interval: float = 0.01, top: int = 15):
+        self.threshold_seconds = threshold_seconds
+        self.interval = interval
+        self.top = top
+
+    @contextmanager
+    def profile(self, report: Callable[[float, List[Tuple[str, int]], int], None]):
+        thread_id = threading.get_ident()
+        frame_counts = _FrameCounter()
+        stop = threading.Event()
+        samples = [0]
+
+        def sample():
+            while not stop.wait(self.interval):
+                frame = sys._current_frames().get(thread_id)
+                if frame is None:
+                    continue
+                samples[0] += 1
+                seen = set()
+                while frame is not None:
+                    code = frame.f_code
+                    location = f"{code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno} {code.co_name}"
+                    if location not in seen:
+                        frame_counts[location] += 1
+                        seen.add(location)
+                    frame = frame.f_back
+
+        sampler = threading.Thread(target=sample, name='slow-job-profiler', daemon=True)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            sampler.join()
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold_seconds and samples[0]:
+                # Her örnekte bulunan ortak üst frame'ler (job giriş noktası) bilgi taşımaz
+                frames = [(location, count) for location, count in frame_counts.most_common()
+                          if count < samples[0]][:self.top]
+                report(elapsed, frames, samples[0])
+
+
+class MetricsServer:
+    """GET /metrics ile registry'yi Prometheus text formatında sunan HTTP sunucu"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = '0.0.0.0', port: int = 9100):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True).start()
+        logger.info(f"Metrics endpoint başlatıldı: http://{self.host}:{self._server.server_address[1]}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,418 @@
+import os
+import re
+import zlib
+import hashlib
+import logging
+import sqlite3
+import threading
+import numpy as np
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+')
+# (a * x + b) mod p; a, b < 2^31 ve x < 2^32 olduğundan uint64'te taşma olmaz
+_PRIME = np.uint64(4294967311)
+
+
+def lsh_bands(num_perm: int, threshold: float) -> int:
+    """Aday eşiği (1/b)^(1/r) benzerlik eşiğinin en az 0.1 altında kalan en büyük satır sayılı band sayısı
+
+    Adaylar imza benzerliğiyle tekrar kontrol edildiği için band'lar
+    kaçırmamak (recall) yönünde seçilir.
+    """
+    bands = num_perm
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows == 0 and (rows / num_perm) ** (1 / rows) <= threshold - 0.1:
+            bands = num_perm // rows
+    return bands
+
+
+class NearDuplicateIndex:
+    """Chunk'ların MinHash imzalarını diskte tutan, dokümanlar arası near-duplicate index'i
+
+    Her chunk'ın kelime shingle'larından num_perm'lik MinHash imzası
+    hesaplanır; imzalar LSH band'larına bölünerek SQLite'ta saklanır.
+    Aynı band değerini paylaşan adaylar arasında imza benzerliği (tahmini
+    Jaccard) threshold'u geçen en benzer chunk canonical kabul edilir.
+    Near-duplicate chunk'lar embed edilmez ve store'a yazılmaz; kayıtları
+    canonical vector id'sini, text'ini ve dosya bilgisini tutar. Kontrol
+    (check) ve ekleme (add) ayrıdır: chunk'lar vector'ları kaydedildikten
+    sonra eklenir, böylece kaydedilemeyen chunk canonical seçilmez.
+
+    Canonical vector'ın job'ı silinirse ona bağlı duplicate'ler kalan en
+    benzer chunk'a yeniden bağlanır; bulunamazsa yetim (orphaned) işaretlenir.
+    Yetimlerden biri embed edilip promote ile canonical yapılır, aynı
+    canonical'ı gösteren diğer yetimler ona bağlanır (bkz. VectorStore.promote_orphans).
+    """
+
+    def __init__(self, index_dir: str, threshold: float = 0.9, num_perm: int = 64, shingle_size: int = 3):
+        self.index_dir = index_dir
+        self.threshold = threshold
+        self.num_perm = max(1, num_perm)
+        self.shingle_size = max(1, shingle_size)
+        self.bands = lsh_bands(self.num_perm, threshold)
+        self.band_rows = self.num_perm // self.bands
+        os.makedirs(index_dir, exist_ok=True)
+
+        # Sabit seed: imzalar process'ler ve yeniden başlatmalar arasında karşılaştırılabilir
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, 2 ** 31, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 31, size=self.num_perm, dtype=np.uint64)
+
+        self.db_path = os.path.join(index_dir, 'signatures.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        layout = f"{self.num_perm}:{self.shingle_size}:{self.bands}"
+        stored = self._conn.execute("SELECT value FROM settings WHERE name = 'layout'").fetchone()
+        if stored is not None and stored[0] != layout:
+            # Farklı imza ayarlarıyla yazılmış kayıtlar karşılaştırılamaz
+            logger.warning(f"Near-duplicate index ayarları değişti ({stored[0]} -> {layout}), index sıfırlanıyor")
+            self._conn.executescript("DROP TABLE IF EXISTS chunks; DROP TABLE IF EXISTS bands;")
+        self._conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES ('layout', ?)", (layout,))
+        # canonical NULL: chunk'ın kendi vector'ı var; dolu: near-duplicate, canonical vector id'sini gösterir.
+        # text / file_name / file_path sadece duplicate'lerde tutulur (canonical silinirse embed edilmek için);
+        # orphaned = 1: canonical vector silindi, yeni canonical bekleniyor
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " job_id TEXT NOT NULL,"
+            " chunk_index INTEGER NOT NULL,"
+            " signature BLOB NOT NULL,"
+            " canonical TEXT,"
+            " similarity REAL,"
+            " PRIMARY KEY (job_id, chunk_index))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        for column, definition in (('text', 'TEXT'), ('file_name', 'TEXT'), ('file_path', 'TEXT'),
+                                   ('orphaned', 'INTEGER NOT NULL DEFAULT 0')):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE chunks ADD COLUMN {column} {definition}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_canonical ON chunks(canonical)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_orphaned ON chunks(orphaned) WHERE orphaned = 1")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " bucket INTEGER NOT NULL,"
+            " job_id TEXT NOT NULL,"
+            " chunk_index INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bands_bucket ON bands(bucket)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bands_chunk ON bands(job_id, chunk_index)")
+
+        self._count, self._duplicates, self._orphaned = self._conn.execute(
+            "SELECT COUNT(*), COUNT(canonical), COALESCE(SUM(orphaned), 0) FROM chunks").fetchone()
+        self.checked = 0
+        self.detected = 0
+        self.repointed = 0
+        self.promoted = 0
+        self.dropped = 0
+
+        logger.info(f"Near-duplicate index açıldı: {self.db_path} ({self._count} chunk, "
+                    f"threshold {threshold}, {self.bands}x{self.band_rows} band)")
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Chunk'ın MinHash imzası; kelime içermeyen text için None"""
+        words = _WORD.findall(text.lower())
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        values = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        hashed = (values[:, None] * self._a + self._b) % _PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def check(self, job_id: str, first_chunk_index: int, texts: List[str],
+              exclude_jobs: Iterable[str] = ()) -> List[Tuple[Optional[np.ndarray], Optional[Tuple[str, float]]]]:
+        """Chunk'ların (imza, near-duplicate eşleşmesi) çiftleri; index'e eklemez
+
+        texts[i], job'ın first_chunk_index + i. chunk'ıdır. Eşleşme
+        (canonical vector id, benzerlik) veya None'dır; aynı listede daha
+        önce gelen benzer (kendisi duplicate olmayan) chunk da canonical
+        seçilebilir. exclude_jobs'taki job'ların chunk'ları canonical seçilmez
+        (ör. dosyanın birazdan silinecek önceki sürümü). Sonuçlar, vector'lar
+        kaydedildikten sonra add'e verilir.
+        """
+        exclude_jobs = set(exclude_jobs)
+        # Aynı chunk'ların yarıda kalmış önceki denemeden kalan kayıtları kendileriyle eşleşmesin
+        own_ids = {f"{job_id}_{first_chunk_index + i}" for i in range(len(texts))}
+        results = []
+        batch_canonicals: List[Tuple[str, np.ndarray]] = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                signature = self.signature(text)
+                if signature is None:
+                    results.append((None, None))
+                    continue
+                self.checked += 1
+                match = self._best_match(signature, exclude_jobs, own_ids)
+                for vector_id, candidate in batch_canonicals:
+                    similarity = float(np.mean(candidate == signature))
+                    if similarity >= self.threshold and (match is None or similarity > match[1]):
+                        match = (vector_id, similarity)
+                if match is None:
+                    batch_canonicals.append((f"{job_id}_{first_chunk_index + i}", signature))
+                else:
+                    self.detected += 1
+                results.append((signature, match))
+        return results
+
+    def add(self, job_id: str, file_name: str, file_path: str,
+            chunks: List[Tuple[int, np.ndarray, Optional[Tuple[str, float]], str]],
+            exclude_jobs: Iterable[str] = ()) -> int:
+        """check sonuçlarını (chunk_index, imza, eşleşme, text) index'e ekle, yetim kalan duplicate sayısını döndür
+
+        Eşleşmesi olmayan chunk'lar sadece vector'ları kaydedildiyse
+        verilmelidir. Duplicate'in canonical'ı bu arada silindiyse (veya
+        kaydedilemediyse) yeni eşleşme aranır, bulunamazsa yetim eklenir.
+        """
+        exclude_jobs = set(exclude_jobs)
+        orphaned = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                # Aynı chunk yeniden işleniyorsa (retry) eski kaydın yerine geçer
+                self._delete_chunks([(job_id, chunk_index) for chunk_index, _, _, _ in chunks])
+                for chunk_index, signature, match, text in chunks:
+                    if match is not None and not self._is_canonical(match[0]):
+                        group = match[0]
+                        match = self._best_match(signature, exclude_jobs)
+                        if match is None:
+                            # Canonical kaydedilemedi veya silindi: aynı id'yi gösterenler bir grup
+                            self._insert(job_id, chunk_index, signature, (group, None),
+                                         (text, file_name, file_path), orphaned=True)
+                            orphaned += 1
+                            continue
+                    document = (text, file_name, file_path) if match is not None else None
+                    self._insert(job_id, chunk_index, signature, match, document)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return orphaned
+
+    def job_count(self, job_id: str, chunk_range: Optional[range] = None) -> int:
+        """Job'ın (chunk_range verilirse o aralıktaki) index kaydı sayısı"""
+        where, params = self._job_filter(job_id, chunk_range)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM chunks WHERE {where}", params).fetchone()[0]
+
+    def remove_job(self, job_id: str, chunk_range: Optional[range] = None) -> Tuple[int, int]:
+        """Job'ın kayıtlarını sil; bu chunk'ları gösteren duplicate'leri yeniden bağla
+
+        Başka benzer chunk'ı olmayan duplicate'ler yetim işaretlenir (canonical
+        alanı grup anahtarı olarak eski id'de kalır). (yeniden bağlanan, yetim
+        kalan) duplicate sayısını döndürür.
+        """
+        where, params = self._job_filter(job_id, chunk_range)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                removed = self._conn.execute(
+                    f"SELECT chunk_index, canonical, orphaned FROM chunks WHERE {where}", params).fetchall()
+                if not removed:
+                    self._conn.execute("COMMIT")
+                    return 0, 0
+                self._conn.execute(f"DELETE FROM chunks WHERE {where}", params)
+                self._conn.execute(f"DELETE FROM bands WHERE {where}", params)
+                self._count -= len(removed)
+                self._duplicates -= sum(1 for _, canonical, _ in removed if canonical is not None)
+                self._orphaned -= sum(orphaned for _, _, orphaned in removed)
+                # Sadece kendi vector'ı olan chunk'lar duplicate'ler tarafından gösterilebilir
+                removed_ids = [f"{job_id}_{index}" for index, canonical, _ in removed if canonical is None]
+
+                dependents = []
+                for start in range(0, len(removed_ids), 500):
+                    batch = removed_ids[start:start + 500]
+                    placeholders = ','.join('?' * len(batch))
+                    dependents.extend(self._conn.execute(
+                        "SELECT job_id, chunk_index, signature, text FROM chunks"
+                        f" WHERE canonical IN ({placeholders}) AND orphaned = 0",
+                        batch
+                    ).fetchall())
+
+                repointed = orphaned = dropped = 0
+                for dependent_job, dependent_index, blob, text in dependents:
+                    match = self._best_match(np.frombuffer(blob, dtype=np.uint32), set())
+                    if match is not None:
+                        self._repoint(dependent_job, dependent_index, match)
+                        repointed += 1
+                    elif text is None:
+                        # Text'i tutulmayan eski kayıt: içerik dokümanı yeniden işlenene kadar aranamaz
+                        self._delete_chunks([(dependent_job, dependent_index)])
+                        dropped += 1
+                    else:
+                        self._conn.execute("UPDATE chunks SET orphaned = 1 WHERE job_id = ? AND chunk_index = ?",
+                                           (dependent_job, dependent_index))
+                        orphaned += 1
+                self._orphaned += orphaned
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.repointed += repointed
+            self.dropped += dropped
+
+        if dropped:
+            logger.warning(f"Job {job_id} silindi: {dropped} near-duplicate chunk'ın canonical vector'ı kalmadı")
+        return repointed, orphaned
+
+    def next_orphan(self) -> Optional[Tuple[str, int, str, str, str]]:
+        """Sıradaki yetim duplicate: (job_id, chunk_index, text, file_name, file_path)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT job_id, chunk_index, text, file_name, file_path FROM chunks WHERE orphaned = 1"
+                " ORDER BY rowid LIMIT 1"
+            ).fetchone()
+
+    def promote(self, job_id: str, chunk_index: int) -> Optional[int]:
+        """Vector'ı yeni kaydedilmiş yetimi canonical yap, aynı gruptaki yetimleri ona (veya başka eşleşmeye) bağla
+
+        Bağlanan yetim sayısını döndürür; kayıt artık yetim değilse (ör. job'ı
+        bu arada silindi) None.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT signature, canonical FROM chunks WHERE job_id = ? AND chunk_index = ? AND orphaned = 1",
+                    (job_id, chunk_index)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                blob, group = row
+                self._delete_chunks([(job_id, chunk_index)])
+                self._insert(job_id, chunk_index, np.frombuffer(blob, dtype=np.uint32), None)
+
+                repointed = 0
+                for member_job, member_index, member_blob in self._conn.execute(
+                        "SELECT job_id, chunk_index, signature FROM chunks WHERE orphaned = 1 AND canonical = ?",
+                        (group,)).fetchall():
+                    match = self._best_match(np.frombuffer(member_blob, dtype=np.uint32), set())
+                    if match is not None:
+                        self._repoint(member_job, member_index, match)
+                        repointed += 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.promoted += 1
+            self.repointed += repointed
+            return repointed
+
+    def stats(self) -> Dict[str, Any]:
+        """Kontrol edilen / duplicate bulunan chunk sayıları (duplicate = kazanılan embedding çağrısı ve vector)"""
+        return {
+            'threshold': self.threshold,
+            'num_perm': self.num_perm,
+            'bands': self.bands,
+            'chunks': self._count,
+            'duplicates': self._duplicates,
+            'checked': self.checked,
+            'detected': self.detected,
+            'detection_rate': round(self.detected / self.checked, 4) if self.checked else 0.0,
+            'repointed': self.repointed,
+            'orphaned': self._orphaned,
+            'promoted': self.promoted,
+            'dropped': self.dropped
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        """Her band için (band no, band değerleri) hash'i; SQLite INTEGER'a sığan pozitif 63 bit"""
+        bands = signature.reshape(self.bands, self.band_rows)
+        return [
+            int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8, salt=index.to_bytes(2, 'little')).digest(),
+                           'little') >> 1
+            for index, band in enumerate(bands)
+        ]
+
+    def _best_match(self, signature: np.ndarray, exclude_jobs: set,
+                    exclude_ids: Optional[set] = None) -> Optional[Tuple[str, float]]:
+        buckets = self._buckets(signature)
+        placeholders = ','.join('?' * len(buckets))
+        # Sadece kendi vector'ı olan chunk'lar canonical olabilir
+        rows = self._conn.execute(
+            "SELECT DISTINCT c.job_id, c.chunk_index, c.signature FROM bands b"
+            " JOIN chunks c ON c.job_id = b.job_id AND c.chunk_index = b.chunk_index"
+            f" WHERE b.bucket IN ({placeholders})",
+            buckets
+        ).fetchall()
+
+        best = None
+        for job_id, chunk_index, blob in rows:
+            if job_id in exclude_jobs:
+                continue
+            vector_id = f"{job_id}_{chunk_index}"
+            if exclude_ids and vector_id in exclude_ids:
+                continue
+            similarity = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (vector_id, similarity)
+        return best
+
+    def _is_canonical(self, vector_id: str) -> bool:
+        job_id, chunk_index = vector_id.rsplit('_', 1)
+        return self._conn.execute(
+            "SELECT 1 FROM chunks WHERE job_id = ? AND chunk_index = ? AND canonical IS NULL",
+            (job_id, int(chunk_index))
+        ).fetchone() is not None
+
+    def _insert(self, job_id: str, chunk_index: int, signature: np.ndarray, match: Optional[Tuple[str, float]],
+                document: Optional[Tuple[str, str, str]] = None, orphaned: bool = False):
+        """Kaydı ekle; document (text, file_name, file_path) duplicate'in yeniden embed edilebilmesi için
+
+        Yetim kayıtlarda match[0] artık var olmayan canonical'ın id'sidir (grup anahtarı).
+        """
+        text, file_name, file_path = document or (None, None, None)
+        self._conn.execute(
+            "INSERT INTO chunks (job_id, chunk_index, signature, canonical, similarity, text, file_name, file_path,"
+            " orphaned) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, chunk_index, signature.tobytes(), match[0] if match else None, match[1] if match else None,
+             text, file_name, file_path, int(orphaned))
+        )
+        self._count += 1
+        self._orphaned += int(orphaned)
+        if match is not None:
+            self._duplicates += 1
+            return
+        # Duplicate'ler band'lara yazılmaz: canonical zincirleri oluşmaz
+        self._conn.executemany(
+            "INSERT INTO bands (bucket, job_id, chunk_index) VALUES (?, ?, ?)",
+            [(bucket, job_id, chunk_index) for bucket in self._buckets(signature)]
+        )
+
+    def _repoint(self, job_id: str, chunk_index: int, match: Tuple[str, float]):
+        orphaned = self._conn.execute(
+            "SELECT orphaned FROM chunks WHERE job_id = ? AND chunk_index = ?", (job_id, chunk_index)).fetchone()[0]
+        self._conn.execute(
+            "UPDATE chunks SET canonical = ?, similarity = ?, orphaned = 0 WHERE job_id = ? AND chunk_index = ?",
+            (match[0], match[1], job_id, chunk_index)
+        )
+        self._orphaned -= orphaned
+
+    def _delete_chunks(self, chunks: List[Tuple[str, int]]):
+        for job_id, chunk_index in chunks:
+            row = self._conn.execute(
+                "SELECT canonical, orphaned FROM chunks WHERE job_id = ? AND chunk_index = ?",
+                (job_id, chunk_index)).fetchone()
+            if row is None:
+                continue
+            self._conn.execute("DELETE FROM chunks WHERE job_id = ? AND chunk_index = ?", (job_id, chunk_index))
+            self._conn.execute("DELETE FROM bands WHERE job_id = ? AND chunk_index = ?", (job_id, chunk_index))
+            self._count -= 1
+            if row[0] is not None:
+                self._duplicates -= 1
+            self._orphaned -= row[1]
+
+    @staticmethod
+    def _job_filter(job_id: str, chunk_range: Optional[range]) -> Tuple[str, list]:
+        if chunk_range is None:
+            return "job_id = ?", [job_id]
+        return "job_id = ? AND chunk_index >= ? AND chunk_index < ?", [job_id, chunk_range.start, chunk_range.stop]
@@ -0,0 +1,659 @@
+import os
+import bisect
+import shutil
+import struct
+import logging
+import threading
+import numpy as np
+from typing import List, Dict, Optional, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Her chunk için sabit boyutlu kayıt; text ve embedding ayrı dosyalarda tutulur
+RECORD_DTYPE = np.dtype([
+    ('text_offset', '<u8'),
+    ('text_length', '<u4'),
+    ('chunk_index', '<u4'),
+    ('job_code', '<u4'),
+    ('file_code', '<u4'),
+    ('path_code', '<u4'),
+    ('sq_norm', '<f4'),
+    ('created_at', '<f8'),
+    ('deleted', 'u1'),
+])
+
+EMBEDDINGS_FILE = 'embeddings.f32'
+RECORDS_FILE = 'records.bin'
+TEXTS_FILE = 'texts.bin'
+STRINGS_FILE = 'strings.bin'
+DIM_FILE = 'DIM'
+
+
+class ChunkRecord:
+    """Store satırının hafif görünümü; alanlar erişildikçe segment'ten okunur
+
+    Text, embedding ve isimler kopyalanmaz; view yalnızca store kilidi
+    altında ve bir sonraki compaction'a kadar geçerlidir.
+    """
+
+    __slots__ = ('row', '_store', '_segment', '_local_row')
+
+    def __init__(self, store: 'SegmentStore', segment: 'Segment', local_row: int, row: int):
+        self.row = row
+        self._store = store
+        self._segment = segment
+        self._local_row = local_row
+
+    def _field(self, name: str):
+        return self._segment.records[name][self._local_row]
+
+    @property
+    def job_id(self) -> str:
+        return self._store.string(int(self._field('job_code')))
+
+    @property
+    def file_name(self) -> str:
+        return self._store.string(int(self._field('file_code')))
+
+    @property
+    def file_path(self) -> str:
+        return self._store.string(int(self._field('path_code')))
+
+    @property
+    def chunk_index(self) -> int:
+        return int(self._field('chunk_index'))
+
+    @property
+    def created_at(self) -> float:
+        return float(self._field('created_at'))
+
+    @property
+    def deleted(self) -> bool:
+        return bool(self._field('deleted'))
+
+    @property
+    def text(self) -> str:
+        return self._segment.text(self._local_row)
+
+    @property
+    def embedding(self) -> np.ndarray:
+        return np.array(self._segment.embeddings[self._local_row], dtype=np.float32)
+
+
+class _RowList:
+    """Bir job'ın veya dosyanın canlı satırları, chunk_index sırasında"""
+
+    __slots__ = ('keys', 'rows')
+
+    def __init__(self, keys: Optional[List[int]] = None, rows: Optional[List[int]] = None):
+        self.keys = keys or []
+        self.rows = rows or []
+
+    def add(self, key: int, row: int):
+        # Chunk'lar genelde sırayla eklenir; sıra dışı gelirse araya yerleştir
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.rows.append(row)
+        else:
+            position = bisect.bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.rows.insert(position, row)
+
+    def remove(self, rows: set):
+        kept = [i for i, row in enumerate(self.rows) if row not in rows]
+        self.keys = [self.keys[i] for i in kept]
+        self.rows = [self.rows[i] for i in kept]
+
+
+class Segment:
+    """Tek bir append-only segment: embedding matrisi, kayıtlar ve text arena"""
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.segment_id = int(os.path.basename(path))
+        self.dim = dim
+        self.rows = 0
+        self.text_size = 0
+        self._writers = None
+        self._mapped_rows = -1
+        self._records = None
+        self._embeddings = None
+        self._texts = None
+        self._alive = None
+        self._dead_count = None
+        self._recover()
+
+    @property
+    def records(self) -> np.ndarray:
+        self._ensure_mapped()
+        return self._records
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        self._ensure_mapped()
+        return self._embeddings
+
+    @property
+    def alive(self) -> np.ndarray:
+        """Silinmemiş satırların maskesi"""
+        if self._alive is None or len(self._alive) != self.rows:
+            self._alive = self.records['deleted'] == 0
+        return self._alive
+
+    @property
+    def alive_count(self) -> int:
+        if self._dead_count is None:
+            self._dead_count = self.rows - int(np.count_nonzero(self.alive))
+        return self.rows - self._dead_count
+
+    def text(self, row: int) -> str:
+        self._ensure_mapped()
+        record = self._records[row]
+        start = int(record['text_offset'])
+        return self._texts[start:start + int(record['text_length'])].tobytes().decode('utf-8')
+
+    def append(self, record: np.ndarray, embedding: np.ndarray, text_bytes: bytes) -> int:
+        """Kaydı segmentin sonuna ekle; kayıt dosyası en son yazılır (commit işareti)"""
+        if self._writers is None:
+            self._writers = {
+                name: open(os.path.join(self.path, name), 'ab')
+                for name in (TEXTS_FILE, EMBEDDINGS_FILE, RECORDS_FILE)
+            }
+
+        record['text_offset'] = self.text_size
+        record['text_length'] = len(text_bytes)
+
+        for name, payload in ((TEXTS_FILE, text_bytes),
+                              (EMBEDDINGS_FILE, embedding.tobytes()),
+                              (RECORDS_FILE, record.tobytes())):
+            writer = self._writers[name]
+            writer.write(payload)
+            writer.flush()
+
+        self.text_size += len(text_bytes)
+        self.rows += 1
+        return self.rows - 1
+
+    def mark_deleted(self, local_rows: np.ndarray) -> int:
+        """Tombstone yaz, yeni silinen satır sayısını döndür"""
+        records = self.records
+        local_rows = local_rows[records['deleted'][local_rows] == 0]
+        if len(local_rows):
+            dead_count = self.rows - self.alive_count
+            records['deleted'][local_rows] = 1
+            records.flush()
+            self._dead_count = dead_count + len(local_rows)
+            if self._alive is not None and len(self._alive) == self.rows:
+                self._alive[local_rows] = False
+        return len(local_rows)
+
+    def close_writers(self):
+        if self._writers is not None:
+            for writer in self._writers.values():
+                writer.close()
+            self._writers = None
+
+    def close(self):
+        self.close_writers()
+        self._records = self._embeddings = self._texts = None
+        self._mapped_rows = -1
+
+    def _ensure_mapped(self):
+        if self._mapped_rows == self.rows:
+            return
+
+        if self.rows == 0:
+            self._records = np.zeros(0, dtype=RECORD_DTYPE)
+            self._embeddings = np.zeros((0, self.dim), dtype=np.float32)
+            self._texts = np.zeros(0, dtype=np.uint8)
+        else:
+            self._records = np.memmap(os.path.join(self.path, RECORDS_FILE), dtype=RECORD_DTYPE,
+                                      mode='r+', shape=(self.rows,))
+            self._embeddings = np.memmap(os.path.join(self.path, EMBEDDINGS_FILE), dtype=np.float32,
+                                         mode='r', shape=(self.rows, self.dim))
+            self._texts = (np.memmap(os.path.join(self.path, TEXTS_FILE), dtype=np.uint8,
+                                     mode='r', shape=(self.text_size,))
+                           if self.text_size else np.zeros(0, dtype=np.uint8))
+        self._mapped_rows = self.rows
+        self._alive = None
+
+    def _recover(self):
+        """Yarım kalmış append'leri (crash) dosya boyutlarından tespit edip kırp"""
+        sizes = {}
+        for name in (RECORDS_FILE, EMBEDDINGS_FILE, TEXTS_FILE):
+            file_path = os.path.join(self.path, name)
+            if not os.path.exists(file_path):
+                open(file_path, 'ab').close()
+            sizes[name] = os.path.getsize(file_path)
+
+        rows = min(sizes[RECORDS_FILE] // RECORD_DTYPE.itemsize,
+                   sizes[EMBEDDINGS_FILE] // (self.dim * 4))
+
+        text_size = 0
+        if rows:
+            records = np.memmap(os.path.join(self.path, RECORDS_FILE), dtype=RECORD_DTYPE, mode='r', shape=(rows,))
+            text_ends = records['text_offset'] + records['text_length']
+            valid = text_ends <= sizes[TEXTS_FILE]
+            if not valid.all():
+                rows = int(np.argmin(valid))
+            text_size = int(text_ends[rows - 1]) if rows else 0
+            del records
+
+        expected = {
+            RECORDS_FILE: rows * RECORD_DTYPE.itemsize,
+            EMBEDDINGS_FILE: rows * self.dim * 4,
+            TEXTS_FILE: text_size,
+        }
+        for name, size in expected.items():
+            if sizes[name] != size:
+                logger.warning(f"Segment {self.path} onarılıyor: {name} {sizes[name]} -> {size} byte")
+                with open(os.path.join(self.path, name), 'r+b') as f:
+                    f.truncate(size)
+
+        self.rows = rows
+        self.text_size = text_size
+
+
+class SegmentStore:
+    """Append-only, memory-mapped segment'lerden oluşan kalıcı vector deposu
+
+    Global satır numarası, segment'ler sırayla art arda eklenerek hesaplanır
+    (silinmiş satırlar da sayılır). Compaction satır numaralarını değiştirir
+    ve eski -> yeni eşlemesini döndürür.
+
+    job ve dosya isimleri için bellekte ikincil index tutulur (isim kodu ->
+    chunk_index sıralı canlı satırlar); job/dosya bazlı okuma ve silme
+    tüm store'u taramaz.
+    """
+
+    def __init__(self, segments_dir: str, segment_max_rows: int = 65536):
+        self.segments_dir = segments_dir
+        self.segment_max_rows = max(1, segment_max_rows)
+        self.dim: Optional[int] = None
+        self.segments: List[Segment] = []
+        self._bases = np.zeros(0, dtype=np.int64)
+        self._strings: List[str] = []
+        self._string_codes: Dict[str, int] = {}
+        self._strings_writer = None
+        self._job_rows: Dict[int, _RowList] = {}
+        self._file_rows: Dict[int, _RowList] = {}
+        self._lock = threading.RLock()
+
+        os.makedirs(segments_dir, exist_ok=True)
+        self._open()
+
+    def __len__(self) -> int:
+        return int(self._bases[-1] + self.segments[-1].rows) if self.segments else 0
+
+    @property
+    def alive_count(self) -> int:
+        return sum(segment.alive_count for segment in self.segments)
+
+    def dead_ratio(self) -> float:
+        total = len(self)
+        return 1.0 - self.alive_count / total if total else 0.0
+
+    def string(self, code: int) -> str:
+        return self._strings[code]
+
+    def string_code(self, value: str) -> Optional[int]:
+        return self._string_codes.get(value)
+
+    def append(self, job_id: str, file_name: str, file_path: str, chunk_index: int,
+               text: str, embedding, created_at: float) -> int:
+        """Yeni chunk'ı aktif segment'e ekle ve global satır numarasını döndür"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+
+        with self._lock:
+            if self.dim is None:
+                self._set_dim(vector.shape[0])
+            elif vector.shape[0] != self.dim:
+                raise ValueError(f"Embedding boyutu uyuşmuyor: {vector.shape[0]} != {self.dim}")
+
+            if not self.segments or self.segments[-1].rows >= self.segment_max_rows:
+                self._new_segment()
+
+            job_code = self._intern(job_id)
+            file_code = self._intern(file_name)
+            record = np.zeros(1, dtype=RECORD_DTYPE)
+            record['chunk_index'] = chunk_index
+            record['job_code'] = job_code
+            record['file_code'] = file_code
+            record['path_code'] = self._intern(file_path)
+            record['sq_norm'] = float(np.dot(vector, vector))
+            record['created_at'] = created_at
+
+            local_row = self.segments[-1].append(record, vector, text.encode('utf-8'))
+            row = int(self._bases[-1]) + local_row
+            self._job_rows.setdefault(job_code, _RowList()).add(chunk_index, row)
+            self._file_rows.setdefault(file_code, _RowList()).add(chunk_index, row)
+            return row
+
+    def iter_blocks(self) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        """(base_row, embeddings, sq_norms, alive_mask) blokları"""
+        for base, segment in zip(self._bases, list(self.segments)):
+            if segment.rows:
+                records = segment.records
+                yield int(base), segment.embeddings, records['sq_norm'], segment.alive
+
+    def layout(self) -> List[Tuple[str, int, int]]:
+        """(segment dizini, base satır, satır sayısı) listesi; başka process'ler segment'leri buradan map eder"""
+        with self._lock:
+            return [(segment.path, int(base), segment.rows) for base, segment in zip(self._bases, self.segments)]
+
+    def locate(self, row: int) -> Tuple[Segment, int]:
+        """Global satırı (segment, lokal satır) çiftine çevir"""
+        if row < 0 or row >= len(self):
+            raise IndexError(row)
+        position = int(np.searchsorted(self._bases, row, side='right')) - 1
+        return self.segments[position], row - int(self._bases[position])
+
+    def get_embedding(self, row: int) -> np.ndarray:
+        segment, local_row = self.locate(row)
+        return np.array(segment.embeddings[local_row], dtype=np.float32)
+
+    def get_embeddings(self, rows) -> np.ndarray:
+        """Satırların embedding'lerini segment bazında toplu oku"""
+        rows = np.asarray(rows, dtype=np.int64)
+        result = np.empty((len(rows), self.dim or 0), dtype=np.float32)
+        if not len(rows):
+            return result
+
+        positions = np.searchsorted(self._bases, rows, side='right') - 1
+        for position in np.unique(positions):
+            selected = positions == position
+            local_rows = rows[selected] - self._bases[position]
+            result[selected] = self.segments[position].embeddings[local_rows]
+        return result
+
+    def get_field(self, rows, field: str) -> np.ndarray:
+        """Satırların tek bir kayıt alanını (ör. chunk_index) toplu oku"""
+        rows = np.asarray(rows, dtype=np.int64)
+        result = np.empty(len(rows), dtype=RECORD_DTYPE[field])
+        if not len(rows):
+            return result
+
+        positions = np.searchsorted(self._bases, rows, side='right') - 1
+        for position in np.unique(positions):
+            selected = positions == position
+            result[selected] = self.segments[position].records[field][rows[selected] - self._bases[position]]
+        return result
+
+    def get_record(self, row: int) -> ChunkRecord:
+        """Satırın metadata ve text'ine erişen view'ı döndür"""
+        segment, local_row = self.locate(row)
+        return ChunkRecord(self, segment, local_row, row)
+
+    def iter_records(self, rows) -> Iterator[ChunkRecord]:
+        """Satırlar için sırayla view üret (satır başına locate yapmadan)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        positions = np.searchsorted(self._bases, rows, side='right') - 1
+        for row, position in zip(rows.tolist(), positions.tolist()):
+            yield ChunkRecord(self, self.segments[position], row - int(self._bases[position]), row)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Kolon bazında byte kullanımı (embedding, kayıt, text arena, isim tablosu)"""
+        usage = {
+            'embeddings': sum(segment.rows for segment in self.segments) * (self.dim or 0) * 4,
+            'records': sum(segment.rows for segment in self.segments) * RECORD_DTYPE.itemsize,
+            'texts': sum(segment.text_size for segment in self.segments),
+            'strings': sum(len(value.encode('utf-8')) + 4 for value in self._strings)
+        }
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def find_rows(self, job_id: Optional[str] = None, file_name: Optional[str] = None) -> np.ndarray:
+        """job_id ve/veya file_name'e uyan silinmemiş global satırlar
+
+        Filtre verilirse sonuç ikincil index'ten chunk_index sırasında gelir
+        (maliyet job/dosyanın chunk sayısıyla orantılı); filtre yoksa tüm
+        canlı satırlar satır sırasında döner.
+        """
+        if job_id is None and file_name is None:
+            matches = [np.flatnonzero(segment.alive) + base
+                       for base, segment in zip(self._bases, list(self.segments)) if segment.rows]
+            return np.concatenate(matches) if matches else np.zeros(0, dtype=np.int64)
+
+        with self._lock:
+            job_code = self.string_code(job_id) if job_id is not None else None
+            file_code = self.string_code(file_name) if file_name is not None else None
+            if (job_id is not None and job_code is None) or (file_name is not None and file_code is None):
+                return np.zeros(0, dtype=np.int64)
+
+            if job_code is not None:
+                row_list = self._job_rows.get(job_code)
+            else:
+                row_list = self._file_rows.get(file_code)
+            rows = np.array(row_list.rows if row_list else [], dtype=np.int64)
+
+        if job_code is not None and file_code is not None and len(rows):
+            rows = rows[self.get_field(rows, 'file_code') == file_code]
+        return rows
+
+    def mark_deleted(self, rows) -> int:
+        """Satırlara tombstone koy, silinen satır sayısını döndür"""
+        rows = np.asarray(rows, dtype=np.int64)
+        deleted = 0
+        with self._lock:
+            self._unindex_rows(rows)
+            positions = np.searchsorted(self._bases, rows, side='right') - 1
+            for position in np.unique(positions):
+                segment = self.segments[position]
+                local_rows = rows[positions == position] - self._bases[position]
+                deleted += segment.mark_deleted(local_rows)
+        return deleted
+
+    def compact(self, min_dead_ratio: float = 0.3) -> Optional[np.ndarray]:
+        """Silinmiş satır oranı eşiği aşan segment'leri yeniden yaz
+
+        Hiçbir segment yeniden yazılmazsa None, aksi halde eski global satır ->
+        yeni global satır eşlemesi (silinenler için -1) döndürür.
+        """
+        with self._lock:
+            old_total = len(self)
+            remap = np.full(old_total, -1, dtype=np.int64)
+            segments = []
+            changed = False
+            new_base = 0
+
+            for base, segment in zip(self._bases, list(self.segments)):
+                base = int(base)
+                alive = segment.alive
+                alive_count = int(np.count_nonzero(alive))
+                dead_ratio = 1.0 - alive_count / segment.rows if segment.rows else 0.0
+                is_active = segment is self.segments[-1]
+
+                if alive_count == 0 and segment.rows and not is_active:
+                    self._remove_segment(segment)
+                    changed = True
+                    continue
+
+                if segment.rows and alive_count < segment.rows and dead_ratio >= min_dead_ratio:
+                    kept_rows = np.flatnonzero(alive)
+                    segment = self._rewrite_segment(segment, kept_rows)
+                    remap[base + kept_rows] = new_base + np.arange(len(kept_rows))
+                    changed = True
+                else:
+                    remap[base:base + segment.rows] = new_base + np.arange(segment.rows)
+
+                segments.append(segment)
+                new_base += segment.rows
+
+            if not changed:
+                return None
+
+            self._set_segments(segments)
+            self._build_row_indexes()
+            logger.info(f"Segment compaction tamamlandı: {old_total} -> {len(self)} satır")
+            return remap
+
+    def close(self):
+        with self._lock:
+            for segment in self.segments:
+                segment.close()
+            if self._strings_writer is not None:
+                self._strings_writer.close()
+                self._strings_writer = None
+
+    def _open(self):
+        dim_path = os.path.join(self.segments_dir, DIM_FILE)
+        if os.path.exists(dim_path):
+            with open(dim_path) as f:
+                self.dim = int(f.read().strip())
+
+        self._load_strings()
+
+        entries = sorted(os.listdir(self.segments_dir))
+        # Yarım kalmış compaction'ları temizle / geri al
+        for entry in entries:
+            entry_path = os.path.join(self.segments_dir, entry)
+            if entry.endswith('.compact'):
+                shutil.rmtree(entry_path, ignore_errors=True)
+            elif entry.endswith('.old'):
+                final_path = entry_path[:-len('.old')]
+                if os.path.exists(final_path):
+                    shutil.rmtree(entry_path, ignore_errors=True)
+                else:
+                    os.rename(entry_path, final_path)
+
+        segments = []
+        if self.dim is not None:
+            for entry in sorted(os.listdir(self.segments_dir)):
+                entry_path = os.path.join(self.segments_dir, entry)
+                if entry.isdigit() and os.path.isdir(entry_path):
+                    segments.append(Segment(entry_path, self.dim))
+        self._set_segments(segments)
+        self._build_row_indexes()
+
+        logger.info(f"Segment store açıldı: {self.segments_dir} "
+                    f"({len(self.segments)} segment, {len(self)} satır)")
+
+    def _set_segments(self, segments: List[Segment]):
+        rows = [segment.rows for segment in segments]
+        self._bases = np.concatenate(([0], np.cumsum(rows)[:-1])).astype(np.int64) if rows else np.zeros(0, dtype=np.int64)
+        self.segments = segments
+
+    def _build_row_indexes(self):
+        """job/dosya ikincil index'lerini kayıtlardan (vektörel) yeniden oluştur"""
+        self._job_rows = {}
+        self._file_rows = {}
+        parts = []
+        for base, segment in zip(self._bases, self.segments):
+            if not segment.rows:
+                continue
+            records = segment.records
+            local_rows = np.flatnonzero(segment.alive)
+            parts.append((local_rows + base, records['job_code'][local_rows],
+                          records['file_code'][local_rows], records['chunk_index'][local_rows]))
+        if not parts:
+            return
+
+        rows, job_codes, file_codes, chunk_indices = (np.concatenate(columns) for columns in zip(*parts))
+        for row_index, codes in ((self._job_rows, job_codes), (self._file_rows, file_codes)):
+            order = np.lexsort((rows, chunk_indices, codes))
+            boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+            for group in np.split(order, boundaries):
+                row_index[int(codes[group[0]])] = _RowList(chunk_indices[group].tolist(), rows[group].tolist())
+
+    def _unindex_rows(self, rows: np.ndarray):
+        """Silinecek satırları ikincil index'lerden çıkar"""
+        if not len(rows):
+            return
+        for row_index, field in ((self._job_rows, 'job_code'), (self._file_rows, 'file_code')):
+            codes = self.get_field(rows, field)
+            for code in np.unique(codes):
+                row_list = row_index.get(int(code))
+                if row_list is None:
+                    continue
+                row_list.remove(set(rows[codes == code].tolist()))
+                if not row_list.rows:
+                    del row_index[int(code)]
+
+    def _set_dim(self, dim: int):
+        self.dim = dim
+        tmp_path = os.path.join(self.segments_dir, DIM_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(str(dim))
+        os.replace(tmp_path, os.path.join(self.segments_dir, DIM_FILE))
+
+    def _new_segment(self):
+        if self.segments:
+            self.segments[-1].close_writers()
+        next_id = self.segments[-1].segment_id + 1 if self.segments else 1
+        path = os.path.join(self.segments_dir, f"{next_id:06d}")
+        os.makedirs(path, exist_ok=True)
+        self._set_segments(self.segments + [Segment(path, self.dim)])
+
+    def _rewrite_segment(self, segment: Segment, kept_rows: np.ndarray) -> Segment:
+        """Sadece canlı satırları içeren yeni dosyaları yaz ve atomik olarak değiştir"""
+        final_path = segment.path
+        compact_path = final_path + '.compact'
+        old_path = final_path + '.old'
+        shutil.rmtree(compact_path, ignore_errors=True)
+        os.makedirs(compact_path)
+
+        records = np.array(segment.records[kept_rows])
+        text_offset = 0
+        with open(os.path.join(compact_path, TEXTS_FILE), 'wb') as texts:
+            for i, local_row in enumerate(kept_rows):
+                text_bytes = segment.text(int(local_row)).encode('utf-8')
+                texts.write(text_bytes)
+                records['text_offset'][i] = text_offset
+                records['text_length'][i] = len(text_bytes)
+                text_offset += len(text_bytes)
+        np.ascontiguousarray(segment.embeddings[kept_rows]).tofile(os.path.join(compact_path, EMBEDDINGS_FILE))
+        records.tofile(os.path.join(compact_path, RECORDS_FILE))
+
+        segment.close()
+        os.rename(final_path, old_path)
+        os.rename(compact_path, final_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        return Segment(final_path, self.dim)
+
+    def _remove_segment(self, segment: Segment):
+        segment.close()
+        old_path = segment.path + '.old'
+        os.rename(segment.path, old_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def _load_strings(self):
+        """Job/dosya isim tablosu: [uint32 uzunluk][utf-8 byte] kayıtları"""
+        strings_path = os.path.join(self.segments_dir, STRINGS_FILE)
+        if not os.path.exists(strings_path):
+            return
+
+        with open(strings_path, 'rb') as f:
+            data = f.read()
+
+        offset = 0
+        while offset + 4 <= len(data):
+            (length,) = struct.unpack_from('<I', data, offset)
+            if offset + 4 + length > len(data):
+                break
+            value = data[offset + 4:offset + 4 + length].decode('utf-8')
+            self._string_codes[value] = len(self._strings)
+            self._strings.append(value)
+            offset += 4 + length
+
+        if offset != len(data):
+            logger.warning(f"String tablosu onarılıyor: {len(data)} -> {offset} byte")
+            with open(strings_path, 'r+b') as f:
+                f.truncate(offset)
+
+    def _intern(self, value: str) -> int:
+        code = self._string_codes.get(value)
+        if code is not None:
+            return code
+
+        if self._strings_writer is None:
+            self._strings_writer = open(os.path.join(self.segments_dir, STRINGS_FILE), 'ab')
+        encoded = value.encode('utf-8')
+        self._strings_writer.write(struct.pack('<I', len(encoded)) + encoded)
+        self._strings_writer.flush()
+
+        code = len(self._strings)
+        self._strings.append(value)
+        self._string_codes[value] = code
+        return code
@@ -0,0 +1,327 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+from segment_store import SegmentStore, RECORD_DTYPE, EMBEDDINGS_FILE, RECORDS_FILE
+
+logger = logging.getLogger(__name__)
+
+# Shard process'lerinde BLAS tek thread çalışır; paralellik process sayısından gelir
+_SINGLE_THREAD_ENV = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+class ShardSearchError(RuntimeError):
+    """Shard'lardan biri hata döndürdü, zamanında cevap vermedi veya erişilemiyor"""
+
+
+def owned_runs(base: int, rows: int, stripe_rows: int, shards: int, shard_id: int) -> List[Tuple[int, int]]:
+    """[base, base + rows) aralığında shard'a düşen global (başlangıç, bitiş) satır aralıkları
+
+    Global satırlar stripe_rows'luk şeritlere bölünür, şeritler shard'lara
+    sırayla (round-robin) dağıtılır.
+    """
+    runs = []
+    stripe = base // stripe_rows
+    while stripe * stripe_rows < base + rows:
+        if stripe % shards == shard_id:
+            runs.append((max(base, stripe * stripe_rows), min(base + rows, (stripe + 1) * stripe_rows)))
+        stripe += 1
+    return runs
+
+
+class _SegmentView:
+    """Shard process'inde tek segmentin read-only map'i ve shard'a düşen satır aralıkları"""
+
+    __slots__ = ('path', 'base', 'rows', 'embeddings', 'sq_norms', 'alive', 'runs')
+
+    def __init__(self, path: str, base: int, rows: int, dim: int, runs: List[Tuple[int, int]],
+                 previous: Optional['_SegmentView'] = None):
+        self.path = path
+        self.base = base
+        self.rows = rows
+        self.runs = [(start - base, end - base) for start, end in runs]
+        self.embeddings = np.memmap(os.path.join(path, EMBEDDINGS_FILE), dtype=np.float32,
+                                    mode='r', shape=(rows, dim))
+
+        # Segment büyüdüyse sadece yeni kayıtlar okunur
+        loaded = previous.rows if previous is not None else 0
+        records = np.memmap(os.path.join(path, RECORDS_FILE), dtype=RECORD_DTYPE, mode='r', shape=(rows,))
+        new_records = records[loaded:]
+        self.sq_norms = np.array(new_records['sq_norm'])
+        self.alive = np.array(new_records['deleted'] == 0)
+        if previous is not None:
+            self.sq_norms = np.concatenate((previous.sq_norms, self.sq_norms))
+            self.alive = np.concatenate((previous.alive, self.alive))
+        del records
+
+
+class _Shard:
+    """Shard process'inin durumu: sahip olduğu şeritler üzerinde brute-force top-k"""
+
+    def __init__(self, shard_id: int, shards: int, stripe_rows: int):
+        self.shard_id = shard_id
+        self.shards = shards
+        self.stripe_rows = stripe_rows
+        self.dim: Optional[int] = None
+        self.views: Dict[str, _SegmentView] = {}
+        self._bases = np.zeros(0, dtype=np.int64)
+        self._ordered: List[_SegmentView] = []
+
+    def apply_layout(self, layout: List[Tuple[str, int, int]], dim: Optional[int], reset: bool):
+        """Segment listesini uygula; reset (compaction sonrası) tüm map'leri yeniden açar"""
+        self.dim = dim
+        previous = {} if reset else self.views
+        views = {}
+        for path, base, rows in layout:
+            runs = owned_runs(base, rows, self.stripe_rows, self.shards, self.shard_id) if rows else []
+            if not runs:
+                continue
+            old = previous.get(path)
+            if old is not None and old.base == base and old.rows == rows:
+                views[path] = old
+                continue
+            reusable = old is not None and old.base == base and old.rows < rows
+            views[path] = _SegmentView(path, base, rows, dim, runs, old if reusable else None)
+        self.views = views
+        self._ordered = sorted(views.values(), key=lambda view: view.base)
+        self._bases = np.array([view.base for view in self._ordered], dtype=np.int64)
+
+    def delete(self, rows: np.ndarray):
+        if not len(self._ordered):
+            return
+        positions = np.searchsorted(self._bases, rows, side='right') - 1
+        for position in np.unique(positions):
+            if position < 0:
+                continue
+            view = self._ordered[position]
+            local_rows = rows[positions == position] - view.base
+            view.alive[local_rows[local_rows < view.rows]] = False
+
+    def search(self, queries: np.ndarray, k: int, metric: str):
+        from vector_store import pairwise_distances, top_k
+
+        candidate_distances = []
+        candidate_rows = []
+        for view in self._ordered:
+            for start, end in view.runs:
+                distances = pairwise_distances(queries, view.embeddings[start:end], view.sq_norms[start:end], metric)
+                distances[:, ~view.alive[start:end]] = np.inf
+                block_distances, columns = top_k(distances, k)
+                candidate_distances.append(block_distances)
+                candidate_rows.append(columns + view.base + start)
+
+        if not candidate_distances:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+        distances, positions = top_k(np.concatenate(candidate_distances, axis=1), k)
+        rows = np.take_along_axis(np.concatenate(candidate_rows, axis=1), positions, axis=1)
+        return distances, rows
+
+
+def _shard_main(connection, shard_id: int, shards: int, stripe_rows: int):
+    """Shard process döngüsü: layout / delete / search komutlarını sırayla işler"""
+    shard = _Shard(shard_id, shards, stripe_rows)
+    error = None
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        command = message[0]
+        if command == 'stop':
+            return
+        try:
+            if command == 'layout':
+                shard.apply_layout(*message[1:])
+                error = None
+            elif command == 'delete':
+                shard.delete(message[1])
+            elif command == 'search':
+                if error is not None:
+                    raise RuntimeError(f"Shard durumu geçersiz: {error}")
+                connection.send(('ok', message[1], shard.search(*message[2:])))
+        except Exception as e:
+            if command == 'search':
+                connection.send(('error', message[1], repr(e)))
+            else:
+                # Eksik uygulanan layout / delete sonrası sonuçlar yanlış olur;
+                # bir sonraki layout'a kadar aramalar hata döndürür
+                error = repr(e)
+
+
+class ShardedIndex:
+    """Embedding matrisini process'lere bölen, çok çekirdekli brute-force index
+
+    Her shard process'i segment dosyalarını read-only mmap eder (sayfa
+    cache'i paylaşılır, kopya yoktur) ve kendisine düşen satır şeritlerinde
+    lokal top-k hesaplar; sonuçlar ana process'te birleştirilir. Eklenen
+    satırlar sadece sahibi olan shard'a yeni layout olarak, silinen satırlar
+    sahibi olan shard'a tombstone olarak iletilir. Değişiklikler biriktirilir
+    ve bir sonraki aramadan önce gönderilir. Compaction sonrası tüm shard'lar
+    segment'leri yeniden map eder.
+
+    Bir shard hata döndürür, timeout saniyede cevap vermez veya çökerse
+    arama ShardSearchError fırlatır. Cevaplar arama numarasıyla etiketlenir;
+    zaman aşımına uğramış aramaların geç gelen cevapları atlanır.
+    """
+
+    def __init__(self, store: SegmentStore, metric: str = 'l2', shards: int = 0, stripe_rows: int = 4096,
+                 timeout: float = 10.0):
+        self.store = store
+        self.metric = metric
+        self.shards = max(1, shards or os.cpu_count() or 1)
+        self.stripe_rows = max(1, stripe_rows)
+        self.timeout = timeout
+        self._connections = []
+        self._processes = []
+        self._reset = True
+        self._pending_layout = set(range(self.shards))
+        self._pending_deletes: Dict[int, List[np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.searches = 0
+        self.failed_searches = 0
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        saved_env = {name: os.environ.get(name) for name in _SINGLE_THREAD_ENV}
+        os.environ.update({name: '1' for name in _SINGLE_THREAD_ENV})
+        try:
+            for shard_id in range(self.shards):
+                parent_connection, child_connection = context.Pipe()
+                process = context.Process(
+                    target=_shard_main,
+                    args=(child_connection, shard_id, self.shards, self.stripe_rows),
+                    name=f"vector-shard-{shard_id}",
+                    daemon=True
+                )
+                process.start()
+                child_connection.close()
+                self._connections.append(parent_connection)
+                self._processes.append(process)
+        finally:
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        logger.info(f"Sharded arama başlatıldı: {self.shards} shard, şerit {self.stripe_rows} satır")
+        return self
+
+    def is_alive(self) -> bool:
+        return bool(self._processes) and all(process.is_alive() for process in self._processes)
+
+    def owners(self, rows) -> np.ndarray:
+        return (np.asarray(rows, dtype=np.int64) // self.stripe_rows) % self.shards
+
+    def add(self, row: int):
+        with self._lock:
+            self._pending_layout.add(int(self.owners(row)))
+
+    def remove(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        owners = self.owners(rows)
+        with self._lock:
+            for shard_id in np.unique(owners).tolist():
+                self._pending_deletes.setdefault(shard_id, []).append(rows[owners == shard_id])
+
+    def apply_remap(self, remap: np.ndarray):
+        """Compaction sonrası: bekleyen silmeler yeni dosyalarda zaten yok, tüm shard'lar yeniden map eder"""
+        with self._lock:
+            self._pending_deletes.clear()
+            self._pending_layout = set(range(self.shards))
+            self._reset = True
+
+    def search(self, query, k: int, metric: Optional[str] = None):
+        """Tek sorgu için (distances, rows) döndür"""
+        distances, rows = self.search_batch(np.asarray(query, dtype=np.float32).reshape(1, -1), k, metric)
+        return distances[0], rows[0]
+
+    def search_batch(self, queries, k: int, metric: Optional[str] = None):
+        """Sorguları tüm shard'lara gönder, lokal top-k'ları birleştir (FlatIndex ile aynı sonuç)"""
+        from vector_store import top_k
+
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        metric = metric or self.metric
+        k = min(k, self.store.alive_count)
+
+        if k <= 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+
+        if queries.shape[1] != self.store.dim:
+            raise ValueError(f"Query boyutu uyuşmuyor: {queries.shape[1]} != {self.store.dim}")
+
+        with self._lock:
+            self.searches += 1
+            self._sequence += 1
+            deadline = time.monotonic() + self.timeout
+            try:
+                self._sync()
+                for connection in self._connections:
+                    connection.send(('search', self._sequence, queries, k, metric))
+                replies = [self._receive(connection, deadline) for connection in self._connections]
+            except ShardSearchError:
+                self.failed_searches += 1
+                raise
+            except (OSError, EOFError) as e:
+                self.failed_searches += 1
+                raise ShardSearchError(f"Shard bağlantı hatası: {e!r}") from e
+
+        errors = [payload for status, payload in replies if status != 'ok']
+        if errors:
+            self.failed_searches += 1
+            raise ShardSearchError(f"Shard arama hatası: {errors[0]}")
+
+        distances, positions = top_k(np.concatenate([payload[0] for _, payload in replies], axis=1), k)
+        rows = np.take_along_axis(np.concatenate([payload[1] for _, payload in replies], axis=1), positions, axis=1)
+        return distances, rows
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'shards': self.shards,
+            'stripe_rows': self.stripe_rows,
+            'alive': self.is_alive(),
+            'searches': self.searches,
+            'failed_searches': self.failed_searches
+        }
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.send(('stop',))
+                except (BrokenPipeError, OSError):
+                    pass
+            for process in self._processes:
+                process.join(timeout=5)
+            self._connections = []
+            self._processes = []
+
+    def _receive(self, connection, deadline: float):
+        """Son aramanın cevabını bekle; önceki aramaların geç kalan cevaplarını atla"""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not connection.poll(remaining):
+                raise ShardSearchError(f"Shard {self.timeout:g}s içinde cevap vermedi")
+            status, sequence, payload = connection.recv()
+            if sequence == self._sequence:
+                return status, payload
+
+    def _sync(self):
+        """Biriken layout ve silme değişikliklerini sahibi olan shard'lara gönder"""
+        if self._pending_layout:
+            layout = self.store.layout()
+            for shard_id in sorted(self._pending_layout):
+                self._connections[shard_id].send(('layout', layout, self.store.dim, self._reset))
+            self._pending_layout.clear()
+            self._reset = False
+        for shard_id, rows in self._pending_deletes.items():
+            self._connections[shard_id].send(('delete', np.concatenate(rows)))
+        self._pending_deletes.clear()
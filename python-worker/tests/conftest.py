@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+WORKER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, WORKER_DIR)
+# benchmarks/ sonda: oradaki sharded_search.py worker modülünü gölgelememeli
+sys.path.append(os.path.join(WORKER_DIR, 'benchmarks'))
+
+from fake_services import FakeServices  # noqa: E402
+
+
+@pytest.fixture
+def services():
+    """Testin ayarlayabileceği sahte Ollama sunucusu (8 boyutlu embedding)"""
+    fake = FakeServices(dim=8).start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch, services):
+    """Sahte sunucuya bağlı VectorStore üretir; ek ayarlar env değişkeni olarak verilir"""
+    def factory(**env):
+        settings = {
+            'OLLAMA_HOST': services.url,
+            'BACKEND_URL': services.url,
+            'EMBEDDING_MAX_RETRIES': '1',
+            'EMBEDDING_CACHE_MAX_ENTRIES': '0',
+            'NEAR_DUPLICATE_THRESHOLD': '0'
+        }
+        settings.update(env)
+        for name, value in settings.items():
+            monkeypatch.setenv(name, str(value))
+
+        from vector_store import VectorStore
+        store = VectorStore(str(tmp_path / 'vectors'))
+        store.wait_until_ready()
+        return store
+    return factory
+
+
+@pytest.fixture
+def redis_server():
+    """Testteki worker'ların paylaştığı bellek içi Redis"""
+    fakeredis = pytest.importorskip('fakeredis')
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def make_worker(tmp_path, monkeypatch, services, redis_server):
+    """fakeredis ve sahte Ollama/backend'e bağlı RedisWorker üretir; ek ayarlar env değişkeni olarak verilir"""
+    import fakeredis
+    import redis
+
+    workers = []
+
+    def factory(**env):
+        settings = {
+            'OLLAMA_HOST': services.url,
+            'BACKEND_URL': services.url,
+            'VECTORS_DIR': str(tmp_path / 'vectors'),
+            'METRICS_PORT': '0',
+            'EMBEDDING_MAX_RETRIES': '1',
+            'EMBEDDING_CACHE_MAX_ENTRIES': '0',
+            'BACKEND_UPLOAD_MAX_RETRIES': '0',
+            'NEAR_DUPLICATE_THRESHOLD': '0'
+        }
+        settings.update(env)
+        for name, value in settings.items():
+            monkeypatch.setenv(name, str(value))
+        monkeypatch.setattr(redis, 'Redis', lambda **kwargs: fakeredis.FakeRedis(server=redis_server, **kwargs))
+
+        from worker import RedisWorker
+        worker = RedisWorker()
+        worker.vector_store.wait_until_ready()
+        workers.append(worker)
+        return worker
+
+    yield factory
+    for worker in workers:
+        worker.log_sink.close()
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from worker import JobRetryError
+
+
+def write_document(tmp_path):
+    path = tmp_path / 'rapor.md'
+    path.write_text('# Rapor\n\n' + '\n\n'.join(f"Paragraf {i}: " + 'içerik metni ' * 40 for i in range(6)),
+                    encoding='utf-8')
+    return str(path)
+
+
+def test_backend_outage_retries_job_without_local_vectors(make_worker, services, tmp_path):
+    worker = make_worker()
+    path = write_document(tmp_path)
+    services.backend_fail_next = 100
+
+    with pytest.raises(JobRetryError):
+        worker.process_document(path, 'rapor.md', 'job1')
+
+    # Yerel store backend'den ayrışmaz; buffer'da gönderilmemiş vector kalmaz
+    assert worker.vector_store.get_vector_ids_by_job('job1') == []
+    assert worker.vector_store.backend_uploader.pending_count('job1') == 0
+
+    # Backend'e ulaşılamadığı için silme bekletildi; tekrar gönderimden önce yapılır
+    uploader = worker.vector_store.backend_uploader
+    assert uploader.stats()['deferred_deletes'] > 0
+
+    services.backend_fail_next = 0
+    worker.process_document(path, 'rapor.md', 'job1')
+    assert worker.vector_store.get_vector_ids_by_job('job1') != []
+    assert uploader.stats()['deferred_deletes'] == 0
+    assert uploader.stats()['uploaded_vectors'] == len(worker.vector_store.get_vector_ids_by_job('job1'))
+
+
+def test_backend_outage_requeues_job(make_worker, services, tmp_path):
+    worker = make_worker()
+    job_json = json.dumps({'id': 'job1', 'fileName': 'rapor.md', 'filePath': write_document(tmp_path)})
+    services.backend_fail_next = 100
+
+    assert worker.process_job(job_json) is True
+    assert worker.redis_client.hget(worker.attempts_hash_name, job_json) == '1'
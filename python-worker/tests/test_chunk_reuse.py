@@ -0,0 +1,49 @@
+import numpy as np
+
+
+def save_job(store, job_id, embeddings):
+    for chunk_index, embedding in enumerate(embeddings):
+        store.save_vector({
+            'job_id': job_id,
+            'file_name': 'doc.md',
+            'file_path': '/data/doc.md',
+            'chunk_index': chunk_index,
+            'chunk_text': f"{job_id} chunk {chunk_index}",
+            'embedding': embedding.tolist()
+        })
+
+
+def test_reusable_vectors_survive_compaction(make_store):
+    store = make_store(VECTOR_SEGMENT_MAX_ROWS=16, VECTOR_COMPACTION_DEAD_RATIO=0.1)
+    rng = np.random.default_rng(0)
+    removed = rng.normal(size=(20, 8)).astype(np.float32)
+    previous = rng.normal(size=(10, 8)).astype(np.float32)
+    save_job(store, 'removed', removed)
+    save_job(store, 'previous', previous)
+    hashes = [f"hash{i}" for i in range(10)]
+
+    reusable = store.find_reusable_vectors('previous', hashes)
+
+    # Eşleme alındıktan sonra compaction satırları yeniden numaralandırır
+    rows_before = store.store.find_rows(job_id='previous').tolist()
+    store.delete_vectors_by_job('removed')
+    # Silme arka plan compaction'ını da tetikler; hangisi önce çalışırsa
+    store.compact()
+    assert store.compactions == 1
+    assert store.store.find_rows(job_id='previous').tolist() != rows_before
+
+    assert sorted(reusable) == sorted(hashes)
+    for i, chunk_hash in enumerate(hashes):
+        np.testing.assert_array_equal(reusable[chunk_hash], previous[i])
+
+
+def test_chunks_beyond_manifest_are_not_reused(make_store):
+    store = make_store()
+    embeddings = np.random.default_rng(1).normal(size=(5, 8)).astype(np.float32)
+    save_job(store, 'previous', embeddings)
+
+    reusable = store.find_reusable_vectors('previous', ['a', 'b', 'a'])
+
+    assert sorted(reusable) == ['a', 'b']
+    np.testing.assert_array_equal(reusable['a'], embeddings[0])
+    np.testing.assert_array_equal(reusable['b'], embeddings[1])
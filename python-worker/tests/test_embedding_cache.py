@@ -0,0 +1,39 @@
+from embedding_cache import EmbeddingCache
+
+
+def embedding(value: float):
+    return [value, value + 1.0]
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_entries=10)
+    cache.put_many('m', [f"t{i}" for i in range(10)], [embedding(i) for i in range(10)])
+    # t0 ve t1 okunarak en yeni kullanılanlar olur
+    assert cache.get_many('m', ['t0', 't1']) == [embedding(0), embedding(1)]
+
+    cache.put('m', 't10', embedding(10))
+
+    # 11 kayıt > 10: %10 pay bırakılarak 9'a inilir, en eski kullanılan t2 ve t3 silinir
+    assert cache.stats()['entries'] == 9
+    assert cache.stats()['evictions'] == 2
+    assert cache.get_many('m', ['t2', 't3']) == [None, None]
+    assert cache.get_many('m', ['t0', 't1', 't4', 't10']) == [embedding(0), embedding(1), embedding(4), embedding(10)]
+    cache.close()
+
+
+def test_entries_are_per_model_and_survive_reopen(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_entries=10)
+    cache.put('m', 'metin', embedding(1))
+    cache.put('m', 'metin', embedding(2))
+    cache.close()
+
+    cache = EmbeddingCache(str(tmp_path), max_entries=10)
+    assert cache.get('m', 'metin') == embedding(1)
+    assert cache.get('başka-model', 'metin') is None
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses']) == (1, 1, 1)
+
+    # Yeniden açılan cache LRU saatini kaldığı yerden sürdürür
+    cache.put_many('m', [f"t{i}" for i in range(10)], [embedding(i) for i in range(10)])
+    assert cache.get('m', 'metin') is None
+    cache.close()
@@ -0,0 +1,122 @@
+import time
+
+import pytest
+
+from fake_services import fake_embedding
+from embedding_client import (OllamaEmbeddingClient, EmbeddingError, EmbeddingRejectedError,
+                              EmbeddingUnavailableError)
+
+
+def make_client(services, **kwargs):
+    options = dict(request_batch_size=1, max_concurrency=8, initial_concurrency=2, max_retries=3,
+                   backoff_seconds=0.01, timeout=5, failure_threshold=100, reset_timeout=30)
+    options.update(kwargs)
+    return OllamaEmbeddingClient(services.url, 'test-model', **options)
+
+
+def expected(texts, dim=8):
+    return [pytest.approx(fake_embedding(text, dim).tolist()) for text in texts]
+
+
+def test_limiter_grows_while_requests_succeed(services):
+    services.latency_ms = 30
+    client = make_client(services)
+    texts = [f"text {i}" for i in range(60)]
+
+    assert client.embed_many(texts) == expected(texts)
+    assert client.limiter.increases > 0
+    assert client.limiter.decreases == 0
+    assert client.limiter.limit > 2
+    client.close()
+
+
+def test_limiter_shrinks_on_503(services):
+    services.latency_ms = 20
+    services.max_concurrency = 2
+    client = make_client(services, initial_concurrency=8, max_retries=10)
+    # Her 503'te azaltılsın; varsayılan 1s cooldown'da limit test bitmeden tekrar 8'e çıkabiliyor
+    client.limiter.cooldown = 0
+    texts = [f"text {i}" for i in range(40)]
+
+    assert client.embed_many(texts) == expected(texts)
+    assert services.failed_requests > 0
+    assert client.retries > 0
+    assert client.limiter.decreases > 0
+    assert client.limiter.limit <= 4
+    assert client.breaker.state == 'closed'
+    client.close()
+
+
+def test_limiter_shrinks_when_server_slows_down(services):
+    services.latency_ms = 2
+    services.contention_ms = 20
+    client = make_client(services, initial_concurrency=1)
+    texts = [f"text {i}" for i in range(60)]
+
+    assert client.embed_many(texts) == expected(texts)
+    assert services.failed_requests == 0
+    assert client.limiter.decreases > 0
+    assert client.limiter.limit < 8
+    client.close()
+
+
+def test_circuit_breaker_opens_rejects_and_recovers(services):
+    services.fail_next = 1000
+    client = make_client(services, max_retries=2, failure_threshold=3, reset_timeout=0.3)
+
+    with pytest.raises(EmbeddingError):
+        client.embed_many(['a'])
+    assert client.breaker.state == 'open'
+    assert client.breaker.opened == 1
+
+    # Açıkken istek gönderilmeden hemen reddedilir
+    failed = services.failed_requests
+    with pytest.raises(EmbeddingUnavailableError):
+        client.embed_many(['b'])
+    assert services.failed_requests == failed
+    assert client.rejected_requests > 0
+
+    services.fail_next = 0
+    time.sleep(0.35)
+    assert client.embed_many(['c']) == expected(['c'])
+    assert client.breaker.state == 'closed'
+    client.close()
+
+
+def test_half_open_probe_failure_reopens_breaker(services):
+    services.fail_next = 1000
+    client = make_client(services, max_retries=0, failure_threshold=1, reset_timeout=0.2)
+
+    with pytest.raises(EmbeddingError):
+        client.embed_many(['a'])
+    time.sleep(0.25)
+    with pytest.raises(EmbeddingError):
+        client.embed_many(['b'])
+    assert client.breaker.state == 'open'
+    assert client.breaker.opened == 2
+    client.close()
+
+
+def test_rejected_batch_falls_back_to_single_texts(services):
+    services.max_batch_items = 4
+    client = make_client(services, request_batch_size=8)
+    texts = [f"text {i}" for i in range(20)]
+
+    assert client.embed_many(texts) == expected(texts)
+    # 8'lik iki batch reddedildi ve tek tek, son 4'lük batch bir istekte gönderildi
+    assert services.embed_requests == 8 + 8 + 1
+    assert client.breaker.state == 'closed'
+    client.close()
+
+
+def test_rejected_single_text_raises(services):
+    services.fail_next = 2
+    services.fail_status = 400
+    client = make_client(services, request_batch_size=8)
+
+    with pytest.raises(EmbeddingRejectedError):
+        client.embed_many(['a', 'b'])
+    # 4xx tekrar denenmez ve servis ayakta sayılır
+    assert client.retries == 0
+    assert client.breaker.state == 'closed'
+    client.close()
@@ -0,0 +1,37 @@
+import pytest
+
+from fake_services import fake_embedding
+
+
+def expected(texts, dim=8):
+    return [pytest.approx(fake_embedding(text, dim).tolist()) for text in texts]
+
+
+def test_texts_are_split_into_request_batches(make_store, services):
+    store = make_store(EMBEDDING_REQUEST_BATCH_SIZE=4)
+    texts = [f"chunk {i}" for i in range(10)]
+
+    assert store.generate_embeddings(texts) == expected(texts)
+    assert services.embed_requests == 3
+    assert services.embedded_texts == 10
+
+
+def test_cached_texts_are_not_sent_again(make_store, services):
+    store = make_store(EMBEDDING_REQUEST_BATCH_SIZE=4, EMBEDDING_CACHE_MAX_ENTRIES=100)
+    store.generate_embeddings(['a', 'b', 'c'])
+
+    texts = ['a', 'x', 'b', 'y']
+    assert store.generate_embeddings(texts) == expected(texts)
+    assert services.embedded_texts == 3 + 2
+
+
+def test_missing_batch_endpoint_falls_back_to_legacy_api(make_store, services):
+    services.legacy = True
+    store = make_store(EMBEDDING_REQUEST_BATCH_SIZE=4)
+    texts = [f"chunk {i}" for i in range(6)]
+
+    assert store.generate_embeddings(texts) == expected(texts)
+    assert store.embedding_client._legacy_endpoint
+    # /api/embeddings tek text alır
+    assert services.embed_requests == 6
+    assert store.generate_embedding('tek') == expected(['tek'])[0]
@@ -0,0 +1,76 @@
+import time
+import threading
+
+import numpy as np
+
+from vector_store import IVFIndex
+
+
+def save(store, job_id, count, rng):
+    for chunk_index in range(count):
+        store.save_vector({
+            'job_id': job_id,
+            'file_name': f"{job_id}.md",
+            'file_path': f"/data/{job_id}.md",
+            'chunk_index': chunk_index,
+            'chunk_text': f"{job_id} chunk {chunk_index}",
+            'embedding': rng.normal(size=8).astype(np.float32).tolist()
+        })
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "zaman aşımı"
+        time.sleep(0.01)
+
+
+def test_ivf_is_trained_in_background_and_swapped_in(make_store, monkeypatch):
+    fit_started = threading.Event()
+    release = threading.Event()
+    fitted_copy = IVFIndex.fitted_copy
+
+    def blocking_fitted_copy(self, sample):
+        fit_started.set()
+        assert release.wait(10)
+        return fitted_copy(self, sample)
+
+    monkeypatch.setattr(IVFIndex, 'fitted_copy', blocking_fitted_copy)
+    store = make_store(VECTOR_INDEX='ivf', IVF_MIN_TRAIN_ROWS=200, IVF_NLIST=8, LEXICAL_INDEX='false')
+    untrained = store.ann_index
+    rng = np.random.default_rng(0)
+
+    save(store, 'first', 250, rng)
+    assert fit_started.wait(10)
+
+    # k-means sürerken kayıt ve silme kilide takılmaz, arama FlatIndex ile yapılır
+    started = time.monotonic()
+    save(store, 'second', 50, rng)
+    assert store.delete_vectors_by_job('first', range(0, 20))
+    assert time.monotonic() - started < 5
+    assert not store.ann_index.is_trained
+    assert store._search_index(None) is store.index
+
+    release.set()
+    wait_for(lambda: store.ann_index.is_trained)
+    assert store.ann_index is not untrained
+    assert store._search_index(None) is store.ann_index
+
+    alive_rows = store._job_rows('first', None).tolist() + store._job_rows('second', None).tolist()
+    assert store.ann_index.indexed_rows().tolist() == sorted(alive_rows)
+    assert len(store.ann_index) == store.store.alive_count == 280
+
+    row = alive_rows[-1]
+    _, rows = store.ann_index.search(store.store.get_embedding(row), 1, nprobe=8)
+    assert rows[0] == row
+
+
+def test_rows_saved_after_training_are_added_to_lists(make_store):
+    store = make_store(VECTOR_INDEX='ivf', IVF_MIN_TRAIN_ROWS=100, IVF_NLIST=4, LEXICAL_INDEX='false')
+    rng = np.random.default_rng(1)
+
+    save(store, 'first', 120, rng)
+    wait_for(lambda: store.ann_index.is_trained)
+    save(store, 'second', 30, rng)
+
+    assert len(store.ann_index) == store.store.alive_count == 150
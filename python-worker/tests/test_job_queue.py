@@ -0,0 +1,89 @@
+import json
+import time
+
+import pytest
+
+from worker import job_payload
+
+JOB = json.dumps({'id': 'job1', 'fileName': 'rapor.md', 'filePath': '/data/rapor.md'})
+
+
+@pytest.fixture
+def worker(make_worker):
+    return make_worker(WORKER_ID='w1', JOB_VISIBILITY_TIMEOUT='30')
+
+
+def processing(worker):
+    return worker.redis_client.lrange(worker.processing_list_name, 0, -1)
+
+
+def test_claim_writes_token_entry(worker):
+    worker.redis_client.lpush(worker.queue_name, JOB)
+
+    entry = worker.claim_job(timeout=1)
+
+    assert entry != JOB and job_payload(entry) == JOB
+    assert processing(worker) == [entry]
+    assert worker.redis_client.hget(worker.claims_hash_name, entry).startswith('w1|')
+    assert worker.claim_job(timeout=0.1) is None
+
+
+def test_ack_and_retry_only_touch_own_copy(worker):
+    worker.redis_client.lpush(worker.queue_name, JOB, JOB)
+    first = worker.claim_job(timeout=1)
+    second = worker.claim_job(timeout=1)
+    assert first != second
+
+    worker.ack_job(first)
+    assert processing(worker) == [second]
+    assert worker.redis_client.hexists(worker.claims_hash_name, second)
+
+    worker.redis_client.lpush(worker.queue_name, 'diğer')
+    worker.retry_job(second)
+    assert processing(worker) == []
+    assert not worker.redis_client.hexists(worker.claims_hash_name, second)
+    # Tekrar denenecek job kuyruğun sonuna (en son alınacak yere) konur
+    assert worker.redis_client.lrange(worker.queue_name, 0, -1) == [JOB, 'diğer']
+    # Zaten kuyruğa dönmüş kayıt için ikinci retry bir şey yapmaz
+    worker.retry_job(second)
+    assert worker.redis_client.llen(worker.queue_name) == 2
+
+
+def test_stale_requeue_keeps_fresh_identical_claim(worker):
+    worker.redis_client.lpush(worker.queue_name, JOB, JOB)
+    stale = worker.claim_job(timeout=1)
+    fresh = worker.claim_job(timeout=1)
+    worker.redis_client.hset(worker.claims_hash_name, stale, f"w2|{time.time() - 60}")
+
+    assert worker.requeue_stale_jobs() == 1
+
+    assert processing(worker) == [fresh]
+    assert worker.redis_client.lrange(worker.queue_name, 0, -1) == [JOB]
+    # Requeue edilen kaydın geç gelen ack'i diğer kopyayı silmez
+    worker.ack_job(stale)
+    assert processing(worker) == [fresh]
+
+
+def test_startup_requeues_own_leftovers(worker):
+    worker.redis_client.lpush(worker.queue_name, JOB)
+    entry = worker.claim_job(timeout=1)
+    worker.redis_client.hset(worker.claims_hash_name, entry, f"w2|{time.time()}")
+    worker.redis_client.lpush(worker.queue_name, JOB)
+    own = worker.claim_job(timeout=1)
+
+    assert worker.requeue_stale_jobs(startup=True) == 1
+    assert processing(worker) == [entry]
+    assert not worker.redis_client.hexists(worker.claims_hash_name, own)
+
+
+def test_unconverted_entry_is_requeued_after_timeout(worker):
+    # BLMOVE'dan sonra, token'lı kayda çevrilmeden ölen worker'ın bıraktığı ham kayıt
+    worker.redis_client.lpush(worker.processing_list_name, JOB)
+
+    assert worker.requeue_stale_jobs() == 0
+    assert worker.redis_client.hexists(worker.claims_hash_name, JOB)
+
+    worker.redis_client.hset(worker.claims_hash_name, JOB, f"|{time.time() - 60}")
+    assert worker.requeue_stale_jobs() == 1
+    assert processing(worker) == []
+    assert worker.redis_client.lrange(worker.queue_name, 0, -1) == [JOB]
@@ -0,0 +1,68 @@
+import pytest
+
+from log_sink import RedisLogSink
+
+
+@pytest.fixture
+def client(redis_server):
+    import fakeredis
+    return fakeredis.FakeRedis(server=redis_server, decode_responses=True)
+
+
+class FailingPipeline:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis yok")
+        return fail
+
+
+def test_entries_are_buffered_until_flush(client):
+    sink = RedisLogSink(client, 'logs', flush_interval=60, batch_size=100)
+
+    for i in range(5):
+        sink.emit(f"kayıt {i}")
+    assert client.llen('logs') == 0
+    assert sink.stats()['buffered'] == 5
+
+    assert sink.flush()
+    # Tek tek LPUSH ile aynı sıra: en yeni kayıt başta
+    assert client.lrange('logs', 0, -1) == [f"kayıt {i}" for i in reversed(range(5))]
+    assert (sink.stats()['written'], sink.stats()['flushes']) == (5, 1)
+    sink.close()
+
+
+def test_close_writes_remaining_entries(client):
+    sink = RedisLogSink(client, 'logs', flush_interval=60, batch_size=100)
+    sink.emit("son kayıt")
+
+    sink.close()
+
+    assert client.lrange('logs', 0, -1) == ["son kayıt"]
+    # Kapandıktan sonra close tekrar çağrılabilir (atexit)
+    sink.close()
+
+
+def test_list_is_trimmed_and_overflow_counted(client):
+    sink = RedisLogSink(client, 'logs', max_list_length=3, buffer_size=4, flush_interval=60, batch_size=100)
+
+    for i in range(6):
+        sink.emit(str(i))
+    assert sink.stats()['dropped'] == 2
+    sink.close()
+
+    assert client.lrange('logs', 0, -1) == ['5', '4', '3']
+
+
+def test_failed_flush_keeps_entries_in_order(client, monkeypatch):
+    sink = RedisLogSink(client, 'logs', flush_interval=0.01, batch_size=100)
+    monkeypatch.setattr(client, 'pipeline', lambda **kwargs: FailingPipeline())
+    sink.emit('a')
+    sink.emit('b')
+
+    assert not sink.flush(timeout=0.2)
+    assert sink.stats()['flush_errors'] >= 1
+
+    monkeypatch.undo()
+    assert sink.flush()
+    assert client.lrange('logs', 0, -1) == ['b', 'a']
+    sink.close()
@@ -0,0 +1,101 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from document_processor import DocumentProcessor
+from markdown_text import SectionStart, inline_text, iter_markdown_blocks
+
+pytest.importorskip('markdown')
+pytest.importorskip('fitz')  # corpus PDF üretimi için
+
+from corpus import make_markdown  # noqa: E402
+from markdown_extraction import html_extract, streaming_extract, word_overlap  # noqa: E402
+
+DOCUMENT = """Rapor Başlığı
+=============
+
+Giriş paragrafı **kalın**, *italik* ve `kod` içerir; [bağlantı](https://example.com) metni kalır.
+
+## Bulgular ##
+
+- birinci madde
+- ikinci madde
+1. numaralı madde
+
+> alıntı satırı
+
+Alt Başlık
+----------
+
+    girintili kod
+
+Son paragraf.
+"""
+
+
+def test_matches_html_path(tmp_path):
+    path = tmp_path / 'rapor.md'
+    path.write_text(DOCUMENT, encoding='utf-8')
+    processor = DocumentProcessor()
+
+    assert streaming_extract(processor, str(path)).split() == html_extract(processor, str(path)).split()
+    assert processor.extract_text(str(path)) == streaming_extract(processor, str(path))
+
+
+def test_generated_corpus_matches_html_path(tmp_path):
+    path = make_markdown(str(tmp_path / 'sentetik.md'), 64 * 1024, np.random.default_rng(5))
+    processor = DocumentProcessor()
+
+    html_text, streaming_text = html_extract(processor, path), streaming_extract(processor, path)
+
+    assert word_overlap(html_text, streaming_text) > 0.99
+    # Tek fark: HTML yolu kod bloklarının dil etiketini (```python) text olarak bırakır
+    assert Counter(streaming_text.split()) - Counter(html_text.split()) == Counter()
+    assert set(Counter(html_text.split()) - Counter(streaming_text.split())) == {'python'}
+
+
+def test_differences_from_html_path():
+    # HTML yolu resim alt text'ini siler, entity'leri ve tablo ayraçlarını olduğu gibi bırakırdı
+    assert inline_text("![şema](a.png) &amp; <br/>son") == "şema & son"
+    assert list(iter_markdown_blocks(["| a | b |", "|---|:-:|", "| 1 | 2 |"])) == ["  a   b  \n  1   2  "]
+
+
+def test_headings_start_sections():
+    blocks = list(iter_markdown_blocks(DOCUMENT.splitlines(True)))
+
+    assert [block.split('\n')[0] for block in blocks] == ["Rapor Başlığı", "Bulgular", "Alt Başlık"]
+    assert all(isinstance(block, SectionStart) for block in blocks)
+    assert blocks[1].split('\n')[1:] == ["birinci madde", "ikinci madde", "numaralı madde", "alıntı satırı"]
+
+
+def test_code_fences_are_kept_verbatim():
+    lines = ["giriş", "```python", "# yorum, başlık değil", "x = [a](b) * 2", "```", "# Sonraki"]
+
+    blocks = list(iter_markdown_blocks(lines))
+
+    assert blocks == ["giriş\n# yorum, başlık değil\nx = [a](b) * 2", "Sonraki"]
+    assert not isinstance(blocks[0], SectionStart) and isinstance(blocks[1], SectionStart)
+
+
+def test_large_section_is_split_into_plain_blocks():
+    lines = ["# Uzun"] + [f"satır {i} " + "x" * 20 for i in range(10)]
+
+    blocks = list(iter_markdown_blocks(lines, max_block_chars=100))
+
+    assert isinstance(blocks[0], SectionStart)
+    assert not any(isinstance(block, SectionStart) for block in blocks[1:])
+    assert '\n'.join(blocks).split('\n') == ["Uzun"] + [f"satır {i} " + "x" * 20 for i in range(10)]
+
+
+def test_chunks_break_at_headings(tmp_path):
+    path = tmp_path / 'bolumler.md'
+    first = "Birinci bölüm metni. " * 30
+    path.write_text(f"# Bir\n\n{first}\n\n# İki\n\n" + "İkinci bölüm metni. " * 30, encoding='utf-8')
+    processor = DocumentProcessor(chunk_size=1000, chunk_overlap=200)
+
+    chunks = list(processor.iter_chunks(processor.iter_pages(str(path))))
+
+    # Başlık pencerenin ikinci yarısında: chunk orada biter, sonraki overlap almaz
+    assert chunks[0] == processor._clean_text(f"Bir {first}")
+    assert chunks[1].startswith("İki İkinci bölüm")
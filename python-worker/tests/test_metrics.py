@@ -0,0 +1,87 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import metrics
+
+
+def sample(text: str, prefix: str) -> float:
+    """Exposition çıktısında prefix ile başlayan tek örneğin değeri"""
+    values = [line.rsplit(' ', 1)[1] for line in text.splitlines() if line.startswith(prefix + ' ')]
+    assert len(values) == 1, values
+    return float(values[0])
+
+
+def test_registry_renders_prometheus_text():
+    registry = metrics.MetricsRegistry()
+    jobs = registry.counter('test_jobs_total', 'Job sayısı', ['status'])
+    depth = registry.gauge('test_queue_depth', 'Kuyruk')
+    latency = registry.histogram('test_seconds', 'Süre', ['stage'], buckets=(0.1, 1.0))
+    jobs.inc(status='success')
+    jobs.inc(2, status='error')
+    depth.set_function(lambda: 7)
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, stage='embed')
+
+    text = registry.render()
+
+    assert registry.counter('test_jobs_total', 'Job sayısı', ['status']) is jobs
+    assert text.endswith('\n')
+    assert '# HELP test_jobs_total Job sayısı\n# TYPE test_jobs_total counter' in text
+    assert sample(text, 'test_jobs_total{status="success"}') == 1
+    assert sample(text, 'test_jobs_total{status="error"}') == 2
+    assert sample(text, 'test_queue_depth') == 7
+    assert '# TYPE test_seconds histogram' in text
+    # Bucket'lar kümülatif
+    assert sample(text, 'test_seconds_bucket{stage="embed",le="0.1"}') == 1
+    assert sample(text, 'test_seconds_bucket{stage="embed",le="1.0"}') == 2
+    assert sample(text, 'test_seconds_bucket{stage="embed",le="+Inf"}') == 3
+    assert sample(text, 'test_seconds_count{stage="embed"}') == 3
+    assert sample(text, 'test_seconds_sum{stage="embed"}') == pytest.approx(5.55)
+
+
+def test_failing_gauge_function_is_skipped():
+    registry = metrics.MetricsRegistry()
+    registry.gauge('test_broken', 'Okunamayan gauge').set_function(lambda: 1 / 0)
+
+    assert registry.render() == "# HELP test_broken Okunamayan gauge\n# TYPE test_broken gauge\n"
+
+
+def test_server_serves_metrics_endpoint():
+    registry = metrics.MetricsRegistry()
+    registry.counter('test_requests_total', 'İstek').inc(3)
+    server = metrics.MetricsServer(registry, host='127.0.0.1', port=0)
+    server.start()
+    url = f"http://127.0.0.1:{server._server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(url + '/metrics?x=1', timeout=5) as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert sample(response.read().decode('utf-8'), 'test_requests_total') == 3
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url + '/health', timeout=5)
+        assert error.value.code == 404
+    finally:
+        server.stop()
+
+
+def test_worker_job_updates_metrics(make_worker, tmp_path):
+    worker = make_worker()
+    worker.start_metrics_server()
+    path = tmp_path / 'notlar.md'
+    path.write_text("# Başlık\n\n" + "Bu paragraf metrik testi içindir. " * 80, encoding='utf-8')
+    completed = metrics.JOBS_TOTAL.value(status='completed')
+    chunks = metrics.CHUNKS_TOTAL.value()
+
+    worker.process_job(json.dumps({'id': 'job1', 'fileName': 'notlar.md', 'filePath': str(path)}))
+
+    text = metrics.REGISTRY.render()
+    assert sample(text, 'worker_jobs_total{status="completed"}') == completed + 1
+    assert sample(text, 'worker_chunks_total') == chunks + worker.vector_store.store.alive_count
+    assert sample(text, 'worker_processed_bytes_total') >= path.stat().st_size
+    for stage in ('extract', 'chunk', 'embed'):
+        assert sample(text, f'worker_stage_seconds_count{{stage="{stage}"}}') >= 1
+    assert sample(text, 'vector_store_vectors') == worker.vector_store.store.alive_count > 0
+    assert sample(text, 'worker_queue_depth') == 0
+    assert sample(text, 'vector_store_ready') == 1
@@ -0,0 +1,114 @@
+import pytest
+
+from embedding_client import EmbeddingError
+
+BOILERPLATE = ("Bu belge şirket içi kullanım içindir ve izinsiz paylaşılamaz; tüm hakları saklıdır, "
+               "sorularınız için bilgi güvenliği ekibi ile iletişime geçiniz ve belge numarasını belirtiniz")
+
+
+def process(store, job_id, texts, first_chunk_index=0, fail=()):
+    """Worker'ın batch akışı: kontrol, benzersizleri embed edip kaydet, sonra index'e ekle"""
+    checks = store.find_near_duplicates(job_id, first_chunk_index, texts)
+    unique = [i for i, (_, match) in enumerate(checks) if match is None]
+    saved = set()
+    for i, embedding in zip(unique, store.generate_embeddings([texts[i] for i in unique])):
+        if i in fail:
+            continue
+        if store.save_vector({
+            'job_id': job_id,
+            'file_name': f"{job_id}.md",
+            'file_path': f"/data/{job_id}.md",
+            'chunk_index': first_chunk_index + i,
+            'chunk_text': texts[i],
+            'embedding': embedding
+        }):
+            saved.add(i)
+    store.register_near_duplicates(job_id, f"{job_id}.md", f"/data/{job_id}.md", first_chunk_index,
+                                   texts, checks, saved)
+    return [match[0] if match else None for _, match in checks]
+
+
+@pytest.fixture
+def store(make_store):
+    return make_store(NEAR_DUPLICATE_THRESHOLD='0.9')
+
+
+def test_embedding_failure_registers_nothing(store, services):
+    texts = [BOILERPLATE, "tamamen farklı bir paragraf, bütçe tablosu ve yıllık hedefler hakkında notlar"]
+    services.fail_next = 10
+    with pytest.raises(EmbeddingError):
+        process(store, 'a', texts)
+    services.fail_next = 0
+
+    # İmzası eklenmediği için kaydedilmemiş chunk canonical seçilmez
+    assert store.near_duplicates.job_count('a') == 0
+    assert process(store, 'b', [BOILERPLATE]) == [None]
+    assert store.store.find_rows(job_id='b').tolist() != []
+
+
+def test_unsaved_chunk_is_not_canonical(store):
+    assert process(store, 'a', [BOILERPLATE], fail={0}) == [None]
+    assert store.near_duplicates.job_count('a') == 0
+    assert process(store, 'b', [BOILERPLATE]) == [None]
+
+
+def test_duplicates_within_batch(store):
+    canonical = process(store, 'a', ["giriş", BOILERPLATE, BOILERPLATE + " ek"], first_chunk_index=4)
+
+    assert canonical == [None, None, 'a_5']
+    assert store.get_vector_ids_by_job('a') == ['a_4', 'a_5']
+
+
+def test_dependent_of_unsaved_batch_canonical_is_embedded(store):
+    canonical = process(store, 'a', [BOILERPLATE, BOILERPLATE], fail={0})
+
+    assert canonical == [None, 'a_0']
+    # a_0 kaydedilemedi; a_1 kendi vector'ı ile canonical oldu
+    assert store.get_vector_ids_by_job('a') == ['a_1']
+    assert store.near_duplicates.stats()['orphaned'] == 0
+    assert process(store, 'b', [BOILERPLATE]) == ['a_1']
+
+
+def test_delete_promotes_dependent(store, services):
+    process(store, 'a', [BOILERPLATE])
+    assert process(store, 'b', [BOILERPLATE]) == ['a_0']
+    assert process(store, 'c', ["önsöz", BOILERPLATE]) == [None, 'a_0']
+    embedded = services.embedded_texts
+
+    store.delete_vectors_by_job('a')
+
+    # Gruptan tek chunk embed edilir, diğeri ona bağlanır
+    assert services.embedded_texts == embedded + 1
+    assert store.get_vector_ids_by_job('b') == ['b_0']
+    stats = store.near_duplicates.stats()
+    assert (stats['promoted'], stats['orphaned'], stats['dropped']) == (1, 0, 0)
+    assert process(store, 'd', [BOILERPLATE]) == ['b_0']
+    assert store.search_similar(BOILERPLATE, n_results=1)[0]['id'] == 'b_0'
+
+
+def test_orphans_wait_for_embedding(store, services):
+    process(store, 'a', [BOILERPLATE])
+    process(store, 'b', [BOILERPLATE])
+    services.fail_next = 10
+
+    store.delete_vectors_by_job('a')
+
+    assert store.near_duplicates.stats()['orphaned'] == 1
+    assert store.get_vector_ids_by_job('b') == []
+    # Yetim kayıt job'ın parçası olarak kalır (requeue temizliği onu da siler)
+    assert store.has_job('b')
+
+    services.fail_next = 0
+    assert store.promote_orphans() == 1
+    assert store.get_vector_ids_by_job('b') == ['b_0']
+    assert store.near_duplicates.stats()['orphaned'] == 0
+
+
+def test_disabled_by_default(make_store, monkeypatch):
+    store = make_store()
+    monkeypatch.delenv('NEAR_DUPLICATE_THRESHOLD')
+    from vector_store import VectorStore
+    default = VectorStore(store.vectors_dir + '_default')
+
+    assert default.near_duplicates is None
+    assert process(default, 'a', [BOILERPLATE, BOILERPLATE]) == [None, None]
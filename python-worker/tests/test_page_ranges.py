@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+fitz = pytest.importorskip('fitz')
+
+from document_processor import DocumentProcessor  # noqa: E402
+
+WORDS = ['belge', 'sayfa', 'aralık', 'vektör', 'embedding', 'chunk', 'işleme', 'ölçüm', 'a', 'bir', 'uzunkelimeolsun']
+
+
+def page_lengths(seed: int, pages: int = 37):
+    """Boş, çok kısa, orta ve birden fazla chunk'lık sayfaların karışımı"""
+    rng = random.Random(seed)
+    return [rng.choice([0, 0, 8, 40, 150, 600, 1400, 2600, 4200]) for _ in range(pages)]
+
+
+def make_pdf(path, lengths, seed: int):
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for length in lengths:
+        page = doc.new_page(width=842, height=1190)
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(rng.choice(WORDS))
+        if words:
+            page.insert_textbox(page.rect + (20, 20, -20, -20), ' '.join(words), fontsize=7)
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture(scope='module', params=[1, 2, 3])
+def pdf(request, tmp_path_factory):
+    path = tmp_path_factory.mktemp('pdf') / f"uneven{request.param}.pdf"
+    make_pdf(path, page_lengths(request.param), request.param)
+    return str(path)
+
+
+def test_plan_uses_page_count_only():
+    processor = DocumentProcessor()
+
+    assert processor.plan_page_ranges(7, 3) == [
+        {'start_page': 0, 'end_page': 3},
+        {'start_page': 3, 'end_page': 6},
+        {'start_page': 6, 'end_page': 7}
+    ]
+    assert processor.plan_page_ranges(0, 3) == []
+
+
+@pytest.mark.parametrize('range_pages', [1, 2, 3, 5, 7, 11])
+def test_range_chunks_start_inside_range(pdf, range_pages):
+    processor = DocumentProcessor()
+    pages = list(processor.iter_pages(pdf))
+    ranges = processor.plan_page_ranges(processor.pdf_page_count(pdf), range_pages)
+    assert len(ranges) > 1
+
+    for item in ranges:
+        start_page, end_page = item['start_page'], item['end_page']
+        # Aralık kendi ilk sayfasından tek başına chunk'lanır; başlangıcı
+        # aralığın text'ine düşen chunk'lar alınır, sonuncusu sınırı aşar
+        text = processor._clean_text(''.join(pages[start_page:]))
+        boundary = len(processor._clean_text(''.join(pages[start_page:end_page])))
+        spans = [(start, chunk) for start, chunk in processor._chunk_spans([text]) if start < boundary]
+
+        chunks = list(processor.iter_chunks(processor.iter_pages(pdf, start_page),
+                                            start_page=start_page, end_page=end_page))
+
+        assert chunks == [chunk for _, chunk in spans]
+        if spans and end_page < len(pages) and len(text) > boundary:
+            last_start, last_chunk = spans[-1]
+            assert last_start + len(last_chunk) > boundary
+
+
+def test_single_range_matches_unsplit(pdf):
+    processor = DocumentProcessor()
+    page_count = processor.pdf_page_count(pdf)
+
+    assert (list(processor.iter_chunks(processor.iter_pages(pdf), start_page=0, end_page=page_count))
+            == list(processor.iter_chunks(processor.iter_pages(pdf))))
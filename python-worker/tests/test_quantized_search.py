@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from segment_store import SegmentStore
+from vector_store import FlatIndex, QuantizedIndex, pairwise_distances, top_k
+
+DIM = 32
+
+
+@pytest.fixture
+def store(tmp_path):
+    rng = np.random.default_rng(3)
+    centers = rng.normal(size=(5, DIM)).astype(np.float32)
+    store = SegmentStore(str(tmp_path / 'segments'), segment_max_rows=64)
+    # Kümelere yakın vektörler: quantize edilmiş mesafelerde sık sık yer değiştiren komşular
+    for row in range(300):
+        vector = centers[row % 5] + rng.normal(scale=0.3, size=DIM).astype(np.float32)
+        store.append(f"job{row % 7}", 'a.pdf', '/data/a.pdf', row, f"metin {row}", vector, created_at=0.0)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def queries(store):
+    rng = np.random.default_rng(4)
+    rows = rng.choice(len(store), 12, replace=False)
+    return store.get_embeddings(rows) + rng.normal(scale=0.1, size=(12, DIM)).astype(np.float32)
+
+
+def exact_distances(store, query, rows, metric):
+    vectors = store.get_embeddings(rows)
+    if metric == 'cosine':
+        return 1.0 - vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    return np.linalg.norm(vectors - query, axis=1)
+
+
+@pytest.mark.parametrize('mode', ['float16', 'int8'])
+@pytest.mark.parametrize('metric', ['l2', 'cosine'])
+def test_rescored_ranking_matches_exact_search(store, queries, mode, metric):
+    index = QuantizedIndex(store, metric=metric, mode=mode)
+
+    # Aday havuzu tüm store'u kapsarsa sonuç exact aramayla aynıdır
+    distances, rows = index.search_batch(queries, 10, rescore_factor=len(store))
+    exact_distances_, exact_rows = FlatIndex(store, metric).search_batch(queries, 10)
+
+    # Eşit sayılacak kadar yakın komşuların sırası matris çarpımı yuvarlamasına bağlı
+    np.testing.assert_allclose(distances, exact_distances_, rtol=1e-5, atol=1e-5)
+    assert [set(query_rows) for query_rows in rows.tolist()] == [set(query_rows) for query_rows in exact_rows.tolist()]
+
+
+def test_int8_order_is_fixed_by_rescoring(store, queries):
+    index = QuantizedIndex(store, metric='l2', mode='int8')
+    matrix = index._dequantize(0, len(store))
+    _, approx_rows = top_k(pairwise_distances(queries, matrix, np.einsum('ij,ij->i', matrix, matrix), 'l2'), 10)
+    _, exact_rows = FlatIndex(store, 'l2').search_batch(queries, 10)
+    # int8 mesafeleri bazı sorgularda komşuların sırasını bozar
+    assert approx_rows.tolist() != exact_rows.tolist()
+
+    _, rows = index.search_batch(queries, 10)
+
+    assert rows.tolist() == exact_rows.tolist()
+
+
+@pytest.mark.parametrize('mode', ['float16', 'int8'])
+def test_candidates_are_ordered_by_float32_distance(store, queries, mode):
+    index = QuantizedIndex(store, metric='l2', mode=mode, rescore_factor=2)
+
+    distances, rows = index.search_batch(queries, 10)
+
+    for query, query_distances, query_rows in zip(queries, distances, rows):
+        # Dönen mesafeler quantize değil tam hassasiyetli embedding'lerden gelir
+        np.testing.assert_allclose(query_distances, exact_distances(store, query, query_rows, 'l2'),
+                                   rtol=1e-4, atol=1e-5)
+        assert np.all(np.diff(query_distances) >= 0)
+
+
+def test_deleted_rows_and_compaction(store, queries):
+    index = QuantizedIndex(store, metric='l2', mode='int8')
+    _, rows = index.search(queries[0], 5, metric='l2')
+    store.mark_deleted(rows[:2])
+
+    _, after_delete = index.search_batch(queries[:1], 5, rescore_factor=len(store))
+    assert not set(rows[:2].tolist()) & set(after_delete[0].tolist())
+
+    index.apply_remap(store.compact(min_dead_ratio=0.0))
+    _, compacted = index.search_batch(queries[:1], 5, rescore_factor=len(store))
+    _, exact_rows = FlatIndex(store, 'l2').search_batch(queries[:1], 5)
+    assert len(store) == 298
+    assert set(compacted[0].tolist()) == set(exact_rows[0].tolist())
+
+
+def test_k_larger_than_alive_rows(tmp_path):
+    store = SegmentStore(str(tmp_path / 'segments'))
+    for row in range(3):
+        store.append('j', 'a.pdf', '/data/a.pdf', row, 'metin', np.full(4, row, dtype=np.float32), created_at=0.0)
+    index = QuantizedIndex(store, mode='int8')
+
+    distances, rows = index.search(np.zeros(4, dtype=np.float32), 5)
+
+    assert rows.tolist() == [0, 1, 2]
+    assert distances.tolist() == [0.0, 2.0, 4.0]
+    store.close()
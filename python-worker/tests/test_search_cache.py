@@ -0,0 +1,83 @@
+import time
+
+from fake_services import fake_embedding
+from query_cache import TTLCache, normalize_query
+
+
+def save(store, job_id, texts, first_chunk_index=0):
+    for chunk_index, text in enumerate(texts, first_chunk_index):
+        assert store.save_vector({
+            'job_id': job_id,
+            'file_name': f"{job_id}.md",
+            'file_path': f"/data/{job_id}.md",
+            'chunk_index': chunk_index,
+            'chunk_text': text,
+            'embedding': fake_embedding(text, 8).tolist()
+        })
+
+
+def ids(results):
+    return [result['id'] for result in results]
+
+
+def test_repeated_search_is_served_from_cache(make_store, services):
+    store = make_store()
+    save(store, 'a', ['birinci', 'ikinci'])
+
+    first = store.search_similar('ikinci', 1)
+    embedded = services.embedded_texts
+    # Boşluk ve büyük/küçük harf farkı aynı anahtara düşer
+    second = store.search_similar('  Ikinci\n', 1)
+
+    assert ids(second) == ids(first) == ['a_1']
+    assert services.embedded_texts == embedded
+    assert store.result_cache.stats()['hits'] == 1
+
+
+def test_save_invalidates_cached_results(make_store, services):
+    store = make_store()
+    save(store, 'a', ['birinci', 'ikinci'])
+    assert ids(store.search_similar('üçüncü', 1)) != ['b_0']
+    generation = store.generation
+    embedded = services.embedded_texts
+
+    save(store, 'b', ['üçüncü'])
+
+    assert store.generation > generation
+    assert ids(store.search_similar('üçüncü', 1)) == ['b_0']
+    # Sonuç yeniden hesaplanır ama sorgu embedding'i cache'ten gelir
+    assert services.embedded_texts == embedded
+    assert store.query_embedding_cache.stats()['hits'] >= 1
+
+
+def test_delete_invalidates_cached_results(make_store):
+    store = make_store()
+    save(store, 'a', ['birinci'])
+    save(store, 'b', ['birinci ve ikinci'])
+    assert ids(store.search_similar('birinci', 2)) == ['a_0', 'b_0']
+    generation = store.generation
+
+    assert store.delete_vectors_by_job('a')
+
+    assert store.generation > generation
+    assert ids(store.search_similar('birinci', 2)) == ['b_0']
+    # Bulunamayan silme generation'ı ilerletmez
+    generation = store.generation
+    assert not store.delete_vectors_by_job('a')
+    assert store.generation == generation
+
+
+def test_ttl_cache_expires_and_evicts():
+    cache = TTLCache(max_entries=2, ttl_seconds=0.05)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    # 'b' en az kullanılan olduğu için atılır
+    assert (cache.get('b'), cache.get('a'), cache.get('c')) == (None, 1, 3)
+    time.sleep(0.06)
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['evictions'], stats['expirations'], stats['hits'], stats['misses']) == (1, 1, 3, 2)
+    assert normalize_query("  Rapor\n Özeti  ") == "rapor özeti"
@@ -0,0 +1,41 @@
+import numpy as np
+
+from fake_services import fake_embedding
+
+
+def save(store, job_id, texts):
+    for chunk_index, text in enumerate(texts):
+        store.save_vector({
+            'job_id': job_id,
+            'file_name': 'doc.md',
+            'file_path': '/data/doc.md',
+            'chunk_index': chunk_index,
+            'chunk_text': text,
+            'embedding': fake_embedding(text, 8).tolist()
+        })
+
+
+def test_results_carry_embeddings_by_default(make_store):
+    store = make_store()
+    save(store, 'job', ['birinci', 'ikinci', 'üçüncü'])
+
+    results = store.search_similar('ikinci', 2)
+
+    assert [result['id'] for result in results][0] == 'job_1'
+    np.testing.assert_allclose(results[0]['embedding'], fake_embedding('ikinci', 8), rtol=1e-6)
+    assert results[0]['distance'] < 1e-4
+    assert all('embedding' not in result for result in store.search_similar('ikinci', 2, include_embeddings=False))
+    assert all('embedding' in result for result in store.search_similar_batch(['birinci', 'ikinci'], 2)[1])
+
+
+def test_cached_results_are_copied(make_store):
+    store = make_store()
+    save(store, 'job', ['birinci', 'ikinci'])
+
+    first = store.search_similar('birinci', 1)
+    first[0]['embedding'][0] = 1e9
+    first[0]['metadata']['file_name'] = 'değişti'
+
+    second = store.search_similar('birinci', 1)
+    assert second[0]['embedding'][0] != 1e9
+    assert second[0]['metadata']['file_name'] == 'doc.md'
@@ -0,0 +1,132 @@
+import time
+
+import numpy as np
+import pytest
+
+from segment_store import ChunkRecord, SegmentStore
+
+
+def vector(value: float, dim: int = 4) -> np.ndarray:
+    return np.full(dim, value, dtype=np.float32)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SegmentStore(str(tmp_path / 'segments'), segment_max_rows=3)
+    yield store
+    store.close()
+
+
+def fill(store, job_id, count, file_name=None, start=0):
+    return [store.append(job_id, file_name or f"{job_id}.pdf", f"/data/{job_id}.pdf", start + i,
+                         f"{job_id} metin {start + i} ğüşıöç", vector(start + i), created_at=100.0 + i)
+            for i in range(count)]
+
+
+def test_record_view_reads_fields_from_segments(store):
+    rows = fill(store, 'a', 5)
+
+    record = store.get_record(rows[4])
+
+    assert (record.row, record.job_id, record.file_name, record.file_path) == (4, 'a', 'a.pdf', '/data/a.pdf')
+    assert (record.chunk_index, record.created_at, record.deleted) == (4, 104.0, False)
+    assert record.text == "a metin 4 ğüşıöç"
+    assert record.embedding.tolist() == vector(4).tolist()
+    # __slots__: view satır başına dict taşımaz
+    assert not hasattr(record, '__dict__')
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_iter_records_across_segments(store):
+    fill(store, 'a', 7)
+
+    records = list(store.iter_records([6, 0, 3]))
+
+    assert all(isinstance(record, ChunkRecord) for record in records)
+    assert [(record.row, record.chunk_index) for record in records] == [(6, 6), (0, 0), (3, 3)]
+    assert list(store.iter_records([])) == []
+
+
+def test_record_view_reflects_tombstone_and_reopen(store, tmp_path):
+    fill(store, 'a', 4)
+    store.mark_deleted([1])
+    assert store.get_record(1).deleted
+
+    store.close()
+    reopened = SegmentStore(str(tmp_path / 'segments'), segment_max_rows=3)
+    record = reopened.get_record(3)
+    assert (record.job_id, record.text, record.deleted) == ('a', "a metin 3 ğüşıöç", False)
+    assert reopened.get_record(1).deleted
+    reopened.close()
+
+
+def test_find_rows_skips_deleted_rows(store):
+    a_rows = fill(store, 'a', 4, file_name='ortak.pdf')
+    b_rows = fill(store, 'b', 3, file_name='ortak.pdf')
+
+    store.mark_deleted([a_rows[1], b_rows[0]])
+
+    assert store.find_rows(job_id='a').tolist() == [a_rows[0], a_rows[2], a_rows[3]]
+    file_rows = store.find_rows(file_name='ortak.pdf')
+    assert sorted(file_rows.tolist()) == sorted([a_rows[0], a_rows[2], a_rows[3], b_rows[1], b_rows[2]])
+    # Dosya index'i chunk_index sırasında döner
+    assert store.get_field(file_rows, 'chunk_index').tolist() == [0, 1, 2, 2, 3]
+    assert store.find_rows(job_id='b', file_name='ortak.pdf').tolist() == b_rows[1:]
+    assert store.find_rows(job_id='b', file_name='başka.pdf').tolist() == []
+    assert store.find_rows(job_id='yok').tolist() == []
+    assert store.find_rows().tolist() == [row for row in a_rows + b_rows if row not in (a_rows[1], b_rows[0])]
+
+
+def test_compact_remaps_rows_and_indexes(store):
+    a_rows = fill(store, 'a', 6)
+    fill(store, 'b', 3)
+    # Segment'ler: [a0 a1 a2] [a3 a4 a5] [b0 b1 b2]
+    store.mark_deleted(a_rows[:3] + a_rows[4:5])
+
+    remap = store.compact(min_dead_ratio=0.3)
+
+    # Tamamen silinen segment kaldırılır, yarısı silinen yeniden yazılır
+    assert remap.tolist() == [-1, -1, -1, 0, -1, 1, 2, 3, 4]
+    assert len(store) == 5 and store.dead_ratio() == 0.0
+    assert store.find_rows(job_id='a').tolist() == [0, 1]
+    assert store.find_rows(job_id='b').tolist() == [2, 3, 4]
+    assert [(record.chunk_index, record.text) for record in store.iter_records([1, 2])] == [
+        (5, "a metin 5 ğüşıöç"), (0, "b metin 0 ğüşıöç")]
+    assert store.get_embeddings([0, 4]).tolist() == [vector(3).tolist(), vector(2).tolist()]
+    assert store.compact(min_dead_ratio=0.3) is None
+
+    # Yeni satırlar compaction sonrası numaralardan devam eder
+    assert fill(store, 'c', 1) == [5]
+    assert store.find_rows(job_id='c').tolist() == [5]
+
+
+def test_compact_below_threshold_keeps_rows(store):
+    fill(store, 'a', 6)
+    store.mark_deleted([4])
+
+    assert store.compact(min_dead_ratio=0.5) is None
+    assert store.find_rows(job_id='a').tolist() == [0, 1, 2, 3, 5]
+
+
+def test_search_after_background_compaction(make_store):
+    store = make_store(VECTOR_COMPACTION_DEAD_RATIO='0.3')
+    texts = {job_id: [f"{job_id} belgesinin {i}. paragrafı" for i in range(4)] for job_id in ('a', 'b')}
+    for job_id, job_texts in texts.items():
+        for i, embedding in enumerate(store.generate_embeddings(job_texts)):
+            assert store.save_vector({'job_id': job_id, 'file_name': f"{job_id}.md", 'file_path': f"/data/{job_id}.md",
+                                      'chunk_index': i, 'chunk_text': job_texts[i], 'embedding': embedding})
+
+    compactions = store.compactions
+    assert store.delete_vectors_by_job('a')
+
+    # Silme ölü satır oranını eşiğin üstüne çıkarır; compaction arka planda yapılır
+    deadline = time.monotonic() + 5
+    while store.compactions == compactions and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.compactions == compactions + 1
+    assert len(store.store) == 4
+    assert store.get_vector_ids_by_job('a') == []
+    assert store.get_vector_ids_by_job('b') == ['b_0', 'b_1', 'b_2', 'b_3']
+    result = store.search_similar(texts['b'][2], n_results=1)[0]
+    assert (result['id'], result['document']) == ('b_2', texts['b'][2])
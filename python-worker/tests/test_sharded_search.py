@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from sharded_search import ShardSearchError
+
+
+def fill(store, count):
+    rng = np.random.default_rng(0)
+    for chunk_index in range(count):
+        store.save_vector({
+            'job_id': 'job',
+            'file_name': 'doc.md',
+            'file_path': '/data/doc.md',
+            'chunk_index': chunk_index,
+            'chunk_text': f"chunk {chunk_index}",
+            'embedding': rng.normal(size=8).astype(np.float32).tolist()
+        })
+
+
+def ids(results):
+    return [result['id'] for result in results]
+
+
+@pytest.fixture
+def sharded_store(make_store):
+    store = make_store(SEARCH_SHARDS=2, SEARCH_SHARD_STRIPE_ROWS=16, SEARCH_RESULT_CACHE_SIZE=0,
+                       LEXICAL_INDEX='false')
+    fill(store, 100)
+    yield store
+    store.sharded_index.close()
+
+
+def exact(store, query, k):
+    _, rows = store.index.search_batch(store.query_embeddings([query]), k)
+    return [f"job_{store.store.get_field(rows[0], 'chunk_index')[i]}" for i in range(k)]
+
+
+def test_shard_timeout_falls_back_to_flat_index(sharded_store):
+    sharded = sharded_store.sharded_index
+    assert ids(sharded_store.search_similar('sorgu', 5)) == exact(sharded_store, 'sorgu', 5)
+    assert sharded.failed_searches == 0
+
+    sharded.timeout = 0
+    assert ids(sharded_store.search_similar('sorgu', 5)) == exact(sharded_store, 'sorgu', 5)
+    assert sharded.failed_searches == 1
+
+    # Zaman aşımına uğrayan aramanın geç gelen cevapları sonraki aramayı bozmaz
+    sharded.timeout = 10
+    assert ids(sharded_store.search_similar('başka sorgu', 7)) == exact(sharded_store, 'başka sorgu', 7)
+    assert [result['id'] for result in sharded_store.search_similar_batch(['a', 'b'], 3)[1]] == \
+        exact(sharded_store, 'b', 3)
+    assert sharded.failed_searches == 1
+
+
+def test_dead_shard_raises_and_search_uses_flat_index(sharded_store):
+    sharded = sharded_store.sharded_index
+    sharded._processes[0].kill()
+    sharded._processes[0].join()
+
+    with pytest.raises(ShardSearchError):
+        sharded.search_batch(np.ones((1, 8), dtype=np.float32), 3)
+    assert ids(sharded_store.search_similar('sorgu', 5)) == exact(sharded_store, 'sorgu', 5)
@@ -0,0 +1,78 @@
+import json
+import threading
+
+import pytest
+
+fitz = pytest.importorskip('fitz')
+
+from worker import JobRetryError  # noqa: E402
+
+WORDS = ['belge', 'sayfa', 'aralık', 'vektör', 'embedding', 'chunk', 'işleme', 'ölçüm']
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / 'rapor.pdf'
+    doc = fitz.open()
+    for page_number in range(10):
+        page = doc.new_page(width=842, height=1190)
+        text = ' '.join(f"{WORDS[(page_number + i) % len(WORDS)]}{i}" for i in range(page_number * 60))
+        if text:
+            page.insert_textbox(page.rect + (20, 20, -20, -20), text, fontsize=7)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def worker(make_worker):
+    return make_worker(PDF_SPLIT_PAGES='3')
+
+
+def split(worker, pdf):
+    job = json.dumps({'id': 'job1', 'fileName': 'rapor.pdf', 'filePath': pdf})
+    assert not worker.process_job(job)
+    sub_jobs = worker.redis_client.lrange(worker.queue_name, 0, -1)
+    worker.redis_client.delete(worker.queue_name)
+    # LPUSH: kuyruktaki sıra parça sırasının tersi
+    return sorted(sub_jobs, key=lambda sub_job: json.loads(sub_job)['part']['index'])
+
+
+def events(worker, name):
+    worker.log_sink.flush()
+    entries = [json.loads(entry) for entry in worker.redis_client.lrange(worker.logs_list_name, 0, -1)]
+    return [entry for entry in entries if entry['Event'] == name]
+
+
+def test_parts_get_contiguous_chunk_indices_in_any_order(worker, pdf):
+    sub_jobs = split(worker, pdf)
+    assert [json.loads(sub_job)['part']['start_page'] for sub_job in sub_jobs] == [0, 3, 6, 9]
+
+    # Sonraki parçalar önce başlar; öncekilerin chunk sayılarını bekler
+    threads = [threading.Thread(target=worker.process_job, args=(sub_job,)) for sub_job in reversed(sub_jobs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    ids = worker.vector_store.get_vector_ids_by_job('job1')
+    chunk_indices = sorted(int(vector_id.rsplit('_', 1)[1]) for vector_id in ids)
+    assert chunk_indices == list(range(len(ids))) and len(ids) > len(sub_jobs)
+    assert len(events(worker, 'FILE_PROCESSING_COMPLETED')) == 1
+    assert not worker.redis_client.exists(worker._split_key('job1'))
+
+
+def test_part_retries_when_earlier_counts_are_missing(worker, pdf, monkeypatch):
+    sub_jobs = split(worker, pdf)
+    monkeypatch.setattr(worker, 'split_order_wait', 0)
+
+    with pytest.raises(JobRetryError):
+        worker.process_document(pdf, 'rapor.pdf', 'job1', json.loads(sub_jobs[2])['part'])
+    assert worker.vector_store.get_vector_ids_by_job('job1') == []
+
+    # Önceki parçalar bitince aynı parça kaldığı yerden devam eder
+    for sub_job in sub_jobs:
+        assert not worker.process_job(sub_job)
+    ids = worker.vector_store.get_vector_ids_by_job('job1')
+    assert sorted(int(vector_id.rsplit('_', 1)[1]) for vector_id in ids) == list(range(len(ids)))
+    assert len(events(worker, 'FILE_PROCESSING_COMPLETED')) == 1
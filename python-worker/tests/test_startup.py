@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import subprocess
+
+import numpy as np
+
+from startup_time import WORKER_DIR, IMPORT_PROBE, fill_store
+
+# Warm-up ilk blokta durdurulur: VectorStore() dönmüş ve ready henüz set edilmemiş olmalı
+INIT_PROBE = """
+import sys, json, time, threading
+import worker
+from vector_store import VectorStore, LexicalIndex
+
+release = threading.Event()
+build_range = LexicalIndex.build_range
+
+def blocked_build_range(self, store, start, end):
+    release.wait(30)
+    return build_range(self, store, start, end)
+
+LexicalIndex.build_range = blocked_build_range
+started = time.perf_counter()
+store = VectorStore(sys.argv[1])
+init_seconds = time.perf_counter() - started
+ready_at_init = store.ready.is_set()
+release.set()
+print(json.dumps({
+    'init_seconds': init_seconds,
+    'ready_at_init': ready_at_init,
+    'ready_later': store.wait_until_ready(30),
+    'lexical_docs': store.lexical_index.doc_count,
+    'pdf_modules_loaded': sorted(name for name in ('fitz', 'pymupdf', 'PyPDF2') if name in sys.modules)
+}))
+"""
+
+
+def run(code, *args, env=None):
+    output = subprocess.run([sys.executable, '-c', code, *args], cwd=WORKER_DIR, env=env,
+                            check=True, capture_output=True, text=True, timeout=120).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_pdf_libraries():
+    probe = run(IMPORT_PROBE)
+
+    assert probe['lazy_modules_loaded'] == []
+    assert probe['seconds'] * 1000 < float(os.getenv('STARTUP_IMPORT_BUDGET_MS', 3000))
+
+
+def test_init_returns_before_warm_up(tmp_path):
+    fill_store(str(tmp_path), 300, 8, np.random.default_rng(0))
+    env = dict(os.environ, LEXICAL_INDEX='true', VECTOR_QUANTIZATION='int8', EMBEDDING_CACHE_MAX_ENTRIES='0',
+               NEAR_DUPLICATE_THRESHOLD='0')
+
+    probe = run(INIT_PROBE, str(tmp_path), env=env)
+
+    assert probe['ready_at_init'] is False
+    assert probe['ready_later'] is True
+    assert probe['lexical_docs'] == 300
+    assert probe['pdf_modules_loaded'] == []
+    assert probe['init_seconds'] * 1000 < float(os.getenv('STARTUP_INIT_BUDGET_MS', 3000))
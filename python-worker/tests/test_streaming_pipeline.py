@@ -0,0 +1,81 @@
+import random
+import time
+
+import pytest
+
+from document_processor import DocumentProcessor
+from worker import batched, prefetch
+
+WORDS = ['belge', 'sayfa', 'vektör', 'chunk', 'işleme', 'a', 'uzunkelimeolsun', '\n', '  ', '\t']
+
+
+def random_pages(seed: int, count: int = 40):
+    """Boş, sadece boşluk ve sınırları kelime ortasına düşen sayfalar"""
+    rng = random.Random(seed)
+    text = ''.join(rng.choice(WORDS) + rng.choice([' ', '', '\n']) for _ in range(3000))
+    cuts = sorted(rng.sample(range(len(text)), count))
+    pages = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+    return pages + ['', '   \n']
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('chunk_size,chunk_overlap', [(1000, 200), (120, 30), (50, 0)])
+def test_streamed_chunks_match_whole_text(seed, chunk_size, chunk_overlap):
+    processor = DocumentProcessor(chunk_size, chunk_overlap)
+    pages = random_pages(seed)
+
+    expected = processor.chunk_text(processor._clean_text(''.join(pages)))
+
+    assert list(processor.iter_chunks(pages)) == expected
+    assert list(processor.iter_chunks(iter(pages))) == expected
+
+
+def test_pdf_pages_match_extract_text(tmp_path):
+    fitz = pytest.importorskip('fitz')
+    path = str(tmp_path / 'belge.pdf')
+    doc = fitz.open()
+    rng = random.Random(7)
+    for _ in range(6):
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (20, 20, -20, -20), ' '.join(rng.choice(WORDS[:7]) for _ in range(250)),
+                            fontsize=7)
+    doc.save(path)
+    doc.close()
+    processor = DocumentProcessor()
+
+    expected = processor.chunk_text(processor._clean_text(processor.extract_text(path)))
+
+    assert len(expected) > 1
+    assert list(processor.iter_chunks(processor.iter_pages(path))) == expected
+
+
+def test_batched():
+    assert list(batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(batched([], 3)) == []
+
+
+def test_prefetch_keeps_order_and_bounds_buffer():
+    produced = []
+
+    def items():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    stream = prefetch(items(), max_buffered=2)
+    assert next(stream) == 0
+    time.sleep(0.2)
+    # Tüketilen 1 + kuyrukta 2 + put'ta bekleyen 1
+    assert len(produced) <= 4
+    assert list(stream) == list(range(1, 10))
+
+
+def test_prefetch_reraises_producer_error():
+    def items():
+        yield 1
+        raise ValueError("bozuk sayfa")
+
+    stream = prefetch(items(), max_buffered=4)
+    assert next(stream) == 1
+    with pytest.raises(ValueError, match="bozuk sayfa"):
+        next(stream)
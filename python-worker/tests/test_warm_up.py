@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+
+import vector_store
+from segment_store import SegmentStore
+
+
+def fill(vectors_dir, count):
+    store = SegmentStore(os.path.join(vectors_dir, 'segments'), segment_max_rows=64)
+    rng = np.random.default_rng(0)
+    for row in range(count):
+        store.append(f"job{row // 50}", 'doc.md', '/data/doc.md', row % 50, f"satır{row} ortak metin",
+                     rng.normal(size=8).astype(np.float32), 0.0)
+    store.mark_deleted(np.arange(0, count, 7))
+    store.close()
+
+
+def test_warm_up_builds_lexical_index_block_by_block(make_store, tmp_path, monkeypatch):
+    fill(str(tmp_path / 'vectors'), 500)
+    monkeypatch.setattr(vector_store, 'WARM_UP_BLOCK_ROWS', 64)
+    store = make_store(LEXICAL_INDEX='true', VECTOR_QUANTIZATION='int8')
+
+    alive = 500 - len(range(0, 500, 7))
+    assert store.lexical_index.doc_count == alive
+    _, rows, _ = store.lexical_index.search('ortak', 1000)
+    assert sorted(rows.tolist()) == [row for row in range(500) if row % 7]
+    _, rows, _ = store.lexical_index.search('satır499', 1)
+    assert rows.tolist() == [499]
+    assert store.lexical_index.search('satır7', 1)[1].tolist() == []
+    assert store.quantized_index.size == 500
+
+
+def test_unknown_search_mode_returns_no_results(make_store, tmp_path):
+    fill(str(tmp_path / 'vectors'), 100)
+    store = make_store(LEXICAL_INDEX='true')
+
+    assert store.search_similar('ortak', 5, mode='hibrit') == []
+    assert len(store.search_similar('ortak', 5, mode='lexical')) == 5
@@ -1,12 +1,602 @@
 import os
+import time
 import logging
+import threading
 import numpy as np
-import requests
-from typing import List, Dict, Any, Optional
+import metrics
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime
+from backend_client import BackendUploader, BackendUploadError
+from embedding_cache import EmbeddingCache
+from embedding_client import OllamaEmbeddingClient, EmbeddingError
+from near_duplicates import NearDuplicateIndex
+from segment_store import SegmentStore, ChunkRecord
+from lexical_index import LexicalIndex
+from sharded_search import ShardedIndex, ShardSearchError
+from query_cache import TTLCache, normalize_query
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_METRICS = ('l2', 'cosine')
+QUANTIZATION_MODES = ('float16', 'int8')
+SEARCH_MODES = ('vector', 'lexical', 'hybrid')
+# Arka plan warm-up'ı ve IVF eğitimi kilidi bu kadar satırda bir bırakır; save_vector araya girebilir
+WARM_UP_BLOCK_ROWS = 2048
+
+
+def pairwise_distances(queries: np.ndarray, matrix: np.ndarray, sq_norms: np.ndarray, metric: str) -> np.ndarray:
+    """(m, d) sorgular ile (n, d) matris arasındaki (m, n) mesafe matrisi"""
+    dots = queries @ matrix.T
+
+    if metric == 'l2':
+        query_sq = np.einsum('ij,ij->i', queries, queries)[:, None]
+        sq = query_sq + sq_norms[None, :] - 2.0 * dots
+        return np.sqrt(np.maximum(sq, 0.0, out=sq), out=sq)
+
+    if metric == 'cosine':
+        query_norms = np.linalg.norm(queries, axis=1)[:, None]
+        denom = query_norms * np.sqrt(sq_norms)[None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarity = np.where(denom > 0, dots / denom, 0.0)
+        return 1.0 - similarity
+
+    raise ValueError(f"Desteklenmeyen mesafe metriği: {metric}")
+
+
+def reciprocal_rank_fusion(rankings: List[np.ndarray], k: int = 60) -> List[Tuple[int, float]]:
+    """Sıralı satır listelerini RRF ile birleştir: skor = sum(1 / (k + rank))"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking.tolist(), start=1):
+            if row >= 0:
+                fused[row] = fused.get(row, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
+
+
+def _copy_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Cache'teki sonuç listesini çağıranın değiştirebileceği kopyaya çevir"""
+    copies = []
+    for result in results:
+        copy = {**result, 'metadata': dict(result['metadata'])}
+        if 'embedding' in copy:
+            copy['embedding'] = list(copy['embedding'])
+        copies.append(copy)
+    return copies
+
+
+def top_k(distances: np.ndarray, k: int):
+    """Her satır için en küçük k mesafenin (distances, kolon) çiftleri, sıralı"""
+    n = distances.shape[1]
+    k = min(k, n)
+    if k < n:
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), distances.shape)
+
+    candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+    order = np.argsort(candidate_distances, axis=1)
+    return np.take_along_axis(candidate_distances, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+
+class FlatIndex:
+    """SegmentStore'daki float32 embedding bloklarında brute-force top-k arama
+
+    Her segment bloğu tek matris çarpımıyla skorlanır, blok bazında
+    argpartition ile aday seçilir ve adaylar birleştirilir.
+    """
+
+    def __init__(self, store: SegmentStore, metric: str = 'l2'):
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Desteklenmeyen mesafe metriği: {metric}")
+
+        self.store = store
+        self.metric = metric
+
+    def search(self, query, k: int, metric: Optional[str] = None):
+        """Tek sorgu için (distances, rows) döndür"""
+        distances, rows = self.search_batch(np.asarray(query, dtype=np.float32).reshape(1, -1), k, metric)
+        return distances[0], rows[0]
+
+    def search_batch(self, queries, k: int, metric: Optional[str] = None):
+        """Birden fazla sorguyu tek seferde skorla
+
+        Dönen değerler (m, k) boyutunda distance ve global satır matrisleridir,
+        her satır artan mesafeye göre sıralıdır.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        metric = metric or self.metric
+        k = min(k, self.store.alive_count)
+
+        if k <= 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+
+        if queries.shape[1] != self.store.dim:
+            raise ValueError(f"Query boyutu uyuşmuyor: {queries.shape[1]} != {self.store.dim}")
+
+        candidate_distances = []
+        candidate_rows = []
+        for base, matrix, sq_norms, alive in self.store.iter_blocks():
+            distances = pairwise_distances(queries, matrix, sq_norms, metric)
+            distances[:, ~alive] = np.inf
+            block_distances, columns = top_k(distances, k)
+            candidate_distances.append(block_distances)
+            candidate_rows.append(columns + base)
+
+        distances, positions = top_k(np.concatenate(candidate_distances, axis=1), k)
+        rows = np.take_along_axis(np.concatenate(candidate_rows, axis=1), positions, axis=1)
+        return distances, rows
+
+
+class _InvertedList:
+    """Tek bir IVF listesi: contiguous vektörler ve global satır numaraları"""
+
+    __slots__ = ('vectors', 'sq_norms', 'rows', 'size')
+
+    def __init__(self, dim: int):
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.sq_norms = np.empty(0, dtype=np.float32)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.size = 0
+
+    def append_many(self, vectors: np.ndarray, sq_norms: np.ndarray, rows: np.ndarray) -> int:
+        """Vektörleri sona ekle, ilk eklenenin pozisyonunu döndür"""
+        start = self.size
+        needed = start + len(rows)
+        if needed > len(self.rows):
+            capacity = max(needed, 2 * len(self.rows), 16)
+            for name in ('vectors', 'sq_norms', 'rows'):
+                old = getattr(self, name)
+                grown = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:start] = old[:start]
+                setattr(self, name, grown)
+        self.vectors[start:needed] = vectors
+        self.sq_norms[start:needed] = sq_norms
+        self.rows[start:needed] = rows
+        self.size = needed
+        return start
+
+    def remove_at(self, position: int) -> int:
+        """Pozisyonu son elemanla değiştirerek sil, yer değiştiren satırı döndür (yoksa -1)"""
+        last = self.size - 1
+        moved = -1
+        if position != last:
+            self.vectors[position] = self.vectors[last]
+            self.sq_norms[position] = self.sq_norms[last]
+            self.rows[position] = self.rows[last]
+            moved = int(self.rows[position])
+        self.size = last
+        return moved
+
+
+class IVFIndex:
+    """Inverted-file (IVF-flat) yaklaşık en yakın komşu index'i
+
+    Vektörler k-means ile nlist kümeye ayrılır; sorgu sadece en yakın
+    nprobe kümenin vektörlerini tarar. nprobe büyüdükçe recall artar,
+    latency de artar. Yeterli veri olana kadar (min_train_rows) index
+    eğitilmez ve arama FlatIndex'e düşer.
+    """
+
+    def __init__(self, store: SegmentStore, metric: str = 'l2', nlist: int = 0, nprobe: int = 8,
+                 min_train_rows: int = 10000, seed: int = 42):
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Desteklenmeyen mesafe metriği: {metric}")
+
+        self.store = store
+        self.metric = metric
+        self.nlist = nlist
+        self.nprobe = max(1, nprobe)
+        self.min_train_rows = max(1, min_train_rows)
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[_InvertedList] = []
+        self.trained_rows = 0
+        self._row_list = np.empty(0, dtype=np.int32)
+        self._row_position = np.empty(0, dtype=np.int64)
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return sum(inverted_list.size for inverted_list in self.lists)
+
+    def needs_training(self) -> bool:
+        """Veri ilk eğitim için yeterli mi, veya eğitimdekinin 8 katına çıktı mı"""
+        # len(store) O(1) üst sınır; alive_count sadece gerekirse hesaplanır
+        threshold = 8 * self.trained_rows if self.is_trained else self.min_train_rows
+        return len(self.store) >= threshold and self.store.alive_count >= threshold
+
+    def train(self):
+        """Store'daki canlı vektörlerden k-means ile centroid'leri çıkar ve tüm satırları ata"""
+        started = time.time()
+        trained = self.fitted_copy(self.training_sample())
+        for base, matrix, sq_norms, alive_mask in self.store.iter_blocks():
+            local_rows = np.flatnonzero(alive_mask)
+            for start in range(0, len(local_rows), 8192):
+                selected = local_rows[start:start + 8192]
+                trained.add_many(base + selected, np.asarray(matrix[selected]), np.asarray(sq_norms[selected]))
+
+        self.centroids = trained.centroids
+        self.lists = trained.lists
+        self.trained_rows = trained.trained_rows
+        self._row_list = trained._row_list
+        self._row_position = trained._row_position
+        logger.info(f"IVF index eğitildi: {self.trained_rows} vector, {len(self.lists)} liste, "
+                    f"{time.time() - started:.2f}s")
+
+    def training_sample(self) -> np.ndarray:
+        """k-means için canlı satırlardan rastgele örnek (kopya; store'u okur)"""
+        return self._sample(min(self.store.alive_count, self._nlist() * 64, 262144))
+
+    def fitted_copy(self, sample: np.ndarray) -> 'IVFIndex':
+        """Aynı ayarlarla, sample üzerinde k-means ile eğitilmiş boş bir index döndür
+
+        Store'u okumaz; store kilidi dışında çalıştırılabilir. Satırlar
+        add_many ile eklenir.
+        """
+        trained = IVFIndex(self.store, self.metric, self.nlist, self.nprobe, self.min_train_rows)
+        trained._rng = self._rng
+        nlist = min(self._nlist(), len(sample))
+        trained.centroids = self._kmeans(sample, nlist)
+        trained.lists = [_InvertedList(self.store.dim) for _ in range(nlist)]
+        trained._row_list = np.full(len(self.store), -1, dtype=np.int32)
+        trained._row_position = np.full(len(self.store), -1, dtype=np.int64)
+        trained.trained_rows = self.store.alive_count
+        return trained
+
+    def indexed_rows(self) -> np.ndarray:
+        """Listelerdeki satırlar (artan sırada)"""
+        return np.flatnonzero(self._row_list >= 0)
+
+    def add_many(self, rows: np.ndarray, vectors: np.ndarray, sq_norms: np.ndarray):
+        """Satırları en yakın listelere ekle"""
+        if self.is_trained and len(rows):
+            self._add_many(rows, vectors, sq_norms)
+
+    def add(self, row: int, embedding):
+        """save_vector'dan gelen yeni satırı en yakın listeye ekle"""
+        if not self.is_trained:
+            return
+        vector = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        self._add_many(np.array([row], dtype=np.int64), vector, np.einsum('ij,ij->i', vector, vector))
+
+    def remove(self, rows):
+        """Satırları listelerinden çıkar (delete_vectors_by_job)"""
+        if not self.is_trained:
+            return
+        for row in np.asarray(rows, dtype=np.int64):
+            if row >= len(self._row_list) or self._row_list[row] < 0:
+                continue
+            list_id = self._row_list[row]
+            moved = self.lists[list_id].remove_at(int(self._row_position[row]))
+            if moved >= 0:
+                self._row_position[moved] = self._row_position[row]
+            self._row_list[row] = -1
+            self._row_position[row] = -1
+
+    def apply_remap(self, remap: np.ndarray):
+        """Compaction sonrası eski -> yeni satır eşlemesini listelere uygula"""
+        if not self.is_trained:
+            return
+        self._row_list = np.full(len(self.store), -1, dtype=np.int32)
+        self._row_position = np.full(len(self.store), -1, dtype=np.int64)
+        for list_id, inverted_list in enumerate(self.lists):
+            rows = remap[inverted_list.rows[:inverted_list.size]]
+            inverted_list.rows[:inverted_list.size] = rows
+            self._row_list[rows] = list_id
+            self._row_position[rows] = np.arange(inverted_list.size)
+
+    def search(self, query, k: int, metric: Optional[str] = None, nprobe: Optional[int] = None):
+        distances, rows = self.search_batch(np.asarray(query, dtype=np.float32).reshape(1, -1), k, metric, nprobe)
+        return distances[0], rows[0]
+
+    def search_batch(self, queries, k: int, metric: Optional[str] = None, nprobe: Optional[int] = None):
+        """Her sorgu için en yakın nprobe listeyi tara
+
+        Taranan listelerde k'dan az vektör varsa satır -1, mesafe inf ile doldurulur.
+        """
+        if metric is not None and metric != self.metric:
+            raise ValueError(f"IVF index {self.metric} metriğiyle eğitildi, {metric} istendi")
+
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self))
+        result_distances = np.full((queries.shape[0], max(k, 0)), np.inf, dtype=np.float32)
+        result_rows = np.full((queries.shape[0], max(k, 0)), -1, dtype=np.int64)
+        if k <= 0:
+            return result_distances, result_rows
+
+        nprobe = min(nprobe or self.nprobe, len(self.lists))
+        centroid_distances = pairwise_distances(queries, self.centroids, self._centroid_sq_norms(), self.metric)
+        _, probes = top_k(centroid_distances, nprobe)
+
+        for i, query in enumerate(queries):
+            lists = [self.lists[list_id] for list_id in probes[i] if self.lists[list_id].size]
+            if not lists:
+                continue
+            matrix = np.concatenate([inverted_list.vectors[:inverted_list.size] for inverted_list in lists])
+            sq_norms = np.concatenate([inverted_list.sq_norms[:inverted_list.size] for inverted_list in lists])
+            rows = np.concatenate([inverted_list.rows[:inverted_list.size] for inverted_list in lists])
+
+            distances, columns = top_k(pairwise_distances(query[None, :], matrix, sq_norms, self.metric), k)
+            found = distances.shape[1]
+            result_distances[i, :found] = distances[0]
+            result_rows[i, :found] = rows[columns[0]]
+
+        return result_distances, result_rows
+
+    def recall_report(self, queries, exact_index: FlatIndex, k: int = 10,
+                      nprobe_values: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Aynı veri üzerinde IVF sonuçlarını exact arama ile karşılaştır (recall@k ve latency)"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+
+        started = time.perf_counter()
+        _, exact_rows = exact_index.search_batch(queries, k, self.metric)
+        exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        report = {
+            'vectors': len(self),
+            'nlist': len(self.lists),
+            'k': k,
+            'queries': len(queries),
+            'exact_ms_per_query': round(exact_ms, 3),
+            'results': []
+        }
+        for nprobe in nprobe_values or [1, 2, 4, 8, 16, 32, 64]:
+            if nprobe > len(self.lists):
+                break
+            started = time.perf_counter()
+            _, ann_rows = self.search_batch(queries, k, nprobe=nprobe)
+            ann_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+            hits = sum(len(set(ann_rows[i]) & set(exact_rows[i])) for i in range(len(queries)))
+            report['results'].append({
+                'nprobe': nprobe,
+                f'recall@{k}': round(hits / exact_rows.size, 4) if exact_rows.size else 0.0,
+                'ms_per_query': round(ann_ms, 3)
+            })
+        return report
+
+    def _add_many(self, rows: np.ndarray, vectors: np.ndarray, sq_norms: np.ndarray):
+        needed = int(rows.max()) + 1
+        if needed > len(self._row_list):
+            capacity = max(needed, 2 * len(self._row_list))
+            self._row_list = np.concatenate([self._row_list, np.full(capacity - len(self._row_list), -1, dtype=np.int32)])
+            self._row_position = np.concatenate([self._row_position, np.full(capacity - len(self._row_position), -1, dtype=np.int64)])
+
+        assignments = np.argmin(pairwise_distances(vectors, self.centroids, self._centroid_sq_norms(), self.metric), axis=1)
+        for list_id in np.unique(assignments):
+            selected = assignments == list_id
+            start = self.lists[list_id].append_many(vectors[selected], sq_norms[selected], rows[selected])
+            self._row_list[rows[selected]] = list_id
+            self._row_position[rows[selected]] = start + np.arange(np.count_nonzero(selected))
+
+    def _nlist(self) -> int:
+        alive = self.store.alive_count
+        nlist = self.nlist or int(4 * np.sqrt(alive))
+        return int(max(1, min(nlist, alive // 8 or 1, 65536)))
+
+    def _centroid_sq_norms(self) -> np.ndarray:
+        return np.einsum('ij,ij->i', self.centroids, self.centroids)
+
+    def _sample(self, size: int) -> np.ndarray:
+        """Canlı satırlardan rastgele örnek"""
+        alive_rows = np.concatenate([base + np.flatnonzero(alive) for base, _, _, alive in self.store.iter_blocks()])
+        chosen = np.sort(self._rng.choice(alive_rows, size=size, replace=False))
+        return self.store.get_embeddings(chosen)
+
+    def _kmeans(self, sample: np.ndarray, nlist: int, iterations: int = 20) -> np.ndarray:
+        """Lloyd k-means; boş kalan kümeler rastgele örneklerle yeniden başlatılır"""
+        centroids = sample[self._rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            centroid_sq_norms = np.einsum('ij,ij->i', centroids, centroids)
+            assignments = np.empty(len(sample), dtype=np.int64)
+            for start in range(0, len(sample), 8192):
+                block = sample[start:start + 8192]
+                assignments[start:start + 8192] = np.argmin(
+                    pairwise_distances(block, centroids, centroid_sq_norms, self.metric), axis=1
+                )
+
+            # Küme ortalamaları: atamaya göre sırala ve segment toplamlarını al
+            order = np.argsort(assignments, kind='stable')
+            sorted_assignments = assignments[order]
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_assignments)) + 1))
+            list_ids = sorted_assignments[starts]
+            counts = np.diff(np.concatenate((starts, [len(sample)])))
+            centroids[list_ids] = np.add.reduceat(sample[order], starts, axis=0) / counts[:, None]
+
+            empty = np.setdiff1d(np.arange(nlist), list_ids)
+            if len(empty):
+                centroids[empty] = sample[self._rng.choice(len(sample), size=len(empty), replace=False)]
+
+        return centroids
+
+
+class QuantizedIndex:
+    """float16 veya vektör başına ölçekli int8 kopya üzerinde tarama + exact re-scoring
+
+    Bellekte sadece quantize edilmiş matris tutulur (float32'nin 1/2'si veya
+    ~1/4'ü). Sorgu önce bu matriste k * rescore_factor aday seçer, adaylar
+    store'daki (memory-mapped) tam hassasiyetli embedding'lerle yeniden
+    skorlanır. Silinmiş satırlar store'un tombstone maskesinden okunur.
+    """
+
+    def __init__(self, store: SegmentStore, metric: str = 'l2', mode: str = 'int8',
+                 rescore_factor: int = 4, block_rows: int = 16384, build: bool = True):
+        if metric not in SUPPORTED_METRICS:
+            raise ValueError(f"Desteklenmeyen mesafe metriği: {metric}")
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Desteklenmeyen quantization modu: {mode}")
+
+        self.store = store
+        self.metric = metric
+        self.mode = mode
+        self.rescore_factor = max(1, rescore_factor)
+        self.block_rows = max(1, block_rows)
+        self.size = 0
+        self._codes = np.empty((0, store.dim or 0), dtype=np.float16 if mode == 'float16' else np.int8)
+        self._scales = np.empty(0, dtype=np.float32)
+        if build:
+            self.build()
+
+    def build(self):
+        """Store'daki tüm satırları (silinmişler dahil, satır hizası için) quantize et"""
+        started = time.time()
+        self.size = 0
+        self._ensure_capacity(len(self.store))
+        for base, matrix, _, _ in self.store.iter_blocks():
+            for start in range(0, len(matrix), self.block_rows):
+                vectors = np.asarray(matrix[start:start + self.block_rows], dtype=np.float32)
+                self._write(base + start, vectors)
+        if self.size:
+            logger.info(f"Quantized index ({self.mode}) oluşturuldu: {self.size} satır, "
+                        f"{self.memory_bytes()} byte, {time.time() - started:.2f}s")
+
+    def build_range(self, start: int, end: int):
+        """[start, end) satırlarını store'dan quantize et (VectorStore arka plan warm-up'ı)"""
+        self._ensure_capacity(end)
+        self._write(start, np.asarray(self.store.get_embeddings(np.arange(start, end)), dtype=np.float32))
+
+    def add(self, row: int, embedding):
+        """save_vector'dan gelen yeni satırı quantize edip ekle"""
+        vector = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        self._ensure_capacity(row + 1)
+        self._write(row, vector)
+
+    def apply_remap(self, remap: np.ndarray):
+        """Compaction sonrası eski -> yeni satır eşlemesini uygula"""
+        old_rows = np.flatnonzero(remap[:self.size] >= 0)
+        new_rows = remap[old_rows]
+        codes = np.empty((len(self.store), self._codes.shape[1]), dtype=self._codes.dtype)
+        scales = np.empty(len(self.store), dtype=np.float32)
+        codes[new_rows] = self._codes[old_rows]
+        scales[new_rows] = self._scales[old_rows]
+        self._codes, self._scales = codes, scales
+        self.size = len(self.store)
+
+    def memory_bytes(self) -> int:
+        return int(self.size * self._codes.shape[1] * self._codes.itemsize +
+                   (self.size * 4 if self.mode == 'int8' else 0))
+
+    def search(self, query, k: int, metric: Optional[str] = None):
+        distances, rows = self.search_batch(np.asarray(query, dtype=np.float32).reshape(1, -1), k, metric)
+        return distances[0], rows[0]
+
+    def search_batch(self, queries, k: int, metric: Optional[str] = None, rescore_factor: Optional[int] = None):
+        """Quantize matriste aday seç, adayları float32 ile yeniden skorla
+
+        Dönen değerler FlatIndex ile aynı biçimdedir; bulunamayan
+        pozisyonlar -1 satır ve inf mesafe ile doldurulur.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        metric = metric or self.metric
+        k = min(k, self.store.alive_count)
+        result_distances = np.full((queries.shape[0], max(k, 0)), np.inf, dtype=np.float32)
+        result_rows = np.full((queries.shape[0], max(k, 0)), -1, dtype=np.int64)
+        if k <= 0:
+            return result_distances, result_rows
+
+        if queries.shape[1] != self.store.dim:
+            raise ValueError(f"Query boyutu uyuşmuyor: {queries.shape[1]} != {self.store.dim}")
+
+        candidates = k * (rescore_factor or self.rescore_factor)
+        candidate_distances = []
+        candidate_rows = []
+        for base, _, sq_norms, alive in self.store.iter_blocks():
+            for start in range(0, len(alive), self.block_rows):
+                end = min(start + self.block_rows, len(alive))
+                matrix = self._dequantize(base + start, base + end)
+                distances = pairwise_distances(queries, matrix, sq_norms[start:end], metric)
+                distances[:, ~alive[start:end]] = np.inf
+                block_distances, columns = top_k(distances, candidates)
+                candidate_distances.append(block_distances)
+                candidate_rows.append(columns + base + start)
+
+        approx_distances, positions = top_k(np.concatenate(candidate_distances, axis=1), candidates)
+        rows = np.take_along_axis(np.concatenate(candidate_rows, axis=1), positions, axis=1)
+        rows[~np.isfinite(approx_distances)] = -1
+
+        # Tüm sorguların adayları tek seferde diskten okunup exact skorlanır
+        unique_rows = np.unique(rows[rows >= 0])
+        exact = pairwise_distances(queries, self.store.get_embeddings(unique_rows),
+                                   self.store.get_field(unique_rows, 'sq_norm'), metric)
+        for i in range(queries.shape[0]):
+            valid = rows[i][rows[i] >= 0]
+            if not len(valid):
+                continue
+            distances, columns = top_k(exact[i, np.searchsorted(unique_rows, valid)][None, :], k)
+            found = distances.shape[1]
+            result_distances[i, :found] = distances[0]
+            result_rows[i, :found] = valid[columns[0]]
+        return result_distances, result_rows
+
+    def recall_report(self, queries, exact_index: FlatIndex, k: int = 10,
+                      rescore_factors: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Exact arama ile karşılaştırmalı recall@k, latency ve bellek raporu"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+
+        started = time.perf_counter()
+        _, exact_rows = exact_index.search_batch(queries, k, self.metric)
+        exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        float32_bytes = self.size * self._codes.shape[1] * 4
+        report = {
+            'mode': self.mode,
+            'vectors': self.store.alive_count,
+            'k': k,
+            'queries': len(queries),
+            'float32_bytes': float32_bytes,
+            'quantized_bytes': self.memory_bytes(),
+            'memory_saved': round(1.0 - self.memory_bytes() / float32_bytes, 4) if float32_bytes else 0.0,
+            'exact_ms_per_query': round(exact_ms, 3),
+            'results': []
+        }
+        for rescore_factor in rescore_factors or [1, 2, 4, 8]:
+            started = time.perf_counter()
+            _, rows = self.search_batch(queries, k, rescore_factor=rescore_factor)
+            ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+            hits = sum(len(set(rows[i]) & set(exact_rows[i])) for i in range(len(queries)))
+            report['results'].append({
+                'rescore_factor': rescore_factor,
+                f'recall@{k}': round(hits / exact_rows.size, 4) if exact_rows.size else 0.0,
+                'ms_per_query': round(ms, 3)
+            })
+        return report
+
+    def _ensure_capacity(self, rows: int):
+        dim = self.store.dim or 0
+        if rows <= len(self._codes) and self._codes.shape[1] == dim:
+            return
+        capacity = max(rows, 2 * len(self._codes), 1024)
+        codes = np.zeros((capacity, dim), dtype=self._codes.dtype)
+        scales = np.zeros(capacity, dtype=np.float32)
+        if self.size and self._codes.shape[1] == dim:
+            codes[:self.size] = self._codes[:self.size]
+            scales[:self.size] = self._scales[:self.size]
+        self._codes, self._scales = codes, scales
+
+    def _write(self, row: int, vectors: np.ndarray):
+        end = row + len(vectors)
+        if self.mode == 'float16':
+            self._codes[row:end] = vectors.astype(np.float16)
+        else:
+            # Simetrik, vektör başına ölçek: v ~= code * scale, |code| <= 127
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._codes[row:end] = np.rint(vectors / scales[:, None]).astype(np.int8)
+            self._scales[row:end] = scales
+        self.size = max(self.size, end)
+
+    def _dequantize(self, start: int, end: int) -> np.ndarray:
+        matrix = self._codes[start:end].astype(np.float32)
+        if self.mode == 'int8':
+            matrix *= self._scales[start:end, None]
+        return matrix
+
+
 class VectorStore:
     def __init__(self, vectors_dir: str = "/app/data/vectors"):
         self.vectors_dir = vectors_dir
@@ -14,42 +604,192 @@ class VectorStore:
         # Ollama configuration
         self.ollama_host = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
         self.embedding_model = os.getenv('EMBEDDING_MODEL', 'nomic-embed-text')
+        self.distance_metric = os.getenv('VECTOR_DISTANCE_METRIC', 'l2').lower()
+        self.embedding_batch_size = max(1, int(os.getenv('EMBEDDING_BATCH_SIZE', 32)))
+        # Pipeline batch'leri EMBEDDING_REQUEST_BATCH_SIZE'lık isteklere bölünüp paralel gönderilir;
+        # eşzamanlılık gecikme / hata oranına göre AIMD ile 1..EMBEDDING_MAX_CONCURRENCY arasında ayarlanır
+        self.embedding_client = OllamaEmbeddingClient(
+            self.ollama_host,
+            self.embedding_model,
+            request_batch_size=int(os.getenv('EMBEDDING_REQUEST_BATCH_SIZE', 16)),
+            max_concurrency=int(os.getenv('EMBEDDING_MAX_CONCURRENCY', 8)),
+            max_retries=int(os.getenv('EMBEDDING_MAX_RETRIES', 3)),
+            timeout=float(os.getenv('EMBEDDING_TIMEOUT', 60)),
+            failure_threshold=int(os.getenv('EMBEDDING_CIRCUIT_FAILURES', 5)),
+            reset_timeout=float(os.getenv('EMBEDDING_CIRCUIT_RESET_SECONDS', 30))
+        )
+        
+        # Kalıcı vector storage: vectors_dir/segments altında memory-mapped segment'ler
+        self.store = SegmentStore(
+            os.path.join(vectors_dir, 'segments'),
+            segment_max_rows=int(os.getenv('VECTOR_SEGMENT_MAX_ROWS', 65536))
+        )
+        self.compaction_dead_ratio = float(os.getenv('VECTOR_COMPACTION_DEAD_RATIO', 0.3))
+        self.index = FlatIndex(self.store, metric=self.distance_metric)
+        
+        # Opsiyonel ANN index (VECTOR_INDEX=ivf); eğitilene kadar arama FlatIndex ile yapılır
+        self.index_mode = os.getenv('VECTOR_INDEX', 'flat').lower()
+        self.ann_index = None
+        if self.index_mode == 'ivf':
+            self.ann_index = IVFIndex(
+                self.store,
+                metric=self.distance_metric,
+                nlist=int(os.getenv('IVF_NLIST', 0)),
+                nprobe=int(os.getenv('IVF_NPROBE', 8)),
+                min_train_rows=int(os.getenv('IVF_MIN_TRAIN_ROWS', 10000))
+            )
+        
+        # Opsiyonel quantized tarama (VECTOR_QUANTIZATION=float16|int8); adaylar float32 ile yeniden skorlanır
+        self.quantization = os.getenv('VECTOR_QUANTIZATION', 'none').lower()
+        self.quantized_index = None
+        if self.quantization in QUANTIZATION_MODES:
+            self.quantized_index = QuantizedIndex(
+                self.store,
+                metric=self.distance_metric,
+                mode=self.quantization,
+                rescore_factor=int(os.getenv('VECTOR_RESCORE_FACTOR', 4)),
+                build=False
+            )
+        
+        # Opsiyonel çok çekirdekli tam arama (SEARCH_SHARDS=N, 0 = cpu sayısı, boş = kapalı);
+        # shard process'leri segment dosyalarını mmap eder, satırlar şeritler halinde paylaştırılır
+        self.sharded_index = None
+        search_shards = os.getenv('SEARCH_SHARDS', '')
+        if search_shards:
+            self.sharded_index = ShardedIndex(
+                self.store,
+                metric=self.distance_metric,
+                shards=int(search_shards),
+                stripe_rows=int(os.getenv('SEARCH_SHARD_STRIPE_ROWS', 4096)),
+                timeout=float(os.getenv('SEARCH_SHARD_TIMEOUT_SECONDS', 10))
+            ).start()
+        
+        # Chunk text'leri üzerinde BM25 index (hybrid / lexical arama için)
+        self.search_mode = os.getenv('SEARCH_MODE', 'vector').lower()
+        self.hybrid_candidates = max(1, int(os.getenv('HYBRID_CANDIDATES', 50)))
+        self.rrf_k = int(os.getenv('RRF_K', 60))
+        self.lexical_confidence_ratio = float(os.getenv('LEXICAL_CONFIDENCE_RATIO', 2.0))
+        self.lexical_fast_path = 0
+        self.lexical_index = None
+        if os.getenv('LEXICAL_INDEX', 'true').lower() == 'true':
+            self.lexical_index = LexicalIndex()
+        self._lock = threading.RLock()
+        
+        # BM25 / quantized index'ler ve IVF eğitimi arka planda kurulur; worker bu sırada
+        # job alabilir. Aramalar hazır olana kadar en fazla SEARCH_READY_TIMEOUT_SECONDS bekler.
+        self.ready = threading.Event()
+        self.search_ready_timeout = float(os.getenv('SEARCH_READY_TIMEOUT_SECONDS', 30))
+        self.warm_up_seconds: Optional[float] = None
+        
+        # Sorgu embedding'i ve arama sonucu cache'leri; sonuç anahtarı store
+        # generation'ını içerir, her save/delete generation'ı ilerletir
+        self.generation = 0
+        search_cache_ttl = float(os.getenv('SEARCH_CACHE_TTL_SECONDS', 300))
+        query_embedding_cache_size = int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', 2048))
+        result_cache_size = int(os.getenv('SEARCH_RESULT_CACHE_SIZE', 1024))
+        self.query_embedding_cache = (TTLCache(query_embedding_cache_size, search_cache_ttl)
+                                      if query_embedding_cache_size > 0 else None)
+        self.result_cache = TTLCache(result_cache_size, search_cache_ttl) if result_cache_size > 0 else None
         
-        # Simple in-memory vector storage
-        self.vectors = []
+        # Silme sonrası compaction arka planda yapılır; delete çağrısı beklemez
+        self._compaction_requested = threading.Event()
+        self.compactions = 0
+        self._compaction_thread = threading.Thread(target=self._compaction_loop, name='vector-compaction', daemon=True)
+        self._compaction_thread.start()
+        
+        # IVF eğitimi (k-means ve satır ataması) arka planda yapılır, bitince yeni index devreye alınır
+        self._training_requested = threading.Event()
+        if self.ann_index is not None:
+            threading.Thread(target=self._training_loop, name='vector-ivf-training', daemon=True).start()
+        
+        # Kalıcı embedding cache (EMBEDDING_CACHE_MAX_ENTRIES=0 ile kapatılır)
+        self.embedding_cache = None
+        cache_max_entries = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', 200000))
+        if cache_max_entries > 0:
+            try:
+                self.embedding_cache = EmbeddingCache(
+                    os.path.join(vectors_dir, 'embedding_cache'),
+                    max_entries=cache_max_entries
+                )
+            except Exception as e:
+                logger.error(f"Embedding cache açılamadı, cache kullanılmayacak: {e}")
+        
+        # Dokümanlar arası near-duplicate chunk tespiti (varsayılan kapalı, ör. NEAR_DUPLICATE_THRESHOLD=0.9 ile açılır);
+        # duplicate chunk'lar embed edilmez ve store'a yazılmaz, aramada canonical chunk döner
+        self.near_duplicates = None
+        near_duplicate_threshold = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', 0))
+        if near_duplicate_threshold > 0:
+            try:
+                self.near_duplicates = NearDuplicateIndex(
+                    os.path.join(vectors_dir, 'near_duplicates'),
+                    threshold=near_duplicate_threshold,
+                    num_perm=int(os.getenv('NEAR_DUPLICATE_NUM_PERM', 64))
+                )
+            except Exception as e:
+                logger.error(f"Near-duplicate index açılamadı, tespit yapılmayacak: {e}")
+        # Yetim duplicate'ler aynı anda tek thread tarafından embed edilir (bkz. promote_orphans)
+        self._promotion_lock = threading.RLock()
+        
+        # Backend'e toplu vector gönderimi
+        self.backend_uploader = BackendUploader(
+            os.getenv('BACKEND_URL', 'http://rag-backend-api:8080'),
+            batch_size=int(os.getenv('BACKEND_UPLOAD_BATCH_SIZE', 64)),
+            max_retries=int(os.getenv('BACKEND_UPLOAD_MAX_RETRIES', 4))
+        )
+        
+        self._warm_up_thread = threading.Thread(target=self._warm_up, name='vector-warm-up', daemon=True)
+        self._warm_up_thread.start()
         
         logger.info(f"Ollama vector store başlatıldı: {vectors_dir}")
     
     def generate_embedding(self, text: str) -> List[float]:
-        """Text için embedding oluştur"""
+        """Text için embedding oluştur (önce cache'e bakılır)
+        
+        Embedding oluşturulamazsa EmbeddingError fırlatılır.
+        """
+        return self.generate_embeddings([text])[0]
+    
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Birden fazla text için toplu embedding oluştur
+        
+        Cache'te olmayan text'ler OllamaEmbeddingClient ile paralel isteklere
+        bölünerek gönderilir. Herhangi biri oluşturulamazsa EmbeddingError
+        (circuit breaker açıksa EmbeddingUnavailableError) fırlatılır.
+        """
+        embeddings = self._cache_get_many(texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+        
+        batch = [texts[i] for i in missing]
+        generated = self.embedding_client.embed_many(batch)
+        self._cache_put_many(batch, generated)
+        for i, embedding in zip(missing, generated):
+            embeddings[i] = embedding
+        
+        logger.debug(f"Embedding oluşturuldu: {len(generated)} text")
+        return embeddings
+    
+    def _cache_get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Cache lookup; cache yoksa veya hata olursa hepsi miss sayılır"""
+        if self.embedding_cache is None:
+            return [None] * len(texts)
         try:
-            # Ollama Embeddings API
-            url = f"{self.ollama_host}/api/embeddings"
-            payload = {
-                "model": self.embedding_model,
-                "prompt": text
-            }
-            
-            response = requests.post(url, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            embedding = result['embedding']
-            
-            logger.debug(f"Embedding oluşturuldu: {len(embedding)} boyut")
-            return embedding
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Ollama API hatası: {e}")
-            # Fallback: random embedding (test için)
-            return np.random.rand(768).tolist()
+            return self.embedding_cache.get_many(self.embedding_model, texts)
         except Exception as e:
-            logger.error(f"Embedding oluşturma hatası: {e}")
-            # Fallback: random embedding (test için)
-            return np.random.rand(768).tolist()
+            logger.error(f"Embedding cache okuma hatası: {e}")
+            return [None] * len(texts)
     
-    def save_vector(self, vector_data: Dict[str, Any]):
-        """Vector'ı memory'ye kaydet ve backend'e gönder"""
+    def _cache_put_many(self, texts: List[str], embeddings: List[List[float]]):
+        if self.embedding_cache is None:
+            return
+        try:
+            self.embedding_cache.put_many(self.embedding_model, texts, embeddings)
+        except Exception as e:
+            logger.error(f"Embedding cache yazma hatası: {e}")
+    
+    def save_vector(self, vector_data: Dict[str, Any]) -> bool:
+        """Vector'ı memory'ye kaydet ve backend'e gönder; kaydedilemezse False"""
         try:
             job_id = vector_data['job_id']
             file_name = vector_data['file_name']
@@ -60,6 +800,7 @@ class VectorStore:
             
             # Unique document ID oluştur
             doc_id = f"{job_id}_{chunk_index}"
+            created_at = time.time()
             
             # Vector data oluştur
             vector_entry = {
@@ -72,44 +813,173 @@ class VectorStore:
                     'file_path': file_path,
                     'chunk_index': chunk_index,
                     'chunk_size': len(chunk_text),
-                    'created_at': datetime.utcnow().isoformat()
+                    'created_at': datetime.utcfromtimestamp(created_at).isoformat()
                 }
             }
             
-            # Memory'ye ekle
-            self.vectors.append(vector_entry)
+            # Aktif segment'e ekle
+            with metrics.stage('save'), self._lock:
+                row = self.store.append(job_id, file_name, file_path, chunk_index, chunk_text, embedding, created_at)
+                if self.quantized_index is not None:
+                    self.quantized_index.add(row, embedding)
+                if self.sharded_index is not None:
+                    self.sharded_index.add(row)
+                # Warm-up bitmediyse satır warm-up tarafından eklenir
+                if self.lexical_index is not None and self.ready.is_set():
+                    self.lexical_index.add(row, chunk_text)
+                if self.ann_index is not None:
+                    self.ann_index.add(row, embedding)
+                    if not self._training_requested.is_set() and self.ann_index.needs_training():
+                        self._training_requested.set()
+                self.generation += 1
             
-            # Backend'e gönder
-            self.send_vector_to_backend(vector_entry)
+            # Backend'e gönderilmek üzere job buffer'ına ekle
+            self.backend_uploader.add(job_id, vector_entry)
             
-            logger.info(f"Vector memory'ye kaydedildi: {doc_id}")
+            logger.info(f"Vector segment'e kaydedildi: {doc_id}")
+            return True
             
         except Exception as e:
             logger.error(f"Vector kaydetme hatası: {e}")
+            return False
+    
+    def flush_backend(self, job_id: str):
+        """Job'ın buffer'da kalan vector'larını backend'e gönder
+        
+        Gönderilemezse BackendUploadError fırlatılır; job hata olarak işaretlenmelidir.
+        """
+        self.backend_uploader.flush(job_id)
+    
+    def find_reusable_vectors(self, job_id: str, chunk_hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Önceki job'ın chunk hash'lerinden hash -> embedding eşlemesi oluştur
+        
+        chunk_hashes[i], job'ın i. chunk'ının hash'idir (manifest sırası).
+        Embedding'ler kilit altında kopyalanır; compaction satırları sonradan
+        yeniden numaralandırsa da eşleme geçerli kalır.
+        """
+        with self._lock:
+            rows = self.store.find_rows(job_id=job_id)
+            chunk_indices = self.store.get_field(rows, 'chunk_index')
+            selected = chunk_indices < len(chunk_hashes)
+            rows, chunk_indices = rows[selected], chunk_indices[selected]
+            embeddings = self.store.get_embeddings(rows)
+        
+        reusable = {}
+        for chunk_index, embedding in zip(chunk_indices, embeddings):
+            reusable.setdefault(chunk_hashes[chunk_index], embedding)
+        return reusable
+    
+    def find_near_duplicates(self, job_id: str, first_chunk_index: int, texts: List[str],
+                             exclude_jobs: Tuple[str, ...] = ()) -> List[Tuple[Optional[np.ndarray], Optional[Tuple[str, float]]]]:
+        """Chunk'ların near-duplicate kontrolü: (imza, eşleşme) çiftleri
+        
+        texts[i], job'ın first_chunk_index + i. chunk'ıdır. Eşleşme duplicate
+        olmayan (veya index kapalıyken tüm) chunk'lar için None'dır. Index'e
+        eklenmez; vector'lar kaydedildikten sonra register_near_duplicates'e verilir.
+        """
+        if self.near_duplicates is None:
+            return [(None, None)] * len(texts)
+        
+        with metrics.stage('dedup'):
+            try:
+                return self.near_duplicates.check(job_id, first_chunk_index, texts, exclude_jobs)
+            except Exception as e:
+                logger.error(f"Near-duplicate kontrol hatası {job_id}_{first_chunk_index}: {e}")
+                return [(None, None)] * len(texts)
     
-    def send_vector_to_backend(self, vector_entry: Dict[str, Any]):
-        """Vector'ı backend'e gönder"""
+    def register_near_duplicates(self, job_id: str, file_name: str, file_path: str, first_chunk_index: int,
+                                 texts: List[str], checks: List[Tuple[Optional[np.ndarray], Optional[Tuple[str, float]]]],
+                                 saved: Set[int], exclude_jobs: Tuple[str, ...] = ()):
+        """find_near_duplicates sonuçlarını index'e ekle
+        
+        saved, vector'ı kaydedilen chunk'ların texts içindeki sırasıdır;
+        kaydedilemeyenler canonical olarak eklenmez. Canonical'ı kaydedilemeyen
+        duplicate'ler başka eşleşme bulamazsa embed edilir (promote_orphans).
+        """
+        if self.near_duplicates is None:
+            return
+        
+        chunks = [(first_chunk_index + i, signature, match, texts[i])
+                  for i, (signature, match) in enumerate(checks)
+                  if signature is not None and (match is not None or i in saved)]
         try:
-            backend_url = os.getenv('BACKEND_URL', 'http://rag-backend-api:8080')
-            url = f"{backend_url}/api/question/vector"
-            
-            # Backend formatına dönüştür
-            backend_vector = {
-                'id': vector_entry['id'],
-                'document': vector_entry['document'],
-                'embedding': vector_entry['embedding'],
-                'metadata': vector_entry['metadata']
-            }
-            
-            response = requests.post(url, json=backend_vector, timeout=10)
-            response.raise_for_status()
-            
-            logger.info(f"Vector backend'e gönderildi: {vector_entry['id']}")
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Backend'e vector gönderme hatası: {e}")
+            orphaned = self.near_duplicates.add(job_id, file_name, file_path, chunks, exclude_jobs)
         except Exception as e:
-            logger.error(f"Vector backend gönderme hatası: {e}")
+            logger.error(f"Near-duplicate kayıt hatası {job_id}_{first_chunk_index}: {e}")
+            return
+        if orphaned:
+            self.promote_orphans()
+    
+    def promote_orphans(self) -> int:
+        """Canonical vector'ı silinmiş duplicate'leri embed edip canonical yap
+        
+        Her yetim grubundan bir chunk embed edilip kendi job/chunk id'si ile
+        kaydedilir, gruptaki diğerleri ona bağlanır. Embedding alınamazsa
+        yetimler bir sonraki denemeye (silme veya başlangıç) bırakılır.
+        Canonical yapılan chunk sayısını döndürür.
+        """
+        if self.near_duplicates is None:
+            return 0
+        
+        promoted = 0
+        with self._promotion_lock:
+            while True:
+                orphan = self.near_duplicates.next_orphan()
+                if orphan is None:
+                    break
+                job_id, chunk_index, text, file_name, file_path = orphan
+                try:
+                    embedding = self.generate_embeddings([text])[0]
+                except EmbeddingError as e:
+                    logger.warning(f"Yetim near-duplicate embed edilemedi {job_id}_{chunk_index}, sonra denenecek: {e}")
+                    break
+                
+                saved = self.save_vector({
+                    'job_id': job_id,
+                    'file_name': file_name,
+                    'file_path': file_path,
+                    'chunk_index': chunk_index,
+                    'chunk_text': text,
+                    'embedding': embedding
+                })
+                if not saved:
+                    break
+                if self.near_duplicates.promote(job_id, chunk_index) is None:
+                    # Job bu arada silindi: kaydedilen vector da silinir
+                    self.backend_uploader.discard(job_id)
+                    self.delete_vectors_by_job(job_id, range(chunk_index, chunk_index + 1))
+                    continue
+                promoted += 1
+                try:
+                    self.flush_backend(job_id)
+                except BackendUploadError as e:
+                    logger.error(f"Canonical yapılan chunk backend'e gönderilemedi {job_id}_{chunk_index}: {e}")
+        
+        if promoted:
+            logger.info(f"{promoted} yetim near-duplicate chunk embed edilip canonical yapıldı")
+        return promoted
+    
+    def _job_rows(self, job_id: str, chunk_range: Optional[range] = None) -> np.ndarray:
+        """Job'ın satırları; chunk_range verilirse sadece o chunk_index aralığındakiler"""
+        rows = self.store.find_rows(job_id=job_id)
+        if chunk_range is not None and len(rows):
+            chunk_indices = self.store.get_field(rows, 'chunk_index')
+            rows = rows[(chunk_indices >= chunk_range.start) & (chunk_indices < chunk_range.stop)]
+        return rows
+    
+    def get_vector_ids_by_job(self, job_id: str, chunk_range: Optional[range] = None) -> List[str]:
+        """Job'ın store'daki vector id'leri"""
+        with self._lock:
+            rows = self._job_rows(job_id, chunk_range)
+            chunk_indices = self.store.get_field(rows, 'chunk_index')
+        return [f"{job_id}_{chunk_index}" for chunk_index in chunk_indices]
+    
+    def has_job(self, job_id: str, chunk_range: Optional[range] = None) -> bool:
+        """Job'ın store'da vector'ı veya near-duplicate kaydı var mı"""
+        with self._lock:
+            if len(self._job_rows(job_id, chunk_range)) > 0:
+                return True
+        return self.near_duplicates is not None and self.near_duplicates.job_count(job_id, chunk_range) > 0
     
     def update_metadata(self, job_id: str, file_name: str, total_chunks: int):
         """Metadata'yı güncelle (memory'de otomatik)"""
@@ -123,11 +993,11 @@ class VectorStore:
     def get_vectors_by_file(self, file_name: str) -> List[Dict[str, Any]]:
         """Belirli bir dosyaya ait tüm vector'ları getir"""
         try:
-            # Memory'den file_name'e göre filtrele
-            vectors = [v for v in self.vectors if v['metadata']['file_name'] == file_name]
-            
-            # Chunk index'e göre sırala
-            vectors.sort(key=lambda x: x['metadata']['chunk_index'])
+            # Store'dan file_name'e göre filtrele
+            with self._lock:
+                rows = self.store.find_rows(file_name=file_name)
+                # Satırlar ikincil index'ten chunk_index sırasında gelir
+                vectors = [self._entry(record, include_embedding=True) for record in self.store.iter_records(rows)]
             
             logger.info(f"Dosya vector'ları getirildi: {file_name} için {len(vectors)} vector")
             return vectors
@@ -139,35 +1009,60 @@ class VectorStore:
     def get_all_vectors(self) -> List[Dict[str, Any]]:
         """Tüm vector'ları getir"""
         try:
-            logger.info(f"Tüm vector'lar getirildi: {len(self.vectors)} vector")
-            return self.vectors.copy()
+            with self._lock:
+                rows = self.store.find_rows()
+                vectors = [self._entry(record, include_embedding=True) for record in self.store.iter_records(rows)]
+            
+            logger.info(f"Tüm vector'lar getirildi: {len(vectors)} vector")
+            return vectors
             
         except Exception as e:
             logger.error(f"Tüm vector'ları getirme hatası: {e}")
             return []
     
-    def search_similar(self, query_text: str, n_results: int = 5) -> List[Dict[str, Any]]:
-        """Benzer vector'ları ara"""
+    def search_similar(self, query_text: str, n_results: int = 5, metric: Optional[str] = None,
+                       include_embeddings: bool = True, mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Benzer vector'ları ara
+        
+        mode: 'vector' (varsayılan, SEARCH_MODE), 'lexical' (sadece BM25) veya
+        'hybrid' (BM25 + vector, RRF ile birleştirilir). Sonuçlar 'embedding'
+        alanını taşır; include_embeddings=False ile embedding'ler kopyalanmaz.
+        """
+        mode = (mode or self.search_mode).lower()
+        if mode not in SEARCH_MODES:
+            logger.error(f"Vector arama hatası: desteklenmeyen arama modu {mode}")
+            return []
+        self._wait_for_search()
+        
+        # Warm-up bitmeden dönen (FlatIndex / vector modu) sonuçlar cache'lenmez
+        cache_key = None
+        if self.result_cache is not None and self.ready.is_set():
+            cache_key = (normalize_query(query_text), n_results, metric or self.distance_metric,
+                         include_embeddings, mode, self.generation)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return _copy_results(cached)
+        
+        if mode != 'vector' and self.lexical_index is not None and self.ready.is_set():
+            results = self._search_hybrid(query_text, n_results, metric, include_embeddings, lexical_only=(mode == 'lexical'))
+        else:
+            results = self._search_vector(query_text, n_results, metric, include_embeddings)
+        
+        # Hata durumunda dönen boş liste cache'lenmez
+        if cache_key is not None and results:
+            self.result_cache.put(cache_key, _copy_results(results))
+        return results
+    
+    def _search_vector(self, query_text: str, n_results: int, metric: Optional[str],
+                       include_embeddings: bool) -> List[Dict[str, Any]]:
         try:
             # Query için embedding oluştur
-            query_embedding = self.generate_embedding(query_text)
-            
-            # Memory'de ara
-            similar_vectors = []
-            for vector in self.vectors:
-                distance = self._calculate_distance(query_embedding, vector['embedding'])
-                vector_data = {
-                    'id': vector['id'],
-                    'embedding': vector['embedding'],
-                    'document': vector['document'],
-                    'metadata': vector['metadata'],
-                    'distance': distance
-                }
-                similar_vectors.append(vector_data)
+            query_embedding = self.query_embedding(query_text)
             
-            # Distance'a göre sırala ve top n_results'ı al
-            similar_vectors.sort(key=lambda x: x['distance'])
-            similar_vectors = similar_vectors[:n_results]
+            # Matris üzerinde top-k
+            with metrics.OPERATION_SECONDS.time(operation='search'), self._lock:
+                distances, rows = self._search_batch([query_embedding], n_results, metric)
+                similar_vectors = self._build_results(distances[0], rows[0], include_embeddings)
             
             logger.info(f"Vector arama tamamlandı: {query_text} için {len(similar_vectors)} sonuç")
             return similar_vectors
@@ -176,27 +1071,111 @@ class VectorStore:
             logger.error(f"Vector arama hatası: {e}")
             return []
     
+    def search_similar_batch(self, query_texts: List[str], n_results: int = 5, metric: Optional[str] = None,
+                             include_embeddings: bool = True) -> List[List[Dict[str, Any]]]:
+        """Birden fazla sorguyu tek seferde ara"""
+        try:
+            if not query_texts:
+                return []
+            
+            self._wait_for_search()
+            query_embeddings = self.query_embeddings(query_texts)
+            with self._lock:
+                distances, rows = self._search_batch(query_embeddings, n_results, metric)
+                results = [
+                    self._build_results(distances[i], rows[i], include_embeddings)
+                    for i in range(len(query_texts))
+                ]
+            
+            logger.info(f"Toplu vector arama tamamlandı: {len(query_texts)} sorgu")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Toplu vector arama hatası: {e}")
+            return [[] for _ in query_texts]
+    
+    def query_embedding(self, query_text: str) -> List[float]:
+        """Sorgu embedding'i; normalize edilmiş sorgu için bellek içi LRU'dan döner"""
+        return self.query_embeddings([query_text])[0]
+    
+    def query_embeddings(self, query_texts: List[str]) -> List[List[float]]:
+        if self.query_embedding_cache is None:
+            return self.generate_embeddings(query_texts)
+        
+        keys = [(self.embedding_model, normalize_query(text)) for text in query_texts]
+        embeddings = [self.query_embedding_cache.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            generated = self.generate_embeddings([query_texts[i] for i in missing])
+            for i, embedding in zip(missing, generated):
+                embeddings[i] = embedding
+                self.query_embedding_cache.put(keys[i], embedding)
+        return embeddings
+    
     def get_collection_stats(self) -> Dict[str, Any]:
         """Collection istatistiklerini getir"""
         try:
             return {
-                'total_documents': len(self.vectors),
+                'total_documents': self.store.alive_count,
+                'ready': self.ready.is_set(),
+                'warm_up_seconds': round(self.warm_up_seconds, 3) if self.warm_up_seconds is not None else None,
+                'stored_rows': len(self.store),
+                'dead_ratio': round(self.store.dead_ratio(), 4),
+                'compactions': self.compactions,
+                'segments': len(self.store.segments),
+                'storage_bytes': self.store.memory_usage(),
                 'collection_name': 'documents',
-                'vectors_dir': self.vectors_dir
+                'vectors_dir': self.vectors_dir,
+                'distance_metric': self.distance_metric,
+                'index_mode': self.index_mode,
+                'ann_trained': bool(self.ann_index and self.ann_index.is_trained),
+                'quantization': self.quantization if self.quantized_index else 'none',
+                'quantized_bytes': self.quantized_index.memory_bytes() if self.quantized_index else 0,
+                'search_shards': self.sharded_index.stats() if self.sharded_index else None,
+                'embedding_cache': self.embedding_cache.stats() if self.embedding_cache else None,
+                'near_duplicates': self.near_duplicates.stats() if self.near_duplicates else None,
+                'embedding_client': self.embedding_client.stats(),
+                'lexical_index': self.lexical_index.stats() if self.lexical_index else None,
+                'lexical_fast_path': self.lexical_fast_path,
+                'generation': self.generation,
+                'query_embedding_cache': self.query_embedding_cache.stats() if self.query_embedding_cache else None,
+                'search_result_cache': self.result_cache.stats() if self.result_cache else None,
+                'backend_upload': self.backend_uploader.stats()
             }
         except Exception as e:
             logger.error(f"İstatistik getirme hatası: {e}")
             return {}
     
-    def delete_vectors_by_job(self, job_id: str) -> bool:
-        """Belirli bir job'a ait tüm vector'ları sil"""
+    def delete_vectors_by_job(self, job_id: str, chunk_range: Optional[range] = None) -> bool:
+        """Belirli bir job'a ait tüm vector'ları (chunk_range verilirse sadece o aralığı) sil"""
         try:
-            # Job ID'ye göre filtrele
-            original_count = len(self.vectors)
-            self.vectors = [v for v in self.vectors if v['metadata']['job_id'] != job_id]
-            deleted_count = original_count - len(self.vectors)
+            # Job ID'ye göre tombstone koy
+            with self._lock:
+                rows = self._job_rows(job_id, chunk_range)
+                deleted_count = self.store.mark_deleted(rows)
+                if self.ann_index is not None:
+                    self.ann_index.remove(rows)
+                if self.sharded_index is not None:
+                    self.sharded_index.remove(rows)
+                if self.lexical_index is not None:
+                    self.lexical_index.remove(rows)
+                if deleted_count > 0:
+                    self.generation += 1
+            
+            # Silinmiş satır oranı eşiği aştıysa disk alanı arka planda geri kazanılır
+            if deleted_count > 0 and self.store.dead_ratio() >= self.compaction_dead_ratio:
+                self._compaction_requested.set()
             
-            if deleted_count > 0:
+            # Job'ın near-duplicate kayıtları; bu vector'ları gösteren duplicate'ler yeniden bağlanır
+            near_duplicate_count = 0
+            if self.near_duplicates is not None:
+                near_duplicate_count = self.near_duplicates.job_count(job_id, chunk_range)
+                _, orphaned = self.near_duplicates.remove_job(job_id, chunk_range)
+                # Başka benzeri olmayan duplicate'lerden biri embed edilip canonical yapılır
+                if orphaned:
+                    self.promote_orphans()
+            
+            if deleted_count > 0 or near_duplicate_count > 0:
                 logger.info(f"Job {job_id} için {deleted_count} vector silindi")
                 return True
             else:
@@ -207,10 +1186,249 @@ class VectorStore:
             logger.error(f"Vector silme hatası: {e}")
             return False
 
-    def _calculate_distance(self, embedding1: List[float], embedding2: List[float]) -> float:
-        """İki embedding arasındaki mesafeyi hesapla"""
-        if len(embedding1) != len(embedding2):
-            return float('inf')
+    def compact(self) -> bool:
+        """Eşiği aşan segment'leri yeniden yaz ve index'lere satır eşlemesini uygula"""
+        with self._lock:
+            remap = self.store.compact(self.compaction_dead_ratio)
+            if remap is None:
+                return False
+            if self.ann_index is not None:
+                self.ann_index.apply_remap(remap)
+            if self.quantized_index is not None:
+                self.quantized_index.apply_remap(remap)
+            if self.sharded_index is not None:
+                self.sharded_index.apply_remap(remap)
+            if self.lexical_index is not None:
+                self.lexical_index.apply_remap(remap)
+            self.compactions += 1
+            return True
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Arka plan warm-up'ı bitene kadar bekle; timeout dolarsa False"""
+        return self.ready.wait(timeout)
+
+    def _warm_up(self):
+        """Store'daki satırları WARM_UP_BLOCK_ROWS'luk bloklar halinde index'lere ekle
+
+        Her blok store kilidi altında işlenir; arada kaydedilen satırlar sonraki
+        bloklara düşer. Son blokla aynı kilit altında ready işaretlenir, sonra
+        save_vector index'leri kendisi günceller. Compaction warm-up bitene
+        kadar bekler (satır numaraları sabit kalır).
+        """
+        started = time.time()
+        position = 0
+        try:
+            while True:
+                with self._lock:
+                    end = min(len(self.store), position + WARM_UP_BLOCK_ROWS)
+                    if position >= end:
+                        if self.ann_index is not None and self.ann_index.needs_training():
+                            self._training_requested.set()
+                        self.ready.set()
+                        break
+                    if self.quantized_index is not None:
+                        self.quantized_index.build_range(position, end)
+                    if self.lexical_index is not None:
+                        self.lexical_index.build_range(self.store, position, end)
+                    position = end
+        except Exception as e:
+            # Eksik index'lerle arama yapılmaz: kapatılır, aramalar FlatIndex / vector moduna düşer
+            logger.error(f"Index warm-up hatası, BM25 ve quantized index kapatıldı: {e}")
+            with self._lock:
+                self.lexical_index = None
+                self.quantized_index = None
+                self.ready.set()
+            return
+        
+        self.warm_up_seconds = time.time() - started
+        logger.info(f"Index warm-up tamamlandı: {position} satır, {self.warm_up_seconds:.2f}s")
         
-        sum_squared_diff = sum((a - b) ** 2 for a, b in zip(embedding1, embedding2))
-        return sum_squared_diff ** 0.5
\ No newline at end of file
+        # Önceki çalışmada embed edilemeyen yetim near-duplicate'ler
+        self.promote_orphans()
+
+    def _wait_for_search(self):
+        if not self.ready.is_set() and not self.ready.wait(self.search_ready_timeout):
+            logger.warning("Index warm-up sürüyor, arama FlatIndex ve vector modu ile yapılıyor")
+
+    def _compaction_loop(self):
+        self.ready.wait()
+        while True:
+            self._compaction_requested.wait()
+            self._compaction_requested.clear()
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Vector compaction hatası: {e}")
+
+    def _training_loop(self):
+        self.ready.wait()
+        while True:
+            self._training_requested.wait()
+            self._training_requested.clear()
+            try:
+                self._train_ann()
+            except Exception as e:
+                logger.error(f"IVF eğitim hatası: {e}")
+
+    def _train_ann(self):
+        """IVF index'i store kilidini uzun süre tutmadan eğit ve yenisiyle değiştir
+
+        Örnek kilit altında kopyalanır; k-means ve satır atamaları kilit dışında
+        yeni bir IVFIndex üzerinde yapılır, satırlar WARM_UP_BLOCK_ROWS'luk
+        bloklar halinde kopyalanır. Son blokla aynı kilit altında arada silinen
+        satırlar çıkarılıp yeni index devreye alınır; o ana kadar aramalar eski
+        index (veya FlatIndex) ile yapılır. Arada compaction satırları yeniden
+        numaralandırdıysa eğitim yeniden istenir.
+        """
+        with self._lock:
+            current = self.ann_index
+            if current is None or not current.needs_training():
+                return
+            compactions = self.compactions
+            sample = current.training_sample()
+
+        started = time.time()
+        trained = current.fitted_copy(sample)
+        position = 0
+        while True:
+            with self._lock:
+                if self.compactions != compactions or self.ann_index is not current:
+                    self._training_requested.set()
+                    return
+                end = min(len(self.store), position + WARM_UP_BLOCK_ROWS)
+                if position >= end:
+                    rows = trained.indexed_rows()
+                    trained.remove(rows[self.store.get_field(rows, 'deleted') != 0])
+                    self.ann_index = trained
+                    break
+                rows = np.arange(position, end)
+                rows = rows[self.store.get_field(rows, 'deleted') == 0]
+                vectors = self.store.get_embeddings(rows)
+                sq_norms = self.store.get_field(rows, 'sq_norm')
+            trained.add_many(rows, vectors, sq_norms)
+            position = end
+
+        logger.info(f"IVF index eğitildi: {trained.trained_rows} vector, {len(trained.lists)} liste, "
+                    f"{time.time() - started:.2f}s")
+
+    def _search_batch(self, queries, k: int, metric: Optional[str]):
+        """_search_index ile ara; shard'lar hata verir veya zaman aşımına uğrarsa sorgu FlatIndex ile yapılır"""
+        index = self._search_index(metric)
+        try:
+            return index.search_batch(queries, k, metric)
+        except ShardSearchError as e:
+            logger.error(f"Sharded arama başarısız, FlatIndex ile aranıyor: {e}")
+            return self.index.search_batch(queries, k, metric)
+
+    def _search_index(self, metric: Optional[str]):
+        """Eğitilmiş ve metriği uyan ANN index, yoksa quantized index, yoksa (shard'lar
+        çalışıyorsa) ShardedIndex, yoksa FlatIndex; warm-up bitmediyse ShardedIndex / FlatIndex"""
+        if not self.ready.is_set():
+            if self.sharded_index is not None and self.sharded_index.is_alive():
+                return self.sharded_index
+            return self.index
+        if self.ann_index is not None and (metric is None or metric == self.ann_index.metric):
+            if self.ann_index.is_trained:
+                return self.ann_index
+        if self.quantized_index is not None:
+            return self.quantized_index
+        if self.sharded_index is not None and self.sharded_index.is_alive():
+            return self.sharded_index
+        return self.index
+    
+    def _entry(self, record: ChunkRecord, include_embedding: bool = False) -> Dict[str, Any]:
+        """Store kaydının view'ından entry dict'i oluştur (sadece istendiğinde)"""
+        job_id = record.job_id
+        chunk_index = record.chunk_index
+        text = record.text
+        entry = {
+            'id': f"{job_id}_{chunk_index}",
+            'document': text,
+            'metadata': {
+                'job_id': job_id,
+                'file_name': record.file_name,
+                'file_path': record.file_path,
+                'chunk_index': chunk_index,
+                'chunk_size': len(text),
+                'created_at': datetime.utcfromtimestamp(record.created_at).isoformat()
+            }
+        }
+        if include_embedding:
+            entry['embedding'] = record.embedding.tolist()
+        return entry
+
+    def _search_hybrid(self, query_text: str, n_results: int, metric: Optional[str],
+                       include_embeddings: bool, lexical_only: bool) -> List[Dict[str, Any]]:
+        """BM25 ve vector sıralamalarını RRF ile birleştir
+        
+        BM25 sonucu kendinden eminse (en iyi chunk tüm sorgu terimlerini içerir
+        ve ikinciden LEXICAL_CONFIDENCE_RATIO kat yüksek skorlu) embedding
+        çağrısı yapılmadan lexical sonuç döndürülür.
+        """
+        try:
+            candidates = max(n_results, self.hybrid_candidates)
+            with self._lock:
+                scores, rows, matched_terms = self.lexical_index.search(query_text, candidates)
+                if lexical_only or self._lexical_confident(query_text, scores, matched_terms):
+                    if not lexical_only:
+                        self.lexical_fast_path += 1
+                    results = self._build_lexical_results(scores[:n_results], rows[:n_results], include_embeddings)
+                    logger.info(f"Lexical arama tamamlandı: {query_text} için {len(results)} sonuç")
+                    return results
+                compactions = self.compactions
+            
+            query_embedding = self.query_embedding(query_text)
+            
+            with self._lock:
+                # Embedding beklenirken compaction olduysa satır numaraları değişmiştir
+                if compactions != self.compactions:
+                    scores, rows, matched_terms = self.lexical_index.search(query_text, candidates)
+                vector_rows = self._search_batch([query_embedding], candidates, metric)[1][0]
+                fused = reciprocal_rank_fusion([rows, vector_rows], self.rrf_k)[:n_results]
+                
+                fused_rows = np.array([row for row, _ in fused], dtype=np.int64)
+                distances = pairwise_distances(
+                    np.asarray(query_embedding, dtype=np.float32).reshape(1, -1),
+                    self.store.get_embeddings(fused_rows),
+                    self.store.get_field(fused_rows, 'sq_norm'),
+                    metric or self.distance_metric
+                )[0] if len(fused_rows) else []
+                lexical_scores = dict(zip(rows.tolist(), scores.tolist()))
+                
+                results = self._build_results(distances, fused_rows, include_embeddings)
+                for result, (row, fused_score) in zip(results, fused):
+                    result['score'] = fused_score
+                    result['lexical_score'] = lexical_scores.get(row, 0.0)
+            
+            logger.info(f"Hybrid arama tamamlandı: {query_text} için {len(results)} sonuç")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Hybrid arama hatası: {e}")
+            return []
+
+    def _lexical_confident(self, query_text: str, scores: np.ndarray, matched_terms: np.ndarray) -> bool:
+        if self.lexical_confidence_ratio <= 0 or not len(scores):
+            return False
+        if matched_terms[0] < self.lexical_index.query_term_count(query_text):
+            return False
+        return len(scores) == 1 or scores[0] >= self.lexical_confidence_ratio * scores[1]
+
+    def _build_lexical_results(self, scores, rows, include_embeddings: bool) -> List[Dict[str, Any]]:
+        results = []
+        for score, row in zip(scores, rows):
+            vector_data = self._entry(self.store.get_record(int(row)), include_embeddings)
+            vector_data['score'] = float(score)
+            results.append(vector_data)
+        return results
+
+    def _build_results(self, distances, rows, include_embeddings: bool) -> List[Dict[str, Any]]:
+        """Index satırlarından arama sonuçlarını oluştur"""
+        results = []
+        for distance, row in zip(distances, rows):
+            if row < 0:
+                continue
+            vector_data = self._entry(self.store.get_record(int(row)), include_embeddings)
+            vector_data['distance'] = float(distance)
+            results.append(vector_data)
+        return results
@@ -1,13 +1,29 @@
+import time
+# Startup raporu: modül import süresi (PDF kütüphaneleri ilk PDF'te yüklenir)
+_IMPORT_STARTED = time.perf_counter()
 import os
 import json
+import queue
 import redis
+import signal
+import threading
+import socket
 import logging
-import time
-from typing import Dict, List, Optional
+import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Iterable, Iterator
 from datetime import datetime
+import metrics
 from document_processor import DocumentProcessor
+from backend_client import BackendUploadError
+from embedding_client import EmbeddingError
+from log_sink import RedisLogSink
+from chunk_manifest import ChunkManifestStore
 from vector_store import VectorStore
 
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
 # Logging configuration
 logging.basicConfig(
     level=logging.INFO,
@@ -15,17 +31,191 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Processing listesindeki kayıt "<claim token>|<job json>" biçimindedir; aynı payload'lı
+# iki job'ın ack / requeue'su birbirinin kaydını silmez. BLMOVE'un taşıdığı ham job
+# json'ı token'lı kayıtla değiştirilir (ARGV[1] ham json, ARGV[2] kayıt, ARGV[3] claim).
+CLAIM_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) > 0 then
+    redis.call('LPUSH', KEYS[1], ARGV[2])
+    redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# Kaydı processing listesinden atomik olarak çıkarıp job'ı kuyruğa geri koy (ARGV[1] kayıt, ARGV[2] job json).
+# LREM 0 dönerse job başka bir worker tarafından zaten geri konmuş/ack'lenmiştir.
+REQUEUE_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) > 0 then
+    redis.call('RPUSH', KEYS[2], ARGV[2])
+end
+redis.call('HDEL', KEYS[3], ARGV[1])
+"""
+
+# Geçici hatayla başarısız olan job'ı kuyruğun sonuna koy (LPUSH); diğer job'lar önce alınır
+RETRY_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) > 0 then
+    redis.call('LPUSH', KEYS[2], ARGV[2])
+end
+redis.call('HDEL', KEYS[3], ARGV[1])
+"""
+
+
+# Sub-job sonucunu bir kez kaydet (aynı parça iki kez biterse sayılmaz), biten parça sayısını döndür
+COMPLETE_PART_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -2
+end
+if redis.call('HSETNX', KEYS[1], 'part:' .. ARGV[1], ARGV[2]) == 0 then
+    return -1
+end
+return redis.call('HINCRBY', KEYS[1], 'done', 1)
+"""
+
+# Parçanın chunk sayısını kaydet; önceki tüm parçaların sayıları biliniyorsa ilk global chunk_index'ini döndür.
+# -1: önceki parçalardan biri henüz chunk'lanmadı, -2: split durumu yok, -3: sayı önceki denemeden farklı
+ASSIGN_PART_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -2
+end
+local previous = redis.call('HGET', KEYS[1], 'count:' .. ARGV[1])
+if previous and previous ~= ARGV[2] then
+    return -3
+end
+redis.call('HSET', KEYS[1], 'count:' .. ARGV[1], ARGV[2])
+local first_chunk = 0
+for index = 0, tonumber(ARGV[1]) - 1 do
+    local count = redis.call('HGET', KEYS[1], 'count:' .. index)
+    if not count then
+        return -1
+    end
+    first_chunk = first_chunk + tonumber(count)
+end
+return first_chunk
+"""
+
+# Split durumu, tüm parçalar bitmezse bu süre sonunda silinir
+SPLIT_STATE_TTL_SECONDS = 7 * 24 * 3600
+# Sub-job önceki parçaların chunk sayılarını bu aralıkla yoklar
+PART_ORDER_POLL_SECONDS = 0.5
+
+
+def job_payload(entry: str) -> str:
+    """Processing listesi kaydından job json'ı; token'sız (claim yarıda kalmış) kayıt json'ın kendisidir"""
+    if entry.startswith('{'):
+        return entry
+    return entry.split('|', 1)[1]
+
+
+class JobRetryError(Exception):
+    """Job geçici bir nedenle (ör. embedding servisi veya backend yok) tamamlanamadı, tekrar denenebilir"""
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Iterable'ı en fazla size elemanlık listeler halinde üret"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def prefetch(items: Iterable, max_buffered: int) -> Iterator:
+    """Iterable'ı arka plan thread'inde tüket; en fazla max_buffered eleman bekletilir
+    
+    Üretici tarafındaki hata tüketici tarafında tekrar fırlatılır. Tüketici
+    erken bırakırsa üretici bir sonraki put denemesinde durur.
+    """
+    buffer = queue.Queue(maxsize=max(1, max_buffered))
+    stop = threading.Event()
+    finished = object()
+    
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(finished)
+        except BaseException as e:
+            put(e)
+    
+    threading.Thread(target=produce, name='prefetch', daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is finished:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
 class RedisWorker:
     def __init__(self):
+        init_started = time.perf_counter()
         self.redis_client = redis.Redis(
             host=os.getenv('REDIS_HOST', 'redis'),
             port=int(os.getenv('REDIS_PORT', 6379)),
             decode_responses=True
         )
         self.queue_name = 'file_processing_queue'
+        self.processing_list_name = f"{self.queue_name}:processing"
+        self.claims_hash_name = f"{self.queue_name}:claims"
+        self.worker_id = os.getenv('WORKER_ID', socket.gethostname())
+        self.concurrency = max(1, int(os.getenv('WORKER_CONCURRENCY', 1)))
+        self.visibility_timeout = max(30, int(os.getenv('JOB_VISIBILITY_TIMEOUT', 600)))
+        self.attempts_hash_name = f"{self.queue_name}:attempts"
+        self.max_job_attempts = max(1, int(os.getenv('JOB_MAX_ATTEMPTS', 5)))
+        self._claim_script = self.redis_client.register_script(CLAIM_SCRIPT)
+        self._requeue_script = self.redis_client.register_script(REQUEUE_SCRIPT)
+        self._retry_script = self.redis_client.register_script(RETRY_SCRIPT)
+        self._complete_part_script = self.redis_client.register_script(COMPLETE_PART_SCRIPT)
+        self._assign_part_script = self.redis_client.register_script(ASSIGN_PART_SCRIPT)
+        # Bu sayfa sayısını aşan PDF'ler bu boyutta sayfa aralığı sub-job'larına bölünür (0 = kapalı)
+        self.split_pages = max(0, int(os.getenv('PDF_SPLIT_PAGES', 200)))
+        # Sub-job önceki parçaların chunk sayılarını en fazla bu kadar bekler, sonra tekrar denenir
+        self.split_order_wait = max(0.0, float(os.getenv('PDF_SPLIT_ORDER_WAIT_SECONDS', 120)))
+        self._in_flight: Dict[Future, str] = {}
+        self._stopping = False
         self.logs_list_name = 'application_logs'
+        # log_to_redis hot path'te Redis'i beklemesin diye arka planda toplu yazılır
+        self.log_sink = RedisLogSink(
+            self.redis_client,
+            self.logs_list_name,
+            max_list_length=1000,
+            buffer_size=int(os.getenv('LOG_SINK_BUFFER_SIZE', 10000)),
+            flush_interval=float(os.getenv('LOG_SINK_FLUSH_INTERVAL', 0.5))
+        )
         self.document_processor = DocumentProcessor()
-        self.vector_store = VectorStore()
+        self.prefetch_batches = max(1, int(os.getenv('PIPELINE_PREFETCH_BATCHES', 2)))
+        self.vector_store = VectorStore(os.getenv('VECTORS_DIR', '/app/data/vectors'))
+        self.chunk_manifests = ChunkManifestStore(os.path.join(self.vector_store.vectors_dir, 'manifests'))
+        # Prometheus metrics endpoint (METRICS_PORT=0 ile kapatılır)
+        self.metrics_port = int(os.getenv('METRICS_PORT', 9100))
+        self.metrics_server = None
+        # Opsiyonel: bu süreyi aşan job'ların örneklenmiş stack profili loglanır
+        slow_job_seconds = float(os.getenv('PROFILE_SLOW_JOBS_SECONDS', 0))
+        self.slow_job_profiler = (
+            metrics.SlowJobProfiler(slow_job_seconds, interval=float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.01)))
+            if slow_job_seconds > 0 else None
+        )
+        # Index'ler arka planda kurulur (VectorStore warm-up); job almak onları beklemez
+        self.init_seconds = time.perf_counter() - init_started
+        self.first_job_seconds: Optional[float] = None
     
     def log_to_redis(self, level: str, event: str, message: str, details: str = None, file_name: str = None, file_path: str = None, file_size: int = None, error: str = None):
         """Redis'e log kaydı at"""
@@ -46,58 +236,241 @@ class RedisWorker:
             # Redis'e log ekle (sadece null olmayan değerleri ekle)
             filtered_entry = {k: v for k, v in log_entry.items() if v is not None}
             
-            self.redis_client.lpush(self.logs_list_name, json.dumps(filtered_entry))
-            # Son 1000 log'u tut
-            self.redis_client.ltrim(self.logs_list_name, 0, 999)
+            # Sink son 1000 log'u tutar (LPUSH + LTRIM tek pipeline'da)
+            self.log_sink.emit(json.dumps(filtered_entry))
             
         except Exception as e:
             logger.error(f"Redis log kaydetme hatası: {e}")
         
     def start_worker(self):
         """Ana worker döngüsü"""
-        logger.info("Python worker başlatıldı")
+        logger.info(f"Python worker başlatıldı: {self.worker_id} (concurrency={self.concurrency}), "
+                    f"import {IMPORT_SECONDS:.3f}s, init {self.init_seconds:.3f}s")
         
         # Worker başlatma log'u
         self.log_to_redis(
             level="INFO",
             event="PYTHON_WORKER_STARTED",
             message="Python worker başlatıldı",
-            details="Vector processing worker aktif"
+            details=f"Vector processing worker aktif - Worker: {self.worker_id}, Concurrency: {self.concurrency}, "
+                    f"Import: {IMPORT_SECONDS:.3f}s, Init: {self.init_seconds:.3f}s"
         )
         
+        signal.signal(signal.SIGTERM, self._handle_stop_signal)
+        self.start_metrics_server()
+        
+        # Önceki çalıştırmadan kalan (crash) job'ları kuyruğa geri koy
+        self.requeue_stale_jobs(startup=True)
+        
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job')
         last_heartbeat = time.time()
+        last_claim_check = time.time()
         
-        while True:
-            try:
-                # Her 2 dakikada bir heartbeat log'u gönder
-                current_time = time.time()
-                if current_time - last_heartbeat >= 120:  # 2 dakika
-                    self.log_to_redis(
-                        level="INFO",
-                        event="PYTHON_WORKER_HEARTBEAT",
-                        message="Python worker aktif",
-                        details="Worker çalışıyor ve job bekliyor"
-                    )
-                    last_heartbeat = current_time
-                
-                # Redis'ten job al (blocking pop)
-                job_data = self.redis_client.brpop(self.queue_name, timeout=10)
-                
-                if job_data:
-                    queue_name, job_json = job_data
-                    self.process_job(job_json)
-                else:
-                    logger.debug("Redis'ten job alınamadı, 10 saniye bekleniyor...")
+        try:
+            while not self._stopping:
+                try:
+                    # Her 2 dakikada bir heartbeat log'u gönder
+                    current_time = time.time()
+                    if current_time - last_heartbeat >= 120:  # 2 dakika
+                        cache = self.vector_store.embedding_cache
+                        cache_details = ""
+                        if cache is not None:
+                            cache_stats = cache.stats()
+                            cache_details = f", Embedding cache: {cache_stats['hits']} hit / {cache_stats['misses']} miss"
+                        sink_stats = self.log_sink.stats()
+                        if sink_stats['dropped']:
+                            cache_details += f", Atılan log: {sink_stats['dropped']}"
+                        self.log_to_redis(
+                            level="INFO",
+                            event="PYTHON_WORKER_HEARTBEAT",
+                            message="Python worker aktif",
+                            details=f"Worker çalışıyor ve job bekliyor - Aktif job: {len(self._in_flight)}{cache_details}"
+                        )
+                        last_heartbeat = current_time
+                    
+                    # Çalışan job'ların claim süresini uzat, ölü worker'ların job'larını geri al
+                    if current_time - last_claim_check >= self.visibility_timeout / 3:
+                        self.refresh_claims()
+                        self.requeue_stale_jobs()
+                        last_claim_check = current_time
+                    
+                    self._ack_finished_jobs()
+                    
+                    if len(self._in_flight) >= self.concurrency:
+                        wait(list(self._in_flight), timeout=1, return_when=FIRST_COMPLETED)
+                        continue
                     
-            except redis.ConnectionError:
-                logger.error("Redis bağlantı hatası, 5 saniye bekleniyor...")
-                time.sleep(5)
-            except Exception as e:
-                logger.error(f"Worker hatası: {e}")
-                time.sleep(1)
-    
-    def process_job(self, job_json: str):
-        """Tek bir job'ı işle"""
+                    # Backpressure: embedding servisi devre dışıyken yeni job alma
+                    if self.vector_store.embedding_client.breaker.is_open():
+                        time.sleep(1)
+                        continue
+                    
+                    # Redis'ten job al (kuyruk -> processing listesi)
+                    entry = self.claim_job(timeout=1 if self._in_flight else 10)
+                    
+                    if entry:
+                        if self.first_job_seconds is None:
+                            self.record_first_job()
+                        future = executor.submit(self.process_job, job_payload(entry))
+                        self._in_flight[future] = entry
+                    else:
+                        logger.debug("Redis'ten job alınamadı, bekleniyor...")
+                        
+                except redis.ConnectionError:
+                    logger.error("Redis bağlantı hatası, 5 saniye bekleniyor...")
+                    time.sleep(5)
+                except Exception as e:
+                    logger.error(f"Worker hatası: {e}")
+                    time.sleep(1)
+        finally:
+            # Yeni job alma, çalışanların bitmesini bekle ve ack'le
+            logger.info(f"Worker durduruluyor, {len(self._in_flight)} aktif job bekleniyor")
+            executor.shutdown(wait=True)
+            self._ack_finished_jobs()
+            self.log_sink.close()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+    
+    def start_metrics_server(self):
+        """Kuyruk / job gauge'larını kaydet ve /metrics endpoint'ini başlat"""
+        registry = metrics.REGISTRY
+        registry.gauge('worker_queue_depth', 'Kuyrukta bekleyen job sayısı').set_function(
+            lambda: self.redis_client.llen(self.queue_name))
+        registry.gauge('worker_processing_depth', 'Processing listesindeki (claim edilmiş) job sayısı').set_function(
+            lambda: self.redis_client.llen(self.processing_list_name))
+        registry.gauge('worker_jobs_in_flight', 'Bu worker\'da çalışan job sayısı').set_function(
+            lambda: len(self._in_flight))
+        registry.gauge('vector_store_vectors', 'Store\'daki canlı vector sayısı').set_function(
+            lambda: self.vector_store.store.alive_count)
+        registry.gauge('log_sink_dropped', 'Buffer dolduğu için atılan log kaydı').set_function(
+            lambda: self.log_sink.dropped)
+        registry.gauge('vector_store_ready', 'Arka plan index warm-up\'ı tamamlandı mı (1/0)').set_function(
+            lambda: 1 if self.vector_store.ready.is_set() else 0)
+        metrics.STARTUP_SECONDS.set(IMPORT_SECONDS, phase='imports')
+        metrics.STARTUP_SECONDS.set(self.init_seconds, phase='init')
+        embedding_client = self.vector_store.embedding_client
+        registry.gauge('embedding_concurrency_limit', 'Ollama için AIMD eşzamanlı istek limiti').set_function(
+            lambda: embedding_client.limiter.limit)
+        registry.gauge('embedding_requests_in_flight', 'Ollama\'da bekleyen embedding isteği').set_function(
+            lambda: embedding_client.limiter.in_flight)
+        registry.gauge('embedding_circuit_open', 'Embedding circuit breaker açık mı (1/0)').set_function(
+            lambda: 1 if embedding_client.breaker.is_open() else 0)
+        
+        if self.metrics_port <= 0:
+            return
+        try:
+            self.metrics_server = metrics.MetricsServer(registry, port=self.metrics_port)
+            self.metrics_server.start()
+        except OSError as e:
+            logger.error(f"Metrics endpoint başlatılamadı (port {self.metrics_port}): {e}")
+            self.metrics_server = None
+    
+    def record_first_job(self):
+        """Process başlangıcından (import öncesi) ilk alınan job'a kadar geçen süreyi kaydet"""
+        self.first_job_seconds = time.perf_counter() - _IMPORT_STARTED
+        metrics.STARTUP_SECONDS.set(self.first_job_seconds, phase='first_job')
+        warm_up = self.vector_store.warm_up_seconds
+        logger.info(f"İlk job alındı: başlangıçtan {self.first_job_seconds:.3f}s sonra "
+                    f"(import {IMPORT_SECONDS:.3f}s, init {self.init_seconds:.3f}s, "
+                    f"index warm-up {'sürüyor' if warm_up is None else f'{warm_up:.3f}s'})")
+    
+    def claim_job(self, timeout: float) -> Optional[str]:
+        """Kuyruktan job'ı atomik olarak processing listesine taşı ve claim token'lı kayda çevir
+        
+        Processing listesindeki kaydı ("<token>|<job json>") döndürür; ack,
+        retry ve requeue bu kayıtla yapılır.
+        """
+        job_json = self.redis_client.blmove(
+            self.queue_name, self.processing_list_name, timeout, src='RIGHT', dest='LEFT'
+        )
+        if not job_json:
+            return None
+        entry = f"{uuid.uuid4().hex}|{job_json}"
+        self._claim_script(
+            keys=[self.processing_list_name, self.claims_hash_name],
+            args=[job_json, entry, f"{self.worker_id}|{time.time()}"]
+        )
+        return entry
+    
+    def ack_job(self, entry: str):
+        """Tamamlanan job'ı processing listesinden ve claim / deneme kayıtlarından sil"""
+        pipe = self.redis_client.pipeline()
+        pipe.lrem(self.processing_list_name, 1, entry)
+        pipe.hdel(self.claims_hash_name, entry)
+        pipe.hdel(self.attempts_hash_name, job_payload(entry))
+        pipe.execute()
+    
+    def retry_job(self, entry: str):
+        """Job'ı processing listesinden kuyruğun sonuna geri koy (deneme sayısı korunur)"""
+        self._retry_script(
+            keys=[self.processing_list_name, self.queue_name, self.claims_hash_name],
+            args=[entry, job_payload(entry)]
+        )
+    
+    def refresh_claims(self):
+        """Hâlâ çalışan job'ların claim zamanını güncelle (visibility timeout uzatma)"""
+        if not self._in_flight:
+            return
+        now = time.time()
+        self.redis_client.hset(
+            self.claims_hash_name,
+            mapping={entry: f"{self.worker_id}|{now}" for entry in self._in_flight.values()}
+        )
+    
+    def requeue_stale_jobs(self, startup: bool = False) -> int:
+        """Visibility timeout'u geçmiş job'ları kuyruğa geri koy
+        
+        startup=True iken bu worker'a (WORKER_ID) ait tüm claim'ler de geri konur;
+        yeni başlayan process'te bu job'lar çalışıyor olamaz.
+        """
+        requeued = 0
+        now = time.time()
+        
+        for entry in self.redis_client.lrange(self.processing_list_name, 0, -1):
+            claim = self.redis_client.hget(self.claims_hash_name, entry)
+            if claim is None:
+                # BLMOVE ile token'lı kayda çevrilme arasında kalmış olabilir; süreyi şimdi başlat
+                self.redis_client.hsetnx(self.claims_hash_name, entry, f"|{now}")
+                continue
+            
+            owner, _, claimed_at = claim.rpartition('|')
+            is_stale = now - float(claimed_at) > self.visibility_timeout
+            is_own_leftover = startup and owner == self.worker_id
+            if is_stale or is_own_leftover:
+                self._requeue_script(
+                    keys=[self.processing_list_name, self.queue_name, self.claims_hash_name],
+                    args=[entry, job_payload(entry)]
+                )
+                requeued += 1
+        
+        if requeued:
+            logger.warning(f"{requeued} yarım kalmış job kuyruğa geri kondu")
+            self.log_to_redis(
+                level="WARNING",
+                event="PYTHON_WORKER_JOBS_REQUEUED",
+                message=f"{requeued} yarım kalmış job kuyruğa geri kondu",
+                details=f"Worker: {self.worker_id}, Visibility timeout: {self.visibility_timeout}s"
+            )
+        return requeued
+    
+    def _ack_finished_jobs(self):
+        for future in [f for f in self._in_flight if f.done()]:
+            entry = self._in_flight.pop(future)
+            # process_job True dönerse job tekrar denenecek
+            if not future.cancelled() and future.exception() is None and future.result():
+                self.retry_job(entry)
+            else:
+                self.ack_job(entry)
+    
+    def _handle_stop_signal(self, signum, frame):
+        logger.info(f"Durdurma sinyali alındı: {signum}")
+        self._stopping = True
+    
+    def process_job(self, job_json: str) -> bool:
+        """Tek bir job'ı işle
+        
+        Job tekrar denenmek üzere kuyruğa geri konacaksa True döner.
+        """
         try:
             job_data = json.loads(job_json)
             job_id = job_data.get('id')
@@ -116,15 +489,51 @@ class RedisWorker:
                 logger.error(f"Dosya bulunamadı: {file_path}")
                 return
             
-            # Dosyayı işle
-            self.process_document(file_path, file_name, job_id)
+            # Büyük PDF: sayfa aralığı sub-job'larına böl, herhangi bir worker alabilir
+            part = job_data.get('part')
+            if part is None and self.should_split(file_name, file_path) and self.split_job(job_data):
+                return
+            
+            # Dosyayı (veya sub-job'ın sayfa aralığını) işle
+            self.process_document(file_path, file_name, job_id, part)
             
             logger.info(f"Job tamamlandı: {job_id} - {file_name}")
             
+        except JobRetryError as e:
+            return self.schedule_retry(job_json, job_id, file_name, file_path, str(e))
         except json.JSONDecodeError:
             logger.error(f"Geçersiz job JSON: {job_json}")
         except Exception as e:
             logger.error(f"Job işleme hatası: {e}")
+        return False
+    
+    def schedule_retry(self, job_json: str, job_id: str, file_name: str, file_path: str, error: str) -> bool:
+        """Deneme hakkı kaldıysa True döner; kalmadıysa job kalıcı olarak başarısız sayılır"""
+        attempts = self.redis_client.hincrby(self.attempts_hash_name, job_json, 1)
+        if attempts < self.max_job_attempts:
+            logger.warning(f"Job tekrar denenecek ({attempts}/{self.max_job_attempts}): {job_id} - {error}")
+            self.log_to_redis(
+                level="WARNING",
+                event="FILE_PROCESSING_RETRY",
+                message=f"Dosya işleme tekrar denenecek: {file_name}",
+                details=f"Job ID: {job_id}, Attempt: {attempts}/{self.max_job_attempts}, Error: {error}",
+                file_name=file_name,
+                file_path=file_path,
+                error=error
+            )
+            return True
+        
+        logger.error(f"Job {attempts} denemede tamamlanamadı, vazgeçildi: {job_id} - {error}")
+        self.log_to_redis(
+            level="ERROR",
+            event="FILE_PROCESSING_FAILED",
+            message=f"Dosya işlenemedi: {file_name}",
+            details=f"Job ID: {job_id}, {attempts} denemede embedding oluşturulamadı - {error}",
+            file_name=file_name,
+            file_path=file_path,
+            error=error
+        )
+        return False
     
     def is_supported_file(self, file_name: str) -> bool:
         """Desteklenen dosya tiplerini kontrol et"""
@@ -132,19 +541,304 @@ class RedisWorker:
         file_ext = os.path.splitext(file_name)[1].lower()
         return file_ext in supported_extensions
     
-    def process_document(self, file_path: str, file_name: str, job_id: str):
-        """Dokümanı işle ve vektörize et"""
+    def should_split(self, file_name: str, file_path: str) -> bool:
+        if self.split_pages <= 0 or os.path.splitext(file_name)[1].lower() != '.pdf':
+            return False
+        try:
+            return self.document_processor.pdf_page_count(file_path) > self.split_pages
+        except Exception as e:
+            logger.warning(f"PDF sayfa sayısı okunamadı, bölünmeden işlenecek {file_name}: {e}")
+            return False
+    
+    def split_job(self, job_data: Dict) -> bool:
+        """Büyük PDF'i sayfa aralığı sub-job'larına bölüp kuyruğa koy
+        
+        Plan sadece sayfa sayısından çıkarılır; text çıkarma ve chunk'lama
+        parçalarda paralel yapılır. Sub-job'lar aynı job id'yi taşır, global
+        chunk_index'leri parçalar chunk sayılarını yazdıkça atanır
+        (assign_part_chunks). Tamamlanan parçalar split hash'ine yazılır, son
+        biten parça dokümanı tamamlar (finalize_split).
+        """
+        job_id = job_data.get('id')
+        file_name = job_data.get('fileName')
+        file_path = job_data.get('filePath')
+        
+        page_count = self.document_processor.pdf_page_count(file_path)
+        ranges = self.document_processor.plan_page_ranges(page_count, self.split_pages)
+        if len(ranges) <= 1:
+            return False
+        
+        # Aynı job daha önce yarıda kaldıysa kısmi vector'larını temizle
+        if self.vector_store.has_job(job_id):
+            self.remove_job_vectors(job_id)
+        
+        split_key = self._split_key(job_id)
+        sub_jobs = [
+            json.dumps({**job_data, 'part': {**item, 'index': index, 'parts': len(ranges)}})
+            for index, item in enumerate(ranges)
+        ]
+        pipe = self.redis_client.pipeline()
+        pipe.delete(split_key)
+        pipe.hset(split_key, mapping={'parts': len(ranges), 'done': 0, 'started_at': time.time()})
+        pipe.expire(split_key, SPLIT_STATE_TTL_SECONDS)
+        pipe.lpush(self.queue_name, *sub_jobs)
+        pipe.execute()
+        
+        logger.info(f"{file_name} {len(ranges)} sub-job'a bölündü ({page_count} sayfa)")
+        self.log_to_redis(
+            level="INFO",
+            event="FILE_PROCESSING_SPLIT",
+            message=f"Dosya sayfa aralıklarına bölündü: {file_name}",
+            details=f"Job ID: {job_id}, Parts: {len(ranges)}, Pages: {page_count}, Pages per part: {self.split_pages}",
+            file_name=file_name,
+            file_path=file_path
+        )
+        return True
+    
+    def assign_part_chunks(self, job_id: str, part: Dict, chunks_count: int) -> int:
+        """Parçanın chunk sayısını split hash'ine yaz, ilk global chunk_index'ini döndür
+        
+        Parçalar chunk sayılarını embedding'den önce yazar; önceki parçaların
+        sayıları genelde hazırdır. Hazır değilse PDF_SPLIT_ORDER_WAIT_SECONDS
+        kadar beklenir, sonra job tekrar denenir (JobRetryError).
+        """
+        deadline = time.monotonic() + self.split_order_wait
+        while True:
+            first_chunk = self._assign_part_script(keys=[self._split_key(job_id)],
+                                                   args=[part['index'], chunks_count])
+            if first_chunk >= 0:
+                return first_chunk
+            if first_chunk == -2:
+                raise ValueError(f"Split durumu bulunamadı: {job_id}")
+            if first_chunk == -3:
+                raise ValueError(f"Parçanın chunk sayısı önceki denemeden farklı, dosya değişmiş olabilir: "
+                                 f"{job_id} parça {part['index'] + 1}/{part['parts']}")
+            if time.monotonic() >= deadline:
+                raise JobRetryError(f"Önceki parçaların chunk sayıları bekleniyor: {job_id} "
+                                    f"parça {part['index'] + 1}/{part['parts']}")
+            time.sleep(PART_ORDER_POLL_SECONDS)
+    
+    def complete_part(self, job_id: str, file_name: str, file_path: str, part: Dict, chunks_count: int,
+                      reused_count: int, duplicate_count: int, chunk_hashes: List[str], elapsed: float):
+        """Sub-job sonucunu split hash'ine yaz; son parça ise dokümanı tamamla"""
+        payload = json.dumps({
+            'chunks': chunks_count,
+            'reused': reused_count,
+            'duplicates': duplicate_count,
+            'hashes': chunk_hashes,
+            'seconds': round(elapsed, 3)
+        })
+        done = self._complete_part_script(keys=[self._split_key(job_id)], args=[part['index'], payload])
+        logger.info(f"Sub-job tamamlandı: {job_id} parça {part['index'] + 1}/{part['parts']} ({chunks_count} chunk)")
+        if done == part['parts']:
+            self.finalize_split(job_id, file_name, file_path)
+    
+    def finalize_split(self, job_id: str, file_name: str, file_path: str):
+        """Tüm parçalar bitti: manifest, önceki sürümün silinmesi ve tek tamamlanma log'u"""
+        split_key = self._split_key(job_id)
+        state = self.redis_client.hgetall(split_key)
+        parts = int(state['parts'])
+        results = [json.loads(state[f"part:{index}"]) for index in range(parts)]
+        chunks_count = sum(result['chunks'] for result in results)
+        reused_count = sum(result['reused'] for result in results)
+        duplicate_count = sum(result['duplicates'] for result in results)
+        chunk_hashes = [chunk_hash for result in results for chunk_hash in result['hashes']]
+        file_size = os.path.getsize(file_path)
+        
+        if chunks_count == 0:
+            self.redis_client.delete(split_key)
+            logger.warning(f"Text içeriği bulunamadı: {file_name}")
+            self.log_to_redis(
+                level="WARNING",
+                event="FILE_PROCESSING_FAILED",
+                message=f"Dosya işlenemedi: {file_name}",
+                details="Text extraction başarısız - Text içeriği bulunamadı",
+                file_name=file_name,
+                file_path=file_path,
+                file_size=file_size,
+                error="Text içeriği bulunamadı"
+            )
+            return
+        
+        # Önceki sürümün vector'ları artık yeni job altında; eskileri sil
+        manifest = self.chunk_manifests.load(file_name)
+        if manifest and manifest.get('job_id') != job_id:
+            self.remove_job_vectors(manifest['job_id'])
+        self.chunk_manifests.save(file_name, job_id, chunk_hashes)
+        self.vector_store.update_metadata(job_id, file_name, chunks_count)
+        self.redis_client.delete(split_key)
+        metrics.BYTES_TOTAL.inc(file_size)
+        
+        elapsed = time.time() - float(state['started_at'])
+        part_seconds = sum(result['seconds'] for result in results)
+        self.log_to_redis(
+            level="INFO",
+            event="FILE_PROCESSING_COMPLETED",
+            message=f"Dosya başarıyla işlendi: {file_name}",
+            details=f"Job ID: {job_id}, Chunks: {chunks_count}, Reused embeddings: {reused_count}, "
+                    f"Near duplicates: {duplicate_count}, File Size: {file_size} bytes, Parts: {parts}, Elapsed: {elapsed:.3f}s, "
+                    f"Part total: {part_seconds:.3f}s",
+            file_name=file_name,
+            file_path=file_path,
+            file_size=file_size
+        )
+        logger.info(f"Vector işleme tamamlandı: {file_name} - {chunks_count} vector ({parts} parça)")
+    
+    def _split_key(self, job_id: str) -> str:
+        return f"{self.queue_name}:split:{job_id}"
+    
+    def embed_chunks(self, chunks: List[str], hashes: List[str], reusable: Dict[str, np.ndarray]):
+        """Değişmemiş chunk'lar için önceki embedding'i kullan, diğerlerini oluştur
+        
+        (embeddings, yeniden kullanılan chunk sayısı) döndürür.
+        """
+        embeddings = [None] * len(chunks)
+        missing = []
+        for i, chunk_hash in enumerate(hashes):
+            previous = reusable.get(chunk_hash)
+            if previous is None:
+                missing.append(i)
+            else:
+                embeddings[i] = previous.tolist()
+        
+        if missing:
+            for i, embedding in zip(missing, self.vector_store.generate_embeddings([chunks[i] for i in missing])):
+                embeddings[i] = embedding
+        
+        return embeddings, len(chunks) - len(missing)
+    
+    def remove_job_vectors(self, job_id: str, chunk_range: Optional[range] = None):
+        """Job'ın (chunk_range verilirse sadece o aralıktaki) vector'larını backend'den ve yerel store'dan sil"""
+        vector_ids = self.vector_store.get_vector_ids_by_job(job_id, chunk_range)
+        self.vector_store.backend_uploader.delete(vector_ids)
+        self.vector_store.delete_vectors_by_job(job_id, chunk_range)
+    
+    def discard_partial_vectors(self, job_id: str, chunk_range: Optional[range] = None):
+        """Yarıda kalan job'ın gönderilmemiş buffer'ını ve kaydedilmiş vector'larını sil
+        
+        Backend'e ulaşılamasa da yerel vector'lar silinir; backend'deki
+        kopyalar sonraki gönderimden önce silinir (BackendUploader.delete_later).
+        """
+        self.vector_store.backend_uploader.discard(job_id)
+        try:
+            if not self.vector_store.has_job(job_id, chunk_range):
+                return
+            vector_ids = self.vector_store.get_vector_ids_by_job(job_id, chunk_range)
+            try:
+                self.vector_store.backend_uploader.delete(vector_ids)
+            except Exception as cleanup_error:
+                logger.error(f"Kısmi vector'lar backend'den silinemedi, sonraki gönderimde silinecek {job_id}: "
+                             f"{cleanup_error}")
+                self.vector_store.backend_uploader.delete_later(vector_ids)
+            self.vector_store.delete_vectors_by_job(job_id, chunk_range)
+        except Exception as cleanup_error:
+            logger.error(f"Kısmi vector'lar temizlenemedi {job_id}: {cleanup_error}")
+    
+    def process_document(self, file_path: str, file_name: str, job_id: str, part: Optional[Dict] = None):
+        """Dokümanı (part verilirse sadece sub-job'ın sayfa aralığını) işle ve vektörize et"""
+        if self.slow_job_profiler is None:
+            return self._process_document(file_path, file_name, job_id, part)
+        
+        def report(elapsed, frames, samples):
+            profile = '; '.join(f"{location} ({count * 100 // samples}%)" for location, count in frames)
+            logger.warning(f"Yavaş job profili {file_name} ({elapsed:.1f}s, {samples} örnek): {profile}")
+            self.log_to_redis(
+                level="WARNING",
+                event="FILE_PROCESSING_SLOW",
+                message=f"Yavaş job: {file_name} ({elapsed:.1f}s)",
+                details=f"Job ID: {job_id}, Samples: {samples}, Profile: {profile}",
+                file_name=file_name,
+                file_path=file_path
+            )
+        
+        with self.slow_job_profiler.profile(report):
+            return self._process_document(file_path, file_name, job_id, part)
+    
+    def _process_document(self, file_path: str, file_name: str, job_id: str, part: Optional[Dict] = None):
         file_size = None
         chunks_count = 0
+        reused_count = 0
+        duplicate_count = 0
         error_message = None
+        status = 'error'
+        timings = metrics.JobTimings()
+        metrics.activate(timings)
+        # Sub-job: global chunk_index aralığı chunk'lama sonrası atanır; o zamana kadar job'ın hiçbir vector'ına dokunulmaz
+        first_chunk = 0
+        chunk_range = range(0) if part else None
+        page_range = {'start_page': part['start_page'], 'end_page': part['end_page']} if part else {}
+        part_label = f", Part: {part['index'] + 1}/{part['parts']}" if part else ""
+        flushed = False
         
         try:
             # Dosya boyutunu al
             file_size = os.path.getsize(file_path)
             
-            # Text extraction
-            text_content = self.document_processor.extract_text(file_path)
-            if not text_content:
+            # Streaming pipeline: sayfa -> chunk -> embedding
+            # Sub-job aralık sonundaki chunk'ı tamamlamak için sonraki sayfalardan gerektiği kadar okur
+            pages = timings.iterate(self.document_processor.iter_pages(file_path, part['start_page'] if part else 0), 'extract')
+            chunks = self.document_processor.iter_chunks(pages, instrument=timings.iterate, **page_range)
+            if part:
+                # Aralık önce chunk'lanır: global chunk_index'ler önceki parçaların chunk sayılarına bağlı
+                chunks = list(chunks)
+                first_chunk = self.assign_part_chunks(job_id, part, len(chunks))
+                chunk_range = range(first_chunk, first_chunk + len(chunks))
+            
+            # Aynı job daha önce yarıda kaldıysa (requeue) kısmi vector'larını temizle
+            if self.vector_store.has_job(job_id, chunk_range):
+                self.remove_job_vectors(job_id, chunk_range)
+            
+            # Dosyanın önceki sürümü: değişmeyen chunk'ların embedding'leri yeniden kullanılır
+            manifest = self.chunk_manifests.load(file_name)
+            previous_job_id = None
+            reusable = {}
+            if manifest and manifest.get('job_id') != job_id:
+                previous_job_id = manifest['job_id']
+                reusable = self.vector_store.find_reusable_vectors(previous_job_id, manifest['chunks'])
+            chunk_hashes = []
+            
+            # Extraction/chunking arka planda ilerlerken önceki batch'ler embed edilir
+            batches = prefetch(batched(chunks, self.vector_store.embedding_batch_size), self.prefetch_batches)
+            
+            for batch in batches:
+                batch_start = first_chunk + chunks_count
+                hashes = [self.chunk_manifests.chunk_hash(chunk) for chunk in batch]
+                # Near-duplicate chunk'lar (boilerplate, tekrar eden sayfalar) mevcut bir vector'ı gösterir;
+                # önceki sürümün chunk'ları birazdan silineceği için canonical seçilmez
+                exclude_jobs = (previous_job_id,) if previous_job_id else ()
+                checks = self.vector_store.find_near_duplicates(job_id, batch_start, batch, exclude_jobs)
+                unique = [i for i, (_, match) in enumerate(checks) if match is None]
+                with timings.stage('embed'):
+                    embeddings, batch_reused = self.embed_chunks(
+                        [batch[i] for i in unique], [hashes[i] for i in unique], reusable)
+                chunk_hashes.extend(hashes)
+                reused_count += batch_reused
+                duplicate_count += len(batch) - len(unique)
+                
+                # Vector storage
+                saved = set()
+                for i, embedding in zip(unique, embeddings):
+                    vector_data = {
+                        'job_id': job_id,
+                        'file_name': file_name,
+                        'file_path': file_path,
+                        'chunk_index': batch_start + i,
+                        'chunk_text': batch[i],
+                        'chunk_size': len(batch[i]),
+                        'embedding': embedding
+                    }
+                    
+                    # Vector'ı kaydet
+                    if self.vector_store.save_vector(vector_data):
+                        saved.add(i)
+                # İmzalar vector'lar kaydedildikten sonra eklenir: kaydedilemeyen chunk canonical olmaz
+                self.vector_store.register_near_duplicates(
+                    job_id, file_name, file_path, batch_start, batch, checks, saved, exclude_jobs)
+                chunks_count += len(batch)
+            
+            # Boş sub-job da tamamlanır; doküman boşsa finalize_split raporlar
+            if chunks_count == 0 and not part:
+                status = 'empty'
                 error_message = "Text içeriği bulunamadı"
                 logger.warning(f"Text içeriği bulunamadı: {file_name}")
                 self.log_to_redis(
@@ -159,38 +853,47 @@ class RedisWorker:
                 )
                 return
             
-            # Text chunking
-            chunks = self.document_processor.chunk_text(text_content)
-            chunks_count = len(chunks)
-            logger.info(f"{file_name} için {chunks_count} chunk oluşturuldu")
-            
-            # Vector generation ve storage
-            for i, chunk in enumerate(chunks):
-                vector_data = {
-                    'job_id': job_id,
-                    'file_name': file_name,
-                    'file_path': file_path,
-                    'chunk_index': i,
-                    'chunk_text': chunk,
-                    'chunk_size': len(chunk)
-                }
-                
-                # Embedding oluştur
-                embedding = self.vector_store.generate_embedding(chunk)
-                vector_data['embedding'] = embedding
-                
-                # Vector'ı kaydet
-                self.vector_store.save_vector(vector_data)
+            logger.info(f"{file_name}{part_label} için {chunks_count} chunk oluşturuldu")
+            
+            # Buffer'da kalan vector'ları backend'e gönder
+            self.vector_store.flush_backend(job_id)
+            flushed = True
+            metrics.CHUNKS_TOTAL.inc(chunks_count - duplicate_count)
+            metrics.EMBEDDINGS_TOTAL.inc(chunks_count - reused_count - duplicate_count, source='generated')
+            metrics.EMBEDDINGS_TOTAL.inc(reused_count, source='reused')
+            metrics.EMBEDDINGS_TOTAL.inc(duplicate_count, source='near_duplicate')
+            
+            if part:
+                # Doküman son parça bitince tamamlanır (manifest, önceki sürüm, tamamlanma log'u)
+                status = 'completed'
+                self.complete_part(job_id, file_name, file_path, part, chunks_count, reused_count,
+                                   duplicate_count, chunk_hashes, timings.elapsed())
+                return
+            
+            # Önceki sürümün vector'ları artık yeni job altında; eskileri sil
+            if previous_job_id:
+                self.remove_job_vectors(previous_job_id)
+            with timings.stage('manifest'):
+                self.chunk_manifests.save(file_name, job_id, chunk_hashes)
+            
+            if reused_count:
+                logger.info(f"{file_name}: {reused_count}/{chunks_count} chunk değişmemiş, embedding atlandı")
+            if duplicate_count:
+                logger.info(f"{file_name}: {duplicate_count}/{chunks_count} chunk near-duplicate, mevcut vector'ı gösteriyor")
             
             # Metadata'yı güncelle
             self.vector_store.update_metadata(job_id, file_name, chunks_count)
             
+            status = 'completed'
+            metrics.BYTES_TOTAL.inc(file_size)
+            
             # Başarılı işlem log'u
             self.log_to_redis(
                 level="INFO",
                 event="FILE_PROCESSING_COMPLETED",
                 message=f"Dosya başarıyla işlendi: {file_name}",
-                details=f"Job ID: {job_id}, Chunks: {chunks_count}, File Size: {file_size} bytes",
+                details=f"Job ID: {job_id}, Chunks: {chunks_count}, Reused embeddings: {reused_count}, "
+                        f"Near duplicates: {duplicate_count}, File Size: {file_size} bytes, {timings.summary()}",
                 file_name=file_name,
                 file_path=file_path,
                 file_size=file_size
@@ -198,21 +901,41 @@ class RedisWorker:
             
             logger.info(f"Vector işleme tamamlandı: {file_name} - {chunks_count} vector")
             
+        except (EmbeddingError, BackendUploadError) as e:
+            # Kısmi vector'lar bırakılmaz (yerel store ile backend ayrışmaz); job kuyruğa geri konur veya başarısız sayılır
+            status = 'retry'
+            if isinstance(e, EmbeddingError):
+                logger.error(f"Embedding oluşturulamadı {file_name}: {e}")
+            else:
+                logger.error(f"Vector'lar backend'e gönderilemedi {file_name}: {e}")
+            self.discard_partial_vectors(job_id, chunk_range)
+            raise JobRetryError(str(e)) from e
+        except JobRetryError as e:
+            # Parça sırası bekleniyor: henüz vector kaydedilmedi
+            status = 'retry'
+            logger.warning(f"Sub-job tekrar denenecek {file_name}{part_label}: {e}")
+            raise
         except Exception as e:
             error_message = str(e)
             logger.error(f"Doküman işleme hatası {file_name}: {e}")
+            # Backend'e gönderilmiş vector'lar iki tarafta da tutarlı; gönderilmemişler silinir
+            if not flushed:
+                self.discard_partial_vectors(job_id, chunk_range)
             
             # Hata log'u
             self.log_to_redis(
                 level="ERROR",
                 event="FILE_PROCESSING_ERROR",
                 message=f"Dosya işleme hatası: {file_name}",
-                details=f"Job ID: {job_id}, Error: {error_message}",
+                details=f"Job ID: {job_id}{part_label}, Error: {error_message}",
                 file_name=file_name,
                 file_path=file_path,
                 file_size=file_size,
                 error=error_message
             )
+        finally:
+            metrics.activate(None)
+            timings.finish(status)
 
 if __name__ == "__main__":
     worker = RedisWorker()